@@ -1,19 +1,28 @@
 from flask import Flask
-from sqlalchemy import create_engine
+from app.config import get_config
+from app.database.connection import get_engine
 from app.database.models import Base
+from app.database.indexes import ensure_indexes
+from app.database.search import ensure_search_index
+from app.database.review_stats import ensure_review_stats
+from app.database.instrumentation import install_request_metrics
 
-# SQLite Database URL
-DATABASE_URL = "sqlite:///ecommerce.db"
+# Database URL from the active configuration
+DATABASE_URL = get_config().DATABASE_URL
 
 # Function to initialize the database with SQLAlchemy
 def create_database_with_sqlalchemy(engine_url=DATABASE_URL):
-    engine = create_engine(engine_url)
+    engine = get_engine(engine_url)
     Base.metadata.create_all(engine)
+    ensure_indexes(engine)
+    ensure_search_index(engine)
+    ensure_review_stats(engine)
     print("Tables created (if not already existing).")
 
 # Flask application factory
 def create_app(engine_url=DATABASE_URL):
     app = Flask(__name__)
+    install_request_metrics(app)
 
     # Initialize the database
     create_database_with_sqlalchemy(engine_url)
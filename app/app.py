@@ -7,39 +7,55 @@ and handling basic error handling routes.
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent))
-from services.customers.customers import customers_bp
-from services.inventory.inventory import inventory_bp
-from services.reviews.reviews import reviews_bp
-from services.sales.sales import sales_bp
-from services.cart.cart import cart_bp
-from services.recommendations.recommendations import recommendations_bp
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-
-# Define the engine (replace with your actual database URL)
-engine = create_engine("sqlite:///ecommerce.db")
+from app.services.customers.customers import customers_bp
+from app.services.inventory.inventory import inventory_bp
+from app.services.reviews.reviews import reviews_bp
+from app.services.sales.sales import sales_bp
+from app.services.cart.cart import cart_bp, identify_abandoned_carts
+from app.services.recommendations.recommendations import recommendations_bp
+from app.database.connection import engine, pool_metrics
+from app.database.instrumentation import install_request_metrics, request_metrics
+from app.database.indexes import ensure_indexes
+from app.database.search import ensure_search_index
+from app.utils.metrics import (
+    registry, CONTENT_TYPE, install_metrics, record_rate_limit_rejection,
+    CircuitBreakerMetrics, instrument_engine, timed_job,
+)
 
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import pybreaker
 import requests
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 
 # Create the Flask app instance
 app = Flask(__name__)
 
+# Add the model indexes and the product search index to databases created before them
+ensure_indexes(engine)
+ensure_search_index(engine)
+
+# Prometheus request metrics, installed before the limiter so rejected requests are counted
+install_metrics(app)
+instrument_engine(engine, "ecommerce")
+
 # Initialize Limiter for rate limiting
 limiter = Limiter(
     key_func=get_remote_address,  # Key function for identifying unique clients
-    default_limits=["100 per hour"]  # Default rate limits
+    default_limits=["100 per hour"],  # Default rate limits
+    on_breach=record_rate_limit_rejection,  # Count rejections in the Prometheus metrics
 )
 
 # Attach the Limiter to the Flask app
 limiter.init_app(app)
 
+# Per-request SQL statistics, Server-Timing headers and per-endpoint histograms
+install_request_metrics(app)
+
 # Initialize Circuit Breaker
-circuit_breaker = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=60)
+circuit_breaker = pybreaker.CircuitBreaker(
+    fail_max=5, reset_timeout=60, listeners=[CircuitBreakerMetrics("external_service")]
+)
 
 # Example service call wrapped with Circuit Breaker
 @circuit_breaker
@@ -63,6 +79,24 @@ app.register_blueprint(recommendations_bp, url_prefix="/recommendations", decora
 def health_check():
     return jsonify({"message": "API is running successfully!"}), 200
 
+# Connection pool statistics of the shared database engine
+@app.route("/internal/pool")
+@limiter.exempt
+def database_pool_metrics():
+    return jsonify(pool_metrics()), 200
+
+# Per-endpoint request time, SQL time and statement count percentiles
+@app.route("/internal/metrics")
+@limiter.exempt
+def request_metrics_summary():
+    return jsonify(request_metrics.snapshot()), 200
+
+# Prometheus text exposition, aggregated over all worker processes
+@app.route("/metrics")
+@limiter.exempt
+def prometheus_metrics():
+    return Response(registry.exposition(), status=200, content_type=CONTENT_TYPE)
+
 # Error handling example
 @app.errorhandler(404)
 def not_found_error(error):
@@ -105,48 +139,15 @@ from pybreaker import CircuitBreakerError
 def handle_circuit_breaker_error(e):
     return jsonify({"error": "Service currently unavailable. Please try again later."}), 503
 
-# Function to identify abandoned carts
-def identify_abandoned_carts():
-    """
-    Identifies and processes abandoned carts.
-    An abandoned cart is defined as a cart item that hasn't been updated
-    for more than 24 hours and hasn't resulted in a sale.
-    """
-    # Define the threshold for abandonment (e.g., 24 hours)
-    abandonment_threshold = datetime.utcnow() - timedelta(hours=24)
-
-    # Open a session
-    session = Session()
-
-    try:
-        # Query to find abandoned carts
-        abandoned_carts = session.query(Cart).filter(
-            Cart.added_at < abandonment_threshold
-        ).all()
-
-        # Process the results
-        for cart in abandoned_carts:
-            print(f"Abandoned cart: Cart ID {cart.id}, Customer ID {cart.customer_id}, Item ID {cart.item_id}, Added At {cart.added_at}")
-
-            # Optionally, take action such as sending a reminder email or notification
-            # Example: send_email_to_customer(cart.customer_id)
-        
-    except Exception as e:
-        print(f"Error identifying abandoned carts: {e}")
-    finally:
-        # Close the session
-        session.close()
-
 # Schedule the abandoned cart identification task
 from apscheduler.schedulers.background import BackgroundScheduler
 
 scheduler = BackgroundScheduler()
-scheduler.add_job(func=identify_abandoned_carts, trigger="cron", hour=0)  # Runs daily at midnight
+scheduler.add_job(func=timed_job(identify_abandoned_carts), trigger="cron", hour=0)  # Runs daily at midnight
 scheduler.start()
 
 # Ensure scheduler shuts down properly
 import atexit
-from database.models import Session, Cart
 atexit.register(lambda: scheduler.shutdown())
 
 if __name__ == "__main__":
@@ -13,16 +13,96 @@ class Config:
 
     Attributes:
         DATABASE_URL (str): The database connection URL.
+        DB_POOL_SIZE (int): Number of connections kept open in the engine pool.
+        DB_MAX_OVERFLOW (int): Extra connections allowed beyond DB_POOL_SIZE under load.
+        DB_POOL_TIMEOUT (int): Seconds to wait for a free pooled connection.
+        DB_POOL_RECYCLE (int): Seconds after which pooled connections are replaced.
+        DB_POOL_PRE_PING (bool): Test pooled connections for liveness on checkout.
+        SQLITE_PROFILE (str): Name of the SQLite pragma profile in SQLITE_PROFILES.
+        TRANSACTION_RETRY_ATTEMPTS (int): Attempts for transactions that hit a lock conflict.
+        TRANSACTION_RETRY_BACKOFF_MS (int): Base backoff between attempts, doubled on each retry.
+        CATALOGUE_CACHE_SIZE (int): Maximum number of cached catalogue entries per process.
+        CATALOGUE_CACHE_TTL (int): Seconds a cached catalogue entry stays valid.
+        CATALOGUE_CACHE_BACKEND (str): Shared cache backend, "none" or "local".
+        PAGE_SIZE_DEFAULT (int): Page size of listings when no limit is requested.
+        PAGE_SIZE_MAX (int): Largest page size a client may request.
+        EXPORT_BATCH_SIZE (int): Rows fetched per server-side cursor batch by exports.
+        SEARCH_MAX_CANDIDATES (int): Most matches a product search ranks by relevance; broader searches list by ItemID.
+        INVENTORY_BULK_CHUNK_SIZE (int): Rows upserted per transaction by bulk inventory imports.
+        INVENTORY_BULK_MAX_ERRORS (int): Rejected rows reported in detail per bulk import.
+        STOCK_BATCH_MAX_ITEMS (int): Largest number of adjustments accepted in one stock batch.
+        CART_ABANDONED_AFTER_HOURS (int): Age after which a cart line counts as abandoned.
+        CART_SWEEP_CHUNK_SIZE (int): Cart lines notified and deleted per sweep transaction.
         SECRET_KEY (str): The secret key for security purposes.
         TOKEN_EXPIRATION_MINUTES (int): Expiration time for authentication tokens in minutes.
+        TOKEN_CACHE_SIZE (int): Maximum number of verified tokens cached per process.
+        JWT_ALGORITHM (str): Token signature algorithm, "HS256", "RS256" or "EdDSA".
+        JWT_KEYSET_FILE (str): Key-set file with the public keys of RS256/EdDSA tokens.
+        JWT_PRIVATE_KEY_FILE (str): Private key file; only set on services that issue tokens.
+        JWT_SIGNING_KID (str): Key ID of the private key in the key set.
+        PASSWORD_HASH_ALGORITHM (str): Password KDF for new hashes, "scrypt" or "pbkdf2_sha256".
+        PASSWORD_SCRYPT_N (int): scrypt CPU/memory cost (a power of two).
+        PASSWORD_SCRYPT_R (int): scrypt block size.
+        PASSWORD_SCRYPT_P (int): scrypt parallelization.
+        PASSWORD_PBKDF2_ITERATIONS (int): PBKDF2-HMAC-SHA256 iterations.
+        PASSWORD_HASH_WORKERS (int): Threads hashing and verifying passwords.
+        PASSWORD_HASH_MAX_PENDING (int): Password operations that may be queued or running at once.
+        PASSWORD_HASH_QUEUE_TIMEOUT (float): Seconds to wait for a free slot before rejecting a login.
+        METRICS_MULTIPROC_DIR (str): Directory of the memory-mapped metric files shared by worker processes; unset keeps metrics per process.
         DEBUG (bool): Debug mode toggle.
     """
     # Database settings
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///ecommerce.db")  # Default to SQLite
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = bool(int(os.getenv("DB_POOL_PRE_PING", 1)))
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+    TRANSACTION_RETRY_ATTEMPTS = int(os.getenv("TRANSACTION_RETRY_ATTEMPTS", 5))
+    TRANSACTION_RETRY_BACKOFF_MS = int(os.getenv("TRANSACTION_RETRY_BACKOFF_MS", 10))
+
+    # Catalogue cache
+    CATALOGUE_CACHE_SIZE = int(os.getenv("CATALOGUE_CACHE_SIZE", 4096))
+    CATALOGUE_CACHE_TTL = int(os.getenv("CATALOGUE_CACHE_TTL", 300))
+    CATALOGUE_CACHE_BACKEND = os.getenv("CATALOGUE_CACHE_BACKEND", "none")
+
+    # Listings
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 100))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 1000))
+    SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", 1000))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # Bulk inventory import
+    INVENTORY_BULK_CHUNK_SIZE = int(os.getenv("INVENTORY_BULK_CHUNK_SIZE", 2000))
+    INVENTORY_BULK_MAX_ERRORS = int(os.getenv("INVENTORY_BULK_MAX_ERRORS", 1000))
+    STOCK_BATCH_MAX_ITEMS = int(os.getenv("STOCK_BATCH_MAX_ITEMS", 10000))
+
+    # Abandoned cart sweep
+    CART_ABANDONED_AFTER_HOURS = int(os.getenv("CART_ABANDONED_AFTER_HOURS", 24))
+    CART_SWEEP_CHUNK_SIZE = int(os.getenv("CART_SWEEP_CHUNK_SIZE", 500))
 
     # Security
     SECRET_KEY = os.getenv("SECRET_KEY", "your_default_secret_key")  # Replace with a strong key
     TOKEN_EXPIRATION_MINUTES = int(os.getenv("TOKEN_EXPIRATION_MINUTES", 60))  # Token expiry in minutes
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+    JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+    JWT_KEYSET_FILE = os.getenv("JWT_KEYSET_FILE")
+    JWT_PRIVATE_KEY_FILE = os.getenv("JWT_PRIVATE_KEY_FILE")
+    JWT_SIGNING_KID = os.getenv("JWT_SIGNING_KID")
+
+    # Password hashing
+    PASSWORD_HASH_ALGORITHM = os.getenv("PASSWORD_HASH_ALGORITHM", "scrypt")
+    PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", 2 ** 14))
+    PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", 8))
+    PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", 1))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 600000))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+    # Prometheus metrics
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
 
     # Flask settings
     DEBUG = bool(int(os.getenv("FLASK_DEBUG", 1)))  # Debug mode on by default
@@ -51,9 +131,27 @@ class ProductionConfig(Config):
     Attributes:
         ENV (str): Set to "production".
         DEBUG (bool): Always False for production.
+        SQLITE_PROFILE (str): Defaults to the WAL-based "production" profile.
     """
     ENV = "production"
     DEBUG = False
+    SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+# SQLite pragmas applied to every new connection, by profile name.
+# "default" keeps SQLite's rollback journal; "production" enables WAL so readers
+# never block the single writer, and waits on locks instead of failing immediately.
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KIB", 65536)),  # Negative values are KiB
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    },
+}
 
 # Config dictionary for different environments
 config_by_name = {
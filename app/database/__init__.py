@@ -1,23 +1,21 @@
 """
 Database Initialization Module.
 
-This module configures the SQLite database engine and provides a session factory
-for database interactions.
+This module exposes the shared database engine and session factory for database
+interactions. Engines are owned by ``app.database.connection`` so that every service in
+the process shares one connection pool per database URL.
 
 Attributes:
-    DATABASE_URL (str): The URL for connecting to the SQLite database.
+    DATABASE_URL (str): The URL for connecting to the database.
     engine (Engine): The SQLAlchemy engine for managing connections to the database.
     SessionLocal (sessionmaker): A session factory for creating database sessions.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from app.config import get_config
+from app.database.connection import engine, session_factory
 
-# SQLite database URL
-DATABASE_URL = "sqlite:///ecommerce.db"
-
-# Create the database engine
-engine = create_engine(DATABASE_URL)
+# Database URL from the active configuration
+DATABASE_URL = get_config().DATABASE_URL
 
 # Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = session_factory
@@ -0,0 +1,100 @@
+"""
+Abandoned Cart Sweep Module.
+
+This module finds cart lines older than a threshold, hands them to a notification
+sink and deletes them, working in chunks so that no single transaction holds the
+database for long:
+
+- ``SELECT ... FROM Cart JOIN customers ... WHERE AddedAt < :t ORDER BY CustomerID, ItemID LIMIT :n``
+- ``DELETE FROM Cart WHERE AddedAt < :t AND (CustomerID, ItemID) > :previous AND (CustomerID, ItemID) <= :last``
+
+Chunks are delimited by the (CustomerID, ItemID) primary key, so each chunk costs
+one select and one bulk delete regardless of how many customers it covers. The sink
+is called after a chunk commits, so customers are only notified about lines that
+were actually removed.
+
+Functions:
+    sweep_abandoned_carts(notify, threshold, chunk_size): Notify about and delete stale cart lines.
+"""
+
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, tuple_
+from app.config import get_config
+from app.database.models import Cart, Customer
+from app.database.connection import run_transaction
+
+def _sweep_chunk(session, threshold, after, chunk_size):
+    """
+    Select and delete the next chunk of stale cart lines after the ``after`` key.
+
+    Returns:
+        tuple[list[Row], int]: The selected lines and the number of rows deleted.
+    """
+    stale = Cart.AddedAt < threshold
+    key = tuple_(Cart.CustomerID, Cart.ItemID)
+    stmt = (
+        select(Cart.CustomerID, Customer.Username, Cart.ItemID, Cart.Quantity, Cart.AddedAt)
+        .join(Customer, Customer.CustomerID == Cart.CustomerID)
+        .where(stale)
+        .order_by(Cart.CustomerID, Cart.ItemID)
+        .limit(chunk_size)
+    )
+    if after is not None:
+        stmt = stmt.where(key > tuple_(*after))
+    rows = session.execute(stmt).all()
+
+    # The last chunk has no upper bound, so orphaned lines past the final match go too
+    deleted = delete(Cart).where(stale)
+    if len(rows) == chunk_size:
+        deleted = deleted.where(key <= tuple_(rows[-1].CustomerID, rows[-1].ItemID))
+    if after is not None:
+        deleted = deleted.where(key > tuple_(*after))
+    result = session.execute(deleted.execution_options(synchronize_session=False))
+    return rows, result.rowcount
+
+def sweep_abandoned_carts(notify=None, threshold=None, chunk_size=None):
+    """
+    Notify customers about abandoned cart lines and delete them.
+
+    Lines of carts whose customer no longer exists are deleted without a notification.
+
+    Args:
+        notify (Callable[[list[Row]], None], optional): Sink called once per committed
+            chunk with rows of (CustomerID, Username, ItemID, Quantity, AddedAt).
+        threshold (datetime, optional): Lines added before this time are abandoned.
+            Defaults to ``Config.CART_ABANDONED_AFTER_HOURS`` ago.
+        chunk_size (int, optional): Lines per transaction. Defaults to
+            ``Config.CART_SWEEP_CHUNK_SIZE``.
+
+    Returns:
+        dict: Chunks, LinesNotified, RowsDeleted, Customers and DurationSeconds of the sweep.
+    """
+    config = get_config()
+    if threshold is None:
+        threshold = datetime.utcnow() - timedelta(hours=config.CART_ABANDONED_AFTER_HOURS)
+    chunk_size = chunk_size or config.CART_SWEEP_CHUNK_SIZE
+
+    started = time.perf_counter()
+    chunks = notified = deleted = 0
+    customers = set()
+    after = None
+    while True:
+        rows, removed = run_transaction(lambda session: _sweep_chunk(session, threshold, after, chunk_size))
+        chunks += 1
+        notified += len(rows)
+        deleted += removed
+        customers.update(row.CustomerID for row in rows)
+        if notify is not None and rows:
+            notify(rows)
+        if len(rows) < chunk_size:
+            break
+        after = (rows[-1].CustomerID, rows[-1].ItemID)
+
+    return {
+        "Chunks": chunks,
+        "LinesNotified": notified,
+        "RowsDeleted": deleted,
+        "Customers": len(customers),
+        "DurationSeconds": round(time.perf_counter() - started, 6),
+    }
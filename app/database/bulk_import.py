@@ -0,0 +1,44 @@
+"""
+Bulk Inventory Import Module.
+
+This module upserts validated inventory rows with one prepared statement per chunk,
+executed for every row of the chunk (``executemany``):
+
+- ``INSERT INTO inventory_items (...) VALUES (...) ON CONFLICT (ItemID) DO UPDATE SET ...``
+
+SQLite compiles the statement once and reuses it for each row, so a chunk costs one
+round of parsing and planning without running into SQLite's bound-variable limit.
+
+Rows carrying an ``ItemID`` replace the existing item with that ID; rows whose
+``ItemID`` is None are inserted as new items. Functions are meant to be run through
+``app.database.connection.run_transaction``, one transaction per chunk.
+
+Functions:
+    upsert_items(session, rows): Insert or update a chunk of inventory rows.
+"""
+
+from sqlalchemy.dialects.sqlite import insert
+from app.database.models import InventoryItem
+
+UPSERT_COLUMNS = ("Name", "Category", "PricePerItem", "Description", "StockCount")
+
+def upsert_items(session, rows):
+    """
+    Insert or update a chunk of inventory rows with a single executemany statement.
+
+    Args:
+        session (Session): SQLAlchemy session of the chunk's transaction.
+        rows (list[dict]): Validated rows with ItemID (or None) and every UPSERT_COLUMNS key.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if not rows:
+        return 0
+    stmt = insert(InventoryItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[InventoryItem.ItemID],
+        set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+    )
+    session.execute(stmt, rows)
+    return len(rows)
@@ -0,0 +1,185 @@
+"""
+Product Catalogue Cache Module.
+
+This module serves read-only projections of ``InventoryItem`` rows through a
+read-through cache, so that catalogue reads on a warm cache never touch the
+database. Every write path that changes an item must call ``invalidate_items``
+after its transaction commits.
+
+Goods listings are filtered, ordered and paginated in SQL, reading only the columns
+of the ``ix_inventory_items_category_price_stock`` covering index when a category is
+given. Only the default listing (first page, no filters) is cached.
+
+Functions:
+    get_item(item_id): Return the cached projection of one item.
+    list_goods(...): Return one filtered and sorted page of goods.
+    list_available_goods(): Return the cached first page of in-stock goods.
+    invalidate_items(*item_ids): Drop cached entries for changed items.
+    invalidate_all(): Drop every cached catalogue entry.
+    configure_cache(config): Apply cache size, TTL and shared backend settings.
+
+Attributes:
+    catalogue_cache (ReadThroughCache): The process-wide catalogue cache.
+"""
+
+from sqlalchemy import event, select, tuple_
+from app.config import get_config
+from app.database.models import Base, InventoryItem, Session
+from app.utils.cache import ReadThroughCache, LocalSharedBackend
+from app.utils.pagination import encode_cursor
+
+LISTING_KEY = "goods:available"
+
+# Orders of the goods listing: sort column name and whether it is descending. Ties
+# are broken by ItemID in the same direction, so a page's keyset is (sort value, ItemID).
+GOODS_SORTS = {
+    "id": ("ItemID", False),
+    "price": ("PricePerItem", False),
+    "-price": ("PricePerItem", True),
+    "name": ("Name", False),
+}
+
+GOODS_COLUMNS = (
+    InventoryItem.ItemID, InventoryItem.Name, InventoryItem.Category,
+    InventoryItem.PricePerItem, InventoryItem.StockCount,
+)
+
+catalogue_cache = ReadThroughCache()
+
+def configure_cache(config=None):
+    """
+    Apply the catalogue cache settings of a configuration class.
+
+    Args:
+        config (class, optional): Configuration class. Defaults to ``get_config()``.
+    """
+    config = config or get_config()
+    catalogue_cache.local.maxsize = config.CATALOGUE_CACHE_SIZE
+    catalogue_cache.local.ttl = config.CATALOGUE_CACHE_TTL
+    backend = LocalSharedBackend() if config.CATALOGUE_CACHE_BACKEND == "local" else None
+    catalogue_cache.set_shared_backend(backend)
+
+def item_key(item_id):
+    """Return the cache key of an item projection."""
+    return f"item:{item_id}"
+
+def _load_item(item_id):
+    """Load the projection of one item from the database, or None if it does not exist."""
+    session = Session()
+    try:
+        row = session.execute(
+            select(
+                InventoryItem.ItemID, InventoryItem.Name, InventoryItem.Category,
+                InventoryItem.PricePerItem, InventoryItem.Description,
+                InventoryItem.StockCount, InventoryItem.CreatedAt,
+            ).where(InventoryItem.ItemID == item_id)
+        ).first()
+    finally:
+        session.close()
+    if row is None:
+        return None
+    item = row._asdict()
+    item["CreatedAt"] = row.CreatedAt.isoformat() if row.CreatedAt else None
+    return item
+
+def list_goods(category=None, min_price=None, max_price=None, in_stock=True, sort="id", limit=100, after=None):
+    """
+    Return one page of goods, filtered and ordered in SQL.
+
+    Args:
+        category (str, optional): Only list goods of this category.
+        min_price (float, optional): Lowest price per item, inclusive.
+        max_price (float, optional): Highest price per item, inclusive.
+        in_stock (bool): Only list goods with stock.
+        sort (str): Key of ``GOODS_SORTS``.
+        limit (int): Page size.
+        after (list, optional): Decoded cursor: ``[ItemID]`` for the "id" sort, otherwise
+            ``[sort value, ItemID]`` of the previous page's last row.
+
+    Returns:
+        tuple: The page as a list of dicts (ItemID, Name, Category, Price, StockCount)
+        and the cursor of the next page, or None on the last page.
+    """
+    name, descending = GOODS_SORTS[sort]
+    column = getattr(InventoryItem, name)
+    stmt = select(*GOODS_COLUMNS)
+    if category is not None:
+        stmt = stmt.where(InventoryItem.Category == category)
+    if min_price is not None:
+        stmt = stmt.where(InventoryItem.PricePerItem >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(InventoryItem.PricePerItem <= max_price)
+    if in_stock:
+        stmt = stmt.where(InventoryItem.StockCount > 0)
+    if sort == "id":
+        if after is not None:
+            stmt = stmt.where(InventoryItem.ItemID > after[0])
+        stmt = stmt.order_by(InventoryItem.ItemID)
+    else:
+        if after is not None:
+            key, bound = tuple_(column, InventoryItem.ItemID), tuple_(*after)
+            stmt = stmt.where(key < bound if descending else key > bound)
+        order = (column.desc(), InventoryItem.ItemID.desc()) if descending else (column, InventoryItem.ItemID)
+        stmt = stmt.order_by(*order)
+
+    session = Session()
+    try:
+        rows = session.execute(stmt.limit(limit + 1)).all()
+    finally:
+        session.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last.ItemID) if sort == "id" else encode_cursor(getattr(last, name), last.ItemID)
+    return [
+        {"ItemID": item_id, "Name": item_name, "Category": item_category, "Price": price, "StockCount": stock}
+        for item_id, item_name, item_category, price, stock in rows[:limit]
+    ], next_cursor
+
+def get_item(item_id):
+    """
+    Return the projection of an item, loading it on a cache miss.
+
+    Args:
+        item_id (int): ID of the item.
+
+    Returns:
+        dict | None: ItemID, Name, Category, PricePerItem, Description, StockCount and
+        ISO-formatted CreatedAt, or None if the item does not exist.
+    """
+    return catalogue_cache.get_or_load(item_key(item_id), lambda: _load_item(item_id))
+
+def _load_available_goods():
+    """Load the first page of in-stock goods from the database."""
+    items, next_cursor = list_goods(limit=get_config().PAGE_SIZE_DEFAULT)
+    return {"items": items, "next_cursor": next_cursor}
+
+def list_available_goods():
+    """
+    Return the default goods listing, loading it on a cache miss.
+
+    Returns:
+        tuple: The first page of in-stock goods in ItemID order, as returned by
+        ``list_goods``, and the cursor of the next page.
+    """
+    listing = catalogue_cache.get_or_load(LISTING_KEY, _load_available_goods)
+    return listing["items"], listing["next_cursor"]
+
+def invalidate_items(*item_ids):
+    """
+    Drop the cached projections of changed items and the goods listing.
+
+    Args:
+        *item_ids (int): IDs of the items that were inserted, updated or sold.
+    """
+    catalogue_cache.invalidate(LISTING_KEY, *(item_key(item_id) for item_id in item_ids))
+
+def invalidate_all():
+    """Drop every cached catalogue entry, e.g. after a bulk import."""
+    catalogue_cache.clear()
+
+# Recreating the schema (as the test suites do) discards every cached projection
+event.listen(Base.metadata, "after_drop", lambda *args, **kwargs: catalogue_cache.clear())
+
+configure_cache()
@@ -0,0 +1,164 @@
+"""
+Checkout Module.
+
+This module implements the write path of a purchase as a handful of set-based
+statements, so that the transaction is short and no stock or wallet value is ever
+read into Python and written back:
+
+- ``UPDATE inventory_items SET StockCount = StockCount - :q WHERE ... AND StockCount >= :q``
+- ``UPDATE customers SET WalletBalance = WalletBalance - :t WHERE ... AND WalletBalance >= :t``
+- ``INSERT INTO sales ...``
+
+A guarded update that matches no row means the purchase is not possible; the
+caller's transaction is then rolled back by raising ``CheckoutError``. Functions are
+meant to be run through ``app.database.connection.run_transaction``.
+
+Classes:
+    CheckoutError: Raised when a purchase is rejected.
+
+Functions:
+    checkout_item(session, customer_username, item_name, quantity): Buy one item.
+    checkout_cart(session, customer_id): Buy every item in a customer's cart at once.
+"""
+
+from sqlalchemy import select, update, insert, delete, case
+from app.database.models import Customer, InventoryItem, Sale, Cart
+from app.database.copurchase import record_purchases
+
+class CheckoutError(Exception):
+    """
+    Raised when a purchase cannot be completed.
+
+    Attributes:
+        message (str): Error message returned to the client.
+        status_code (int): HTTP status code of the error response.
+    """
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def debit_wallet(session, customer_id, amount):
+    """
+    Deduct ``amount`` from a wallet if, and only if, the balance covers it.
+
+    Args:
+        session (Session): Session of the checkout transaction.
+        customer_id (int): ID of the paying customer.
+        amount (float): Amount to deduct.
+
+    Raises:
+        CheckoutError: If the wallet balance is insufficient.
+    """
+    result = session.execute(
+        update(Customer)
+        .where(Customer.CustomerID == customer_id, Customer.WalletBalance >= amount)
+        .values(WalletBalance=Customer.WalletBalance - amount)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise CheckoutError("Insufficient wallet balance")
+
+def checkout_item(session, customer_username, item_name, quantity):
+    """
+    Buy ``quantity`` units of an item for a customer.
+
+    Args:
+        session (Session): Session of the checkout transaction.
+        customer_username (str): Username of the purchasing customer.
+        item_name (str): Name of the item to purchase.
+        quantity (int): Number of units to purchase.
+
+    Returns:
+        Sale: The recorded sale.
+
+    Raises:
+        CheckoutError: If the customer or item does not exist, or if stock or
+        wallet balance is insufficient.
+    """
+    customer_id = session.scalar(select(Customer.CustomerID).where(Customer.Username == customer_username))
+    if customer_id is None:
+        raise CheckoutError("Customer not found", 404)
+    item = session.execute(
+        select(InventoryItem.ItemID, InventoryItem.PricePerItem).where(InventoryItem.Name == item_name).limit(1)
+    ).first()
+    if item is None:
+        raise CheckoutError("Item not found", 404)
+
+    result = session.execute(
+        update(InventoryItem)
+        .where(InventoryItem.ItemID == item.ItemID, InventoryItem.StockCount >= quantity)
+        .values(StockCount=InventoryItem.StockCount - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise CheckoutError("Insufficient stock")
+
+    total_price = item.PricePerItem * quantity
+    debit_wallet(session, customer_id, total_price)
+
+    # Keep the co-purchase index in step with the sale
+    record_purchases(session, customer_id, [item.ItemID])
+
+    sale = Sale(CustomerID=customer_id, ItemID=item.ItemID, Quantity=quantity, TotalPrice=total_price)
+    session.add(sale)
+    return sale
+
+def checkout_cart(session, customer_id):
+    """
+    Convert every line of a customer's cart into sales.
+
+    The cart is loaded and priced with one joined query. Stock for all lines is
+    decremented by a single guarded ``UPDATE`` with a ``CASE`` per item, the wallet
+    is debited once, the sales are bulk inserted and the cart is cleared, all in
+    the caller's transaction.
+
+    Args:
+        session (Session): Session of the checkout transaction.
+        customer_id (int): ID of the purchasing customer.
+
+    Returns:
+        dict: Number of items purchased, the total price charged and the purchased item IDs.
+
+    Raises:
+        CheckoutError: If the customer does not exist, the cart is empty, or stock
+        or wallet balance is insufficient.
+    """
+    lines = session.execute(
+        select(Cart.ItemID, Cart.Quantity, InventoryItem.PricePerItem, InventoryItem.StockCount)
+        .join(InventoryItem, InventoryItem.ItemID == Cart.ItemID)
+        .where(Cart.CustomerID == customer_id)
+    ).all()
+    if not lines:
+        if session.get(Customer, customer_id) is None:
+            raise CheckoutError("Customer not found", 404)
+        raise CheckoutError("Cart is empty")
+
+    quantities = {line.ItemID: line.Quantity for line in lines}
+    quantity_for_item = case(quantities, value=InventoryItem.ItemID)
+    result = session.execute(
+        update(InventoryItem)
+        .where(InventoryItem.ItemID.in_(quantities), InventoryItem.StockCount >= quantity_for_item)
+        .values(StockCount=InventoryItem.StockCount - quantity_for_item)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(lines):
+        short = [line.ItemID for line in lines if line.StockCount < line.Quantity]
+        raise CheckoutError(f"Insufficient stock for items: {short}" if short else "Insufficient stock")
+
+    total_price = sum(line.PricePerItem * line.Quantity for line in lines)
+    debit_wallet(session, customer_id, total_price)
+
+    # Keep the co-purchase index in step with the sales
+    record_purchases(session, customer_id, quantities)
+
+    session.execute(insert(Sale), [
+        {
+            "CustomerID": customer_id,
+            "ItemID": line.ItemID,
+            "Quantity": line.Quantity,
+            "TotalPrice": line.PricePerItem * line.Quantity,
+        } for line in lines
+    ])
+    session.execute(delete(Cart).where(Cart.CustomerID == customer_id))
+    return {"ItemsPurchased": len(lines), "TotalPrice": total_price, "ItemIDs": list(quantities)}
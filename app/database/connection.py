@@ -0,0 +1,216 @@
+"""
+Database Connection Module.
+
+This module owns every SQLAlchemy engine used by the application. Engines are created
+once per database URL, configured from ``app.config`` (pool sizing, pre-ping,
+recycling and the SQLite pragma profile), and shared by all services so that a process holds a single connection
+pool per database instead of one per blueprint.
+
+It also provides the per-request scoped session used by the blueprints, a teardown
+hook that always closes it, a retrying transaction runner, and pool metrics for export.
+
+Functions:
+    get_engine(url, config): Return the shared engine for a database URL.
+    get_session_factory(url): Return the shared session factory for a database URL.
+    remove_session(exception): Close and discard the current scoped session.
+    run_transaction(work, attempts, backoff_ms): Run work in a transaction, retrying on lock conflicts.
+    pool_metrics(url): Return connection pool statistics for an engine.
+
+Attributes:
+    engine (Engine): The engine for ``Config.DATABASE_URL``.
+    session_factory (sessionmaker): Plain session factory bound to ``engine``.
+    Session (scoped_session): Thread-local session registry bound to ``engine``.
+"""
+
+import random
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+from app.config import get_config, SQLITE_PROFILES
+from app.database.instrumentation import CountingConnection
+
+_engines = {}
+_session_factories = {}
+_pool_counters = {}
+_lock = threading.Lock()
+
+def _is_memory_sqlite(url):
+    """Return True for in-memory SQLite URLs, which use a non-queue pool."""
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def _engine_options(url, config):
+    """
+    Build the keyword arguments passed to ``create_engine`` for a URL.
+
+    Args:
+        url (URL): Parsed database URL.
+        config (class): Configuration class providing the pool settings.
+
+    Returns:
+        dict: Engine keyword arguments.
+    """
+    options = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite":
+        # Lets the request metrics count rows returned by SELECTs
+        options["connect_args"] = {"factory": CountingConnection}
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    return options
+
+def _install_pool_listeners(engine, counters):
+    """Attach pool event listeners that maintain the connection counters."""
+    def count(name):
+        def listener(*args):
+            counters[name] += 1
+        return listener
+
+    event.listen(engine, "connect", count("connects"))
+    event.listen(engine, "checkout", count("checkouts"))
+    event.listen(engine, "checkin", count("checkins"))
+    event.listen(engine, "invalidate", count("invalidations"))
+
+def _install_sqlite_pragmas(engine, pragmas):
+    """Attach a listener that applies the SQLite pragmas to every new connection."""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+def get_engine(url=None, config=None):
+    """
+    Return the shared engine for a database URL, creating it on first use.
+
+    Args:
+        url (str, optional): Database URL. Defaults to ``Config.DATABASE_URL``.
+        config (class, optional): Configuration class. Defaults to ``get_config()``.
+
+    Returns:
+        Engine: The engine registered for ``url``.
+    """
+    config = config or get_config()
+    url = url or config.DATABASE_URL
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            parsed_url = make_url(url)
+            engine = create_engine(url, **_engine_options(parsed_url, config))
+            if parsed_url.get_backend_name() == "sqlite":
+                _install_sqlite_pragmas(engine, SQLITE_PROFILES[config.SQLITE_PROFILE])
+            counters = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0}
+            _install_pool_listeners(engine, counters)
+            _pool_counters[url] = counters
+            _engines[url] = engine
+    return engine
+
+def get_session_factory(url=None):
+    """
+    Return the shared session factory for a database URL.
+
+    Args:
+        url (str, optional): Database URL. Defaults to ``Config.DATABASE_URL``.
+
+    Returns:
+        sessionmaker: Session factory bound to the shared engine for ``url``.
+    """
+    engine = get_engine(url)
+    with _lock:
+        factory = _session_factories.get(engine.url)
+        if factory is None:
+            factory = sessionmaker(bind=engine)
+            _session_factories[engine.url] = factory
+    return factory
+
+def remove_session(exception=None):
+    """
+    Close and discard the session bound to the current thread.
+
+    Registered as a request teardown handler by every blueprint so that sessions
+    are closed even when a handler returns early without closing its own.
+
+    Args:
+        exception (Exception, optional): Exception raised by the request, if any.
+    """
+    Session.remove()
+
+def is_lock_conflict(error):
+    """
+    Tell whether a database error was caused by a competing writer.
+
+    Args:
+        error (OperationalError): Error raised by the database driver.
+
+    Returns:
+        bool: True if retrying the transaction may succeed.
+    """
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+def run_transaction(work, attempts=None, backoff_ms=None):
+    """
+    Run ``work(session)`` in one short transaction and commit it.
+
+    The transaction is rolled back if ``work`` raises. Lock conflicts with other
+    writers are retried with jittered exponential backoff; any other exception is
+    re-raised to the caller after the rollback.
+
+    Args:
+        work (Callable[[Session], Any]): Function issuing the statements of the transaction.
+        attempts (int, optional): Maximum attempts. Defaults to ``Config.TRANSACTION_RETRY_ATTEMPTS``.
+        backoff_ms (int, optional): Base backoff. Defaults to ``Config.TRANSACTION_RETRY_BACKOFF_MS``.
+
+    Returns:
+        Any: The value returned by ``work``.
+    """
+    config = get_config()
+    attempts = attempts or config.TRANSACTION_RETRY_ATTEMPTS
+    backoff_ms = config.TRANSACTION_RETRY_BACKOFF_MS if backoff_ms is None else backoff_ms
+    for attempt in range(1, attempts + 1):
+        session = Session()
+        try:
+            result = work(session)
+            session.commit()
+            return result
+        except OperationalError as error:
+            session.rollback()
+            if attempt == attempts or not is_lock_conflict(error):
+                raise
+        except Exception:
+            session.rollback()
+            raise
+        time.sleep(backoff_ms * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5) / 1000)
+
+def pool_metrics(url=None):
+    """
+    Return connection pool statistics for the engine of a database URL.
+
+    Args:
+        url (str, optional): Database URL. Defaults to ``Config.DATABASE_URL``.
+
+    Returns:
+        dict: Pool class, size, checked-in/checked-out/overflow connections and
+        cumulative connect, checkout, checkin and invalidation counts.
+    """
+    engine = get_engine(url)
+    pool = engine.pool
+    metrics = {"url": engine.url.render_as_string(hide_password=True), "pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            metrics[name] = method()
+    metrics.update(_pool_counters.get(url or get_config().DATABASE_URL, {}))
+    return metrics
+
+engine = get_engine()
+session_factory = get_session_factory()
+Session = scoped_session(session_factory)
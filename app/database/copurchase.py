@@ -0,0 +1,120 @@
+"""
+Item Co-Purchase Index Module.
+
+This module maintains the ``item_copurchases`` table, a sparse item-to-item index
+holding, for every pair of distinct items, the number of customers who bought both.
+The index is built in bulk from the ``sales`` table and then kept up to date
+incrementally every time a sale is committed, so that recommendations can be served
+with a single indexed lookup instead of a scan over all sales.
+
+Functions:
+    rebuild_copurchase_index(session): Rebuild the whole index from the sales table.
+    record_purchases(session, customer_id, item_ids): Update the index for new purchases.
+    recommend_for_items(session, item_ids, limit): Rank items co-purchased with item_ids.
+"""
+
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.database.models import ItemCoPurchase, InventoryItem, Sale
+
+def rebuild_copurchase_index(session):
+    """
+    Rebuild the co-purchase index from scratch with a single set-based statement.
+
+    The caller is responsible for committing the session.
+
+    Args:
+        session (Session): SQLAlchemy session to run the rebuild in.
+
+    Returns:
+        int: Number of directed item pairs written to the index.
+    """
+    purchases = select(Sale.CustomerID, Sale.ItemID).distinct().subquery()
+    left = purchases.alias("a")
+    right = purchases.alias("b")
+    pairs = (
+        select(left.c.ItemID, right.c.ItemID, func.count())
+        .join(right, (left.c.CustomerID == right.c.CustomerID) & (left.c.ItemID != right.c.ItemID))
+        .group_by(left.c.ItemID, right.c.ItemID)
+    )
+    session.execute(delete(ItemCoPurchase))
+    result = session.execute(
+        insert(ItemCoPurchase).from_select(["ItemID", "RelatedItemID", "Count"], pairs)
+    )
+    return result.rowcount
+
+def record_purchases(session, customer_id, item_ids):
+    """
+    Incrementally update the co-purchase index for items a customer is buying.
+
+    Must be called inside the sale transaction *before* the new ``Sale`` rows are
+    inserted, since items the customer has already bought do not create new pairs.
+
+    Args:
+        session (Session): SQLAlchemy session of the sale transaction.
+        customer_id (int): ID of the purchasing customer.
+        item_ids (Iterable[int]): IDs of the items being purchased.
+    """
+    previous = set(session.scalars(
+        select(Sale.ItemID).where(Sale.CustomerID == customer_id).distinct()
+    ))
+    new_items = set(item_ids) - previous
+    if not new_items:
+        return
+
+    pairs = []
+    for item_id in new_items:
+        for related_id in previous:
+            pairs.append({"ItemID": item_id, "RelatedItemID": related_id, "Count": 1})
+            pairs.append({"ItemID": related_id, "RelatedItemID": item_id, "Count": 1})
+        for related_id in new_items:
+            if related_id != item_id:
+                pairs.append({"ItemID": item_id, "RelatedItemID": related_id, "Count": 1})
+    if not pairs:
+        return
+
+    stmt = sqlite_insert(ItemCoPurchase)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ItemCoPurchase.ItemID, ItemCoPurchase.RelatedItemID],
+        set_={"Count": ItemCoPurchase.Count + stmt.excluded.Count},
+    )
+    session.execute(stmt, pairs)
+
+def recommend_for_items(session, item_ids, limit=5):
+    """
+    Rank the items most often co-purchased with ``item_ids``.
+
+    The cost is proportional to the number of neighbours stored for ``item_ids``,
+    independent of the size of the sales table.
+
+    Args:
+        session (Session): SQLAlchemy session used for the lookup.
+        item_ids (Collection[int]): IDs of the items the customer already bought.
+        limit (int): Maximum number of recommendations to return.
+
+    Returns:
+        list[Row]: Rows of (ItemID, Name, PricePerItem, Score), best match first.
+    """
+    if not item_ids:
+        return []
+    score = func.sum(ItemCoPurchase.Count).label("Score")
+    stmt = (
+        select(InventoryItem.ItemID, InventoryItem.Name, InventoryItem.PricePerItem, score)
+        .join(InventoryItem, InventoryItem.ItemID == ItemCoPurchase.RelatedItemID)
+        .where(ItemCoPurchase.ItemID.in_(item_ids), ItemCoPurchase.RelatedItemID.not_in(item_ids))
+        .group_by(InventoryItem.ItemID, InventoryItem.Name, InventoryItem.PricePerItem)
+        .order_by(score.desc(), InventoryItem.ItemID)
+        .limit(limit)
+    )
+    return session.execute(stmt).all()
+
+if __name__ == "__main__":
+    from app.database.models import Base, Session, engine
+    Base.metadata.create_all(engine)
+    session = Session()
+    try:
+        written = rebuild_copurchase_index(session)
+        session.commit()
+        print(f"Co-purchase index rebuilt with {written} item pairs.")
+    finally:
+        session.close()
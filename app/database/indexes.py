@@ -0,0 +1,114 @@
+"""
+Database Index Maintenance Module.
+
+This module keeps the secondary indexes declared on the models in step with
+existing database files and reports how SQLite plans the queries issued by each
+route, so that missing indexes show up as full table scans.
+
+``Base.metadata.create_all`` only creates missing tables; indexes added to tables
+that already exist are created by ``ensure_indexes``.
+
+Functions:
+    ensure_indexes(engine): Create every declared index missing from the database.
+    route_queries(): Return representative statements issued by each route.
+    explain_query_plans(engine): Return the EXPLAIN QUERY PLAN of every route query.
+
+Usage:
+    python -m app.database.indexes
+"""
+
+from datetime import datetime
+from sqlalchemy import inspect, select, update, func
+from app.database.models import Base, Cart, Customer, InventoryItem, ItemCoPurchase, Review, Sale, Wishlist
+
+def ensure_indexes(engine):
+    """
+    Create every index declared on the models that is missing from the database.
+
+    Args:
+        engine (Engine): Engine of the database to migrate.
+
+    Returns:
+        list[str]: Names of the indexes that were created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    return created
+
+def route_queries():
+    """
+    Return representative statements issued by each route, with sample parameters.
+
+    Returns:
+        dict[str, Executable]: Statements keyed by "METHOD /route: purpose".
+    """
+    return {
+        "GET /customers/: page": select(Customer.CustomerID, Customer.Username)
+            .where(Customer.CustomerID > 100).order_by(Customer.CustomerID).limit(100),
+        "GET /customers/<username>": select(Customer).where(Customer.Username == "johndoe"),
+        "GET /customers/<id>/wishlist": select(Wishlist.itemID).where(Wishlist.customerID == 1),
+        "GET /cart/<id>/cart": select(Cart.ItemID, Cart.Quantity).where(Cart.CustomerID == 1),
+        "POST /sales/sale: item lookup": select(InventoryItem.ItemID, InventoryItem.PricePerItem)
+            .where(InventoryItem.Name == "Laptop").limit(1),
+        "POST /sales/sale: stock debit": update(InventoryItem)
+            .where(InventoryItem.ItemID == 1, InventoryItem.StockCount >= 1)
+            .values(StockCount=InventoryItem.StockCount - 1),
+        "POST /sales/sale: customer's previous items": select(Sale.ItemID)
+            .where(Sale.CustomerID == 1).distinct(),
+        "GET /sales/goods/<id>": select(InventoryItem).where(InventoryItem.ItemID == 1),
+        "Items by category": select(InventoryItem.ItemID).where(InventoryItem.Category == "Electronics"),
+        "GET /sales/goods: category by price": select(
+            InventoryItem.ItemID, InventoryItem.Name, InventoryItem.Category,
+            InventoryItem.PricePerItem, InventoryItem.StockCount,
+        ).where(
+            InventoryItem.Category == "Electronics", InventoryItem.PricePerItem.between(10, 500),
+            InventoryItem.StockCount > 0,
+        ).order_by(InventoryItem.PricePerItem, InventoryItem.ItemID).limit(100),
+        "Sales of an item": select(func.sum(Sale.Quantity)).where(Sale.ItemID == 1),
+        "GET /reviews/product/<id>": select(Review).where(Review.ItemID == 1).order_by(Review.CreatedAt.desc()),
+        "GET /reviews/customer/<id>": select(Review).where(Review.CustomerID == 1).order_by(Review.CreatedAt.desc()),
+        "Abandoned cart sweep": select(Cart.CustomerID, Cart.ItemID).where(Cart.AddedAt < datetime(2024, 1, 1)),
+        "GET /recommendations/recommend/<id>": select(ItemCoPurchase.RelatedItemID, ItemCoPurchase.Count)
+            .where(ItemCoPurchase.ItemID.in_([1, 2])),
+    }
+
+def explain_query_plans(engine):
+    """
+    Run ``EXPLAIN QUERY PLAN`` for every route query.
+
+    Args:
+        engine (Engine): Engine of an SQLite database with the current schema.
+
+    Returns:
+        list[dict]: One entry per route with the plan lines and a ``full_scan`` flag
+        set when a table is scanned without using any index.
+    """
+    report = []
+    with engine.connect() as connection:
+        for route, statement in route_queries().items():
+            compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+            plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+            full_scan = any(line.startswith("SCAN") and "INDEX" not in line for line in plan)
+            report.append({"route": route, "plan": plan, "full_scan": full_scan})
+    return report
+
+if __name__ == "__main__":
+    from app.database.models import engine
+    Base.metadata.create_all(engine)
+    for name in ensure_indexes(engine):
+        print(f"Created index {name}")
+    for entry in explain_query_plans(engine):
+        marker = "FULL SCAN" if entry["full_scan"] else "indexed"
+        print(f"[{marker:>9}] {entry['route']}")
+        for line in entry["plan"]:
+            print(f"            {line}")
@@ -0,0 +1,368 @@
+"""
+Query Instrumentation Module.
+
+This module measures the SQL work of every request. Statement hooks on all engines
+(``before_cursor_execute``/``after_cursor_execute``) feed the active counters of the
+current thread with the statement count, database time and slowest statement, and
+SQLite connections created with ``CountingConnection`` report the rows fetched.
+
+Two consumers are built on the counters:
+
+- Query budgets: routes declare how many statements a request may cost with
+  ``@query_budget``. Exceeding the budget raises ``QueryBudgetExceeded`` when the
+  Flask app is in testing mode, which makes N+1 query regressions fail the tests.
+- Request metrics: ``install_request_metrics`` adds a ``Server-Timing`` header to
+  every response and summarises each endpoint in ``request_metrics`` with p50, p95
+  and p99 histograms of request time, database time and statement count.
+
+Classes:
+    QueryBudgetExceeded: Raised when a route runs more statements than its budget.
+    QueryCounter: Context manager measuring the statements run on the current thread.
+    CountingConnection: SQLite connection whose cursors report the rows they fetch.
+    Histogram: Fixed-bucket histogram with percentile estimates.
+    RequestMetrics: Per-endpoint request and SQL statistics.
+
+Functions:
+    query_budget(limit): Decorator declaring the statement budget of a route.
+    install_request_metrics(app, metrics): Measure every request of a Flask app.
+
+Attributes:
+    request_metrics (RequestMetrics): The process-wide request statistics.
+"""
+
+import bisect
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_active = threading.local()
+
+def _counters():
+    return getattr(_active, "counters", ())
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in testing mode when a route executes more statements than its budget."""
+
+class QueryCounter:
+    """
+    Measures the SQL statements executed on the current thread while active.
+
+    Counters nest; every active counter sees the statements of its inner counters.
+
+    Attributes:
+        count (int): Number of statements executed.
+        duration (float): Total database time in seconds.
+        rows (int): Rows fetched by SELECTs (on ``CountingConnection``) plus rows
+            changed by other statements.
+        slowest (tuple[float, str] | None): Duration and text of the slowest statement.
+        statements (list[str] | None): The statements, in execution order, when
+            created with ``keep_statements``; otherwise None, so long-running
+            counters do not grow with the work they measure.
+
+    Args:
+        keep_statements (bool): Record the text of every statement.
+    """
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.slowest = None
+        self.statements = [] if keep_statements else None
+
+    def __enter__(self):
+        counters = getattr(_active, "counters", None)
+        if counters is None:
+            counters = _active.counters = []
+        counters.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self in _counters():
+            _active.counters.remove(self)
+        return False
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    counters = _counters()
+    for counter in counters:
+        counter.count += 1
+        if counter.statements is not None:
+            counter.statements.append(statement)
+    if counters:
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("statement_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    changed = cursor.rowcount if cursor.description is None and cursor.rowcount > 0 else 0
+    for counter in _counters():
+        counter.duration += elapsed
+        counter.rows += changed
+        if counter.slowest is None or elapsed > counter.slowest[0]:
+            counter.slowest = (elapsed, statement)
+
+@event.listens_for(Engine, "handle_error")
+def _abort_statement(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
+def _count_rows(rows):
+    for counter in _counters():
+        counter.rows += rows
+
+class _CountingCursor(sqlite3.Cursor):
+    """SQLite cursor that reports the rows it fetches to the active counters."""
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _count_rows(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        _count_rows(len(rows))
+        return rows
+
+class CountingConnection(sqlite3.Connection):
+    """
+    SQLite connection whose cursors report fetched rows to the active counters.
+
+    Passed as the ``factory`` connect argument of SQLite engines, since the driver
+    does not report the number of rows a SELECT returns.
+    """
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+def query_budget(limit):
+    """
+    Declare the number of SQL statements a route may execute per request.
+
+    Apply below ``@route`` (and ``@require_auth``) so only the view itself is counted.
+
+    Args:
+        limit (int): Largest number of statements the view may execute.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Statement texts are only needed for the testing-mode failure message
+            with QueryCounter(keep_statements=current_app.testing) as counter:
+                response = view(*args, **kwargs)
+            g.query_count = counter.count
+            if counter.count > limit and current_app.testing:
+                raise QueryBudgetExceeded(
+                    f"{request.method} {request.path} executed {counter.count} statements, "
+                    f"budget is {limit}:\n" + "\n".join(counter.statements)
+                )
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+class Histogram:
+    """
+    Fixed-bucket histogram with percentile estimates.
+
+    Memory does not grow with the number of observations; a percentile is reported as
+    the upper bound of the bucket holding it, so estimates are at most one bucket
+    (about 25%) above the true value.
+
+    Args:
+        bounds (Sequence[float]): Increasing bucket upper bounds; larger values fall
+            into a final overflow bucket reported as the largest value observed.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99.
+
+        Returns:
+            float | None: Upper bound of the bucket holding the percentile, or None
+            without observations.
+        """
+        if not self.total:
+            return None
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        """Return the count, mean, p50, p95, p99 and max of the observations."""
+        return {
+            "count": self.total,
+            "mean": self.sum / self.total if self.total else None,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+# Bucket bounds: 0.05 ms to about 70 s in 25% steps, and statement counts 0 to 1000
+MILLISECOND_BOUNDS = [0.05 * 1.25 ** step for step in range(64)]
+STATEMENT_BOUNDS = [0, 1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 75, 100, 150, 200, 300, 500, 1000]
+
+class RequestMetrics:
+    """
+    Per-endpoint request and SQL statistics of this process.
+
+    Each endpoint keeps histograms of request time, database time and statement
+    count, the total rows fetched and its slowest statement.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, status, duration_ms, counter):
+        """
+        Record one finished request.
+
+        Args:
+            endpoint (str): Flask endpoint name, e.g. "sales.display_goods".
+            status (int): Response status code.
+            duration_ms (float): Request time in milliseconds.
+            counter (QueryCounter): SQL measurements of the request.
+        """
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "rows": 0,
+                    "duration_ms": Histogram(MILLISECOND_BOUNDS),
+                    "db_time_ms": Histogram(MILLISECOND_BOUNDS),
+                    "statements": Histogram(STATEMENT_BOUNDS),
+                    "slowest_statement": None,
+                }
+            stats["requests"] += 1
+            stats["errors"] += status >= 500
+            stats["rows"] += counter.rows
+            stats["duration_ms"].observe(duration_ms)
+            stats["db_time_ms"].observe(counter.duration * 1000)
+            stats["statements"].observe(counter.count)
+            if counter.slowest is not None:
+                slowest_ms = counter.slowest[0] * 1000
+                if stats["slowest_statement"] is None or slowest_ms > stats["slowest_statement"]["ms"]:
+                    stats["slowest_statement"] = {"ms": slowest_ms, "sql": counter.slowest[1]}
+
+    def snapshot(self):
+        """
+        Return the statistics of every endpoint.
+
+        Returns:
+            dict: Per-endpoint requests, errors, rows, slowest statement and the
+            summaries of the duration_ms, db_time_ms and statements histograms.
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    name: value.summary() if isinstance(value, Histogram) else value
+                    for name, value in stats.items()
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        """Discard every recorded request."""
+        with self._lock:
+            self._endpoints.clear()
+
+request_metrics = RequestMetrics()
+
+def install_request_metrics(app, metrics=None):
+    """
+    Measure every request of a Flask app.
+
+    Adds a ``Server-Timing`` header (``db`` time with statement and row counts,
+    ``db-slowest`` and ``app`` time) to each response and records the request in the
+    metrics registry under its endpoint name.
+
+    Streamed responses (such as the table exports) run their SQL while the body is
+    sent, after the headers are final. They get no ``Server-Timing`` header and are
+    recorded when the body is closed, so their statistics cover the whole stream.
+
+    Args:
+        app (Flask): Application to instrument.
+        metrics (RequestMetrics, optional): Registry. Defaults to ``request_metrics``.
+    """
+    metrics = metrics or request_metrics
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        g.request_counter = QueryCounter().__enter__()
+
+    @app.after_request
+    def finish_request_metrics(response):
+        counter = g.pop("request_counter", None)
+        if counter is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        if response.is_streamed:
+            started = g.request_started
+
+            def finish_stream_metrics():
+                counter.__exit__(None, None, None)
+                duration_ms = (time.perf_counter() - started) * 1000
+                metrics.record(endpoint, response.status_code, duration_ms, counter)
+
+            response.call_on_close(finish_stream_metrics)
+            return response
+        counter.__exit__(None, None, None)
+        duration_ms = (time.perf_counter() - g.request_started) * 1000
+        timings = [
+            f'db;dur={counter.duration * 1000:.2f};desc="{counter.count} queries, {counter.rows} rows"',
+            f"app;dur={duration_ms:.2f}",
+        ]
+        if counter.slowest is not None:
+            timings.insert(1, f"db-slowest;dur={counter.slowest[0] * 1000:.2f}")
+        response.headers.add("Server-Timing", ", ".join(timings))
+        metrics.record(endpoint, response.status_code, duration_ms, counter)
+        return response
+
+    @app.teardown_request
+    def discard_request_metrics(exception=None):
+        counter = g.pop("request_counter", None)
+        if counter is not None:
+            counter.__exit__(None, None, None)
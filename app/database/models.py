@@ -7,25 +7,32 @@ This module defines the SQLAlchemy ORM models for the e-commerce application. It
 - Sale: Represents purchase transactions between customers and inventory items.
 - Review: Represents customer reviews for inventory items.
 - Cart: Represents items added to the shopping cart.
+- ItemCoPurchase: Sparse item-to-item co-purchase counts used by recommendations.
+- StockBatch: Applied stock adjustment batches, for idempotent replays.
+- ReviewStats: Per-item review aggregates maintained with every review write.
+
+On SQLite, ``inventory_items`` is mirrored into the FTS5 table ``inventory_fts``
+(Name and Description), kept in sync by triggers created and dropped with the table.
+Its terms are listed by the ``fts5vocab`` table ``inventory_fts_terms``.
 
 Functions:
     init_db(engine_url): Initializes the database and creates all tables.
 
 Attributes:
-    engine (Engine): The SQLAlchemy engine for managing database connections.
-    Session (sessionmaker): A session factory for database operations.
+    engine (Engine): The shared SQLAlchemy engine for managing database connections.
+    Session (scoped_session): The shared per-request session registry for database operations.
     Base (declarative_base): Base class for all ORM models.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, DateTime, Table, UniqueConstraint, Boolean, MetaData
-from sqlalchemy.orm import relationship, sessionmaker, declarative_base
+from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, DateTime, Table, UniqueConstraint, Boolean, MetaData, Index, DDL, event
+from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
+from app.config import get_config
+from app.database.connection import get_engine, engine, Session
 
-DATABASE_URL = "sqlite:///ecommerce.db"
+DATABASE_URL = get_config().DATABASE_URL
 
 # Database setup
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)  # Define the sessionmaker
 Base = declarative_base()
 metadata = MetaData()
 
@@ -38,6 +45,7 @@ class Wishlist(Base):
 
     customer = relationship("Customer", backref="Wishlist")
     inventory_item = relationship("InventoryItem", backref="Wishlist")
+    # The unique (customerID, itemID) index also serves lookups by customerID
     __table_args__ = (UniqueConstraint('customerID', 'itemID', name='unique_wishlist_entry'),)
 
 class Customer(Base):
@@ -90,6 +98,42 @@ class InventoryItem(Base):
     Description = Column(String, nullable=True)
     StockCount = Column(Integer, nullable=False)
     CreatedAt = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index("ix_inventory_items_name", "Name"),
+        # Covers the filtered goods listing: category, price range and stock are
+        # resolved in the index, which also holds every listed column (ItemID is the rowid)
+        Index("ix_inventory_items_category_price_stock", "Category", "PricePerItem", "StockCount", "Name"),
+    )
+
+# Lengths of the prefixes indexed by inventory_fts; prefix queries of other lengths
+# merge the doclists of every matching term when they run
+INVENTORY_FTS_PREFIX_LENGTHS = (2, 3)
+
+# Full-text index over item names and descriptions. It is an external-content FTS5
+# table, so it stores only the index; triggers mirror inserts, deletes and changes to
+# Name or Description (stock updates do not touch it). inventory_fts_terms lists the
+# indexed terms, one row per occurrence, read lazily in term order.
+INVENTORY_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5("
+    "Name, Description, content='inventory_items', content_rowid='ItemID', "
+    f"prefix='{' '.join(map(str, INVENTORY_FTS_PREFIX_LENGTHS))}')",
+    "CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory_items BEGIN "
+    "INSERT INTO inventory_fts(rowid, Name, Description) VALUES (new.ItemID, new.Name, new.Description); END",
+    "CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory_items BEGIN "
+    "INSERT INTO inventory_fts(inventory_fts, rowid, Name, Description) "
+    "VALUES ('delete', old.ItemID, old.Name, old.Description); END",
+    "CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE OF Name, Description ON inventory_items BEGIN "
+    "INSERT INTO inventory_fts(inventory_fts, rowid, Name, Description) "
+    "VALUES ('delete', old.ItemID, old.Name, old.Description); "
+    "INSERT INTO inventory_fts(rowid, Name, Description) VALUES (new.ItemID, new.Name, new.Description); END",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts_terms USING fts5vocab(inventory_fts, instance)",
+)
+for statement in INVENTORY_FTS_DDL:
+    event.listen(InventoryItem.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for table_name in ("inventory_fts_terms", "inventory_fts"):
+    event.listen(
+        InventoryItem.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {table_name}").execute_if(dialect="sqlite")
+    )
 
 class Sale(Base):
     """
@@ -114,6 +158,10 @@ class Sale(Base):
     SoldAt = Column(DateTime, default=datetime.utcnow)
     customer = relationship("Customer", backref="sales")
     inventory_item = relationship("InventoryItem", backref="sales")
+    __table_args__ = (
+        Index("ix_sales_customer_item", "CustomerID", "ItemID"),
+        Index("ix_sales_item", "ItemID"),
+    )
 
 class Review(Base):
     """
@@ -138,6 +186,10 @@ class Review(Base):
     CreatedAt = Column(DateTime, default=datetime.utcnow)
     customer = relationship("Customer", backref="reviews")
     inventory_item = relationship("InventoryItem", backref="reviews")
+    __table_args__ = (
+        Index("ix_reviews_item_created", "ItemID", "CreatedAt"),
+        Index("ix_reviews_customer_created", "CustomerID", "CreatedAt"),
+    )
 
 class Cart(Base):
     """
@@ -158,16 +210,76 @@ class Cart(Base):
 
     customer = relationship("Customer", backref="Cart")
     inventory_item = relationship("InventoryItem", backref="Cart")
-    __table_args__ = (UniqueConstraint('CustomerID', 'ItemID', name='unique_cart_entry'),)
+    __table_args__ = (
+        UniqueConstraint('CustomerID', 'ItemID', name='unique_cart_entry'),
+        Index("ix_cart_added_at", "AddedAt"),
+    )
+
+class ItemCoPurchase(Base):
+    """
+    Represents one directed edge of the item-to-item co-purchase index.
+
+    Every pair of distinct items bought by the same customer is stored twice
+    (A -> B and B -> A) so that neighbours of an item can be read with a single
+    primary-key range scan.
+
+    Attributes:
+        ItemID (int): ID of the source inventory item.
+        RelatedItemID (int): ID of an item also bought by customers of ItemID.
+        Count (int): Number of distinct customers who bought both items.
+    """
+    __tablename__ = "item_copurchases"
+    ItemID = Column(Integer, ForeignKey("inventory_items.ItemID"), primary_key=True)
+    RelatedItemID = Column(Integer, ForeignKey("inventory_items.ItemID"), primary_key=True)
+    Count = Column(Integer, nullable=False, default=0)
+
+class StockBatch(Base):
+    """
+    Records a stock adjustment batch that has been applied, for idempotent replays.
+
+    Attributes:
+        BatchID (str): Client-supplied identifier of the batch.
+        Report (str): JSON report returned when the batch was applied.
+        AppliedAt (datetime): Timestamp when the batch was applied.
+    """
+    __tablename__ = "stock_batches"
+    BatchID = Column(String, primary_key=True)
+    Report = Column(String, nullable=False)
+    AppliedAt = Column(DateTime, default=datetime.utcnow)
+
+class ReviewStats(Base):
+    """
+    Holds the review aggregates of one inventory item.
+
+    Rows are updated in the same transaction as every review write, so a product's
+    rating summary is read with a single primary-key lookup.
+
+    Attributes:
+        ItemID (int): ID of the reviewed inventory item.
+        ReviewCount (int): Number of reviews.
+        RatingSum (int): Sum of all ratings.
+        Rating1 .. Rating5 (int): Number of reviews with each rating.
+        FlaggedCount (int): Number of reviews flagged for moderation.
+    """
+    __tablename__ = "review_stats"
+    ItemID = Column(Integer, ForeignKey("inventory_items.ItemID"), primary_key=True)
+    ReviewCount = Column(Integer, nullable=False, default=0)
+    RatingSum = Column(Integer, nullable=False, default=0)
+    Rating1 = Column(Integer, nullable=False, default=0)
+    Rating2 = Column(Integer, nullable=False, default=0)
+    Rating3 = Column(Integer, nullable=False, default=0)
+    Rating4 = Column(Integer, nullable=False, default=0)
+    Rating5 = Column(Integer, nullable=False, default=0)
+    FlaggedCount = Column(Integer, nullable=False, default=0)
 
 # Function to initialize the database
-def init_db(engine_url="sqlite:///ecommerce.db"):
+def init_db(engine_url=None):
     """
     Initializes the database and creates all tables.
 
     Args:
-        engine_url (str): The database URL to connect to. Defaults to SQLite database.
+        engine_url (str, optional): The database URL to connect to. Defaults to ``Config.DATABASE_URL``.
     """    
-    engine = create_engine(engine_url)
+    engine = get_engine(engine_url)
     Base.metadata.create_all(engine)
     print("Tables created (if not already existing).")
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Review Aggregates Module.
+
+This module maintains the ``review_stats`` table, which holds for every reviewed
+item its review count, rating sum, rating histogram and flagged count. The table is
+built in bulk from the ``reviews`` table and then kept up to date incrementally by
+every review write, in the same transaction, so that a rating summary costs a single
+primary-key lookup instead of a scan over the item's reviews.
+
+Ratings were not validated before the table existed, so legacy reviews may hold
+ratings outside 1 to 5. Those reviews count towards the review count and rating sum
+but fall in no histogram bucket, both in the rebuild and in incremental updates.
+
+Functions:
+    rebuild_review_stats(session): Rebuild the whole table from the reviews table.
+    ensure_review_stats(engine): Build the table on databases that predate it.
+    adjust_review_stats(session, item_id, removed, added): Apply one review change.
+    get_review_summary(session, item_id): Return the rating summary of an item.
+"""
+
+from sqlalchemy import select, delete, insert, exists, func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.database.models import Review, ReviewStats
+
+RATINGS = (1, 2, 3, 4, 5)
+COUNTER_COLUMNS = ("ReviewCount", "RatingSum", *(f"Rating{rating}" for rating in RATINGS), "FlaggedCount")
+
+def rebuild_review_stats(session):
+    """
+    Rebuild the review aggregates from scratch with a single set-based statement.
+
+    The caller is responsible for committing the session.
+
+    Args:
+        session (Session): SQLAlchemy session to run the rebuild in.
+
+    Returns:
+        int: Number of items with reviews.
+    """
+    aggregates = select(
+        Review.ItemID,
+        func.count(),
+        func.sum(Review.Rating),
+        *(func.sum(case((Review.Rating == rating, 1), else_=0)) for rating in RATINGS),
+        func.sum(case((Review.IsFlagged, 1), else_=0)),
+    ).group_by(Review.ItemID)
+    session.execute(delete(ReviewStats))
+    result = session.execute(
+        insert(ReviewStats).from_select(["ItemID", *COUNTER_COLUMNS], aggregates)
+    )
+    return result.rowcount
+
+def ensure_review_stats(engine):
+    """
+    Build the review aggregates if the table is empty but reviews exist.
+
+    Databases created before the table existed get it populated here.
+
+    Args:
+        engine (Engine): Database engine.
+
+    Returns:
+        bool: True if the aggregates were rebuilt.
+    """
+    with Session(engine) as session:
+        if session.scalar(select(exists().select_from(ReviewStats))) or \
+                not session.scalar(select(exists().select_from(Review))):
+            return False
+        rebuild_review_stats(session)
+        session.commit()
+    return True
+
+def adjust_review_stats(session, item_id, removed=None, added=None):
+    """
+    Apply one review change to the aggregates of an item with a single upsert.
+
+    Must be called inside the transaction of the review write.
+
+    Args:
+        session (Session): SQLAlchemy session of the review transaction.
+        item_id (int): ID of the reviewed item.
+        removed (tuple[int, bool], optional): (Rating, IsFlagged) of the review before
+            the change, or None for a new review.
+        added (tuple[int, bool], optional): (Rating, IsFlagged) of the review after the
+            change, or None for a deleted review.
+    """
+    deltas = dict.fromkeys(COUNTER_COLUMNS, 0)
+    for state, sign in ((removed, -1), (added, 1)):
+        if state is None:
+            continue
+        rating, flagged = state
+        deltas["ReviewCount"] += sign
+        deltas["RatingSum"] += sign * rating
+        if rating in RATINGS:
+            deltas[f"Rating{rating}"] += sign
+        deltas["FlaggedCount"] += sign * bool(flagged)
+    if not any(deltas.values()):
+        return
+
+    stmt = sqlite_insert(ReviewStats).values(ItemID=item_id, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReviewStats.ItemID],
+        set_={column: getattr(ReviewStats, column) + stmt.excluded[column] for column in COUNTER_COLUMNS},
+    )
+    session.execute(stmt)
+
+def get_review_summary(session, item_id):
+    """
+    Return the rating summary of an item.
+
+    Args:
+        session (Session): SQLAlchemy session used for the lookup.
+        item_id (int): ID of the item.
+
+    Returns:
+        dict: ItemID, ReviewCount, AverageRating (None without reviews), Histogram
+        (review count per rating, keyed "1" to "5") and FlaggedCount.
+    """
+    row = session.execute(
+        select(*(getattr(ReviewStats, column) for column in COUNTER_COLUMNS)).where(ReviewStats.ItemID == item_id)
+    ).first()
+    counts = dict(zip(COUNTER_COLUMNS, row)) if row is not None else dict.fromkeys(COUNTER_COLUMNS, 0)
+    return {
+        "ItemID": item_id,
+        "ReviewCount": counts["ReviewCount"],
+        "AverageRating": round(counts["RatingSum"] / counts["ReviewCount"], 2) if counts["ReviewCount"] else None,
+        "Histogram": {str(rating): counts[f"Rating{rating}"] for rating in RATINGS},
+        "FlaggedCount": counts["FlaggedCount"],
+    }
+
+if __name__ == "__main__":
+    from app.database.models import Base, engine
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        written = rebuild_review_stats(session)
+        session.commit()
+    print(f"Review aggregates rebuilt for {written} items.")
@@ -0,0 +1,229 @@
+"""
+Product Search Module.
+
+This module answers full-text product searches from the FTS5 table
+``inventory_fts`` declared with the models. Every word of a query must match. The
+last word may still be being typed: it matches exactly when the index holds it as a
+complete word, and as a prefix otherwise, so results follow the user while typing.
+
+FTS5 only answers prefixes of the indexed lengths (``INVENTORY_FTS_PREFIX_LENGTHS``)
+from the index; a longer prefix merges the doclists of every term it covers before
+returning a row, which takes tens of milliseconds for common words on a large
+catalogue. Such a prefix is therefore looked up in the ``inventory_fts_terms``
+vocabulary first and, when it covers at most ``MAX_PREFIX_TERMS`` terms, replaced by
+those terms, whose doclists are read lazily.
+
+Searches matching at most ``Config.SEARCH_MAX_CANDIDATES`` items are ranked by BM25,
+with matches in the name weighing more than matches in the description. BM25 counts
+every document containing each query word, so its cost grows with the catalogue for
+common words; searches matching more items than the limit, or with a word matching
+more than ``MAX_RANKED_WORD_MATCHES`` items, are therefore returned in ItemID order,
+read one page at a time from the index. The first page reads the matches once, up
+to the limit, to both count them and answer a broad search. Both orders paginate by
+keyset on ``(rank, ItemID)``, with a rank of 0 for unranked results. BM25 ranks are
+always negative, so a cursor's rank tells which order it belongs to.
+
+Functions:
+    ensure_search_index(engine): Create and populate the index on an existing database.
+    build_match_query(session, text): Turn user input into a safe FTS5 query.
+    search_items(session, text, category, limit, after): Return one page of matches.
+"""
+
+import re
+from sqlalchemy import inspect, text as sql
+from app.config import get_config
+from app.database.models import INVENTORY_FTS_DDL, INVENTORY_FTS_PREFIX_LENGTHS
+
+# BM25 column weights of (Name, Description)
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Rank of results listed in ItemID order
+UNRANKED = 0.0
+
+# Most vocabulary terms an unindexed prefix is replaced by
+MAX_PREFIX_TERMS = 16
+
+# Most items a word of a ranked search may match, which bounds the documents BM25 counts
+MAX_RANKED_WORD_MATCHES = 5000
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Terms of the index starting with :prefix, in order, stopping after the prefix itself
+# when it is a complete word. Each step seeks past the previous term (no tokenizer
+# emits control characters) and reads one occurrence of the next one.
+PREFIX_TERMS = sql(
+    "WITH RECURSIVE terms(term) AS ("
+    "SELECT (SELECT term FROM inventory_fts_terms WHERE term >= :prefix LIMIT 1) "
+    "UNION ALL "
+    "SELECT (SELECT next.term FROM inventory_fts_terms AS next WHERE next.term >= terms.term || char(1) LIMIT 1) "
+    "FROM terms WHERE substr(terms.term, 1, length(:prefix)) = :prefix AND terms.term != :prefix"
+    ") SELECT term FROM terms WHERE substr(term, 1, length(:prefix)) = :prefix LIMIT :most"
+)
+
+def ensure_search_index(engine):
+    """
+    Create the full-text index, its triggers and vocabulary if missing, and populate it.
+
+    Databases created before the index existed get it here; ``create_all`` creates it
+    together with ``inventory_items`` on new databases.
+
+    Args:
+        engine (Engine): Engine of an SQLite database.
+
+    Returns:
+        bool: True if the index or its vocabulary was created.
+    """
+    if engine.dialect.name != "sqlite":
+        return False
+    tables = set(inspect(engine).get_table_names())
+    if "inventory_items" not in tables or {"inventory_fts", "inventory_fts_terms"} <= tables:
+        return False
+    with engine.begin() as connection:
+        for statement in INVENTORY_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        if "inventory_fts" not in tables:
+            connection.exec_driver_sql("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    return True
+
+def _last_word_query(session, word):
+    """
+    Return the FTS5 query of the last word of a search, or None if no item can match it.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        word (str): The last word entered by the user.
+
+    Returns:
+        str | None: A quoted term, a prefix query, or an OR group of the terms a prefix covers.
+    """
+    if not (word.isascii() and word.isalnum()):
+        # The vocabulary holds single folded terms; words the tokenizer splits or folds
+        # differently keep the plain prefix query
+        return f'"{word}"*'
+    prefix = word.lower()
+    indexed = len(prefix) in INVENTORY_FTS_PREFIX_LENGTHS
+    terms = session.execute(
+        PREFIX_TERMS, {"prefix": prefix, "most": 1 if indexed else MAX_PREFIX_TERMS + 1}
+    ).scalars().all()
+    if not terms:
+        return None
+    if terms[0] == prefix:
+        return f'"{word}"'
+    if indexed or len(terms) > MAX_PREFIX_TERMS:
+        return f'"{word}"*'
+    return "(" + " OR ".join(f'"{term}"' for term in terms) + ")"
+
+def _word_queries(session, text):
+    """
+    Return the FTS5 query of every word of a search, or None if no item can match it.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        text (str): Search terms entered by the user.
+
+    Returns:
+        list[str] | None: One query per word, the last one as returned by ``_last_word_query``.
+    """
+    tokens = TOKEN_PATTERN.findall(text or "")
+    if not tokens:
+        return None
+    last = _last_word_query(session, tokens[-1])
+    if last is None:
+        return None
+    return [*(f'"{token}"' for token in tokens[:-1]), last]
+
+def build_match_query(session, text):
+    """
+    Turn user input into an FTS5 query matching every word, the last one as typed so far.
+
+    Words are quoted, so FTS5 operators in the input are searched for literally.
+
+    Args:
+        session (Session): SQLAlchemy session, to look the last word up in the index vocabulary.
+        text (str): Search terms entered by the user.
+
+    Returns:
+        str | None: The MATCH expression, or None if the input has no searchable word or
+        no indexed word starts with its last word.
+    """
+    words = _word_queries(session, text)
+    return " AND ".join(words) if words else None
+
+def search_items(session, text, category=None, limit=20, after=None):
+    """
+    Return one page of items matching a search, best match first.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        text (str): Search terms.
+        category (str, optional): Only return items of this category.
+        limit (int): Page size.
+        after (tuple[float, int], optional): ``(rank, ItemID)`` of the last row of the previous page.
+
+    Returns:
+        list[Row]: Rows of (ItemID, Name, Category, PricePerItem, StockCount, Rank), at
+        most ``limit + 1`` so the caller can tell whether another page exists.
+    """
+    words = _word_queries(session, text)
+    if not words:
+        return []
+    match = " AND ".join(words)
+    after_rank, after_id = after if after is not None else (None, 0)
+    candidates = get_config().SEARCH_MAX_CANDIDATES
+    params = {"match": match, "limit": limit + 1, "after_id": after_id}
+    category_condition = ""
+    if category:
+        category_condition = "AND i.Category = :category "
+        params["category"] = category
+    # Rows come out of the index in rowid order (CROSS JOIN keeps it the outer loop),
+    # so the scan stops after one page instead of sorting every match
+    columns = "i.ItemID, i.Name, i.Category, i.PricePerItem, i.StockCount"
+    listed = (
+        f"SELECT {columns}, {UNRANKED} AS Rank "
+        "FROM inventory_fts CROSS JOIN inventory_items AS i ON i.ItemID = inventory_fts.rowid "
+        f"WHERE inventory_fts MATCH :match {category_condition}AND inventory_fts.rowid > "
+    )
+    if after_rank == UNRANKED:
+        # Later page of a broad search, listed on in ItemID order
+        return session.execute(sql(f"{listed}:after_id ORDER BY inventory_fts.rowid LIMIT :limit"), params).all()
+
+    # The matches read for the count, in ItemID order, start the first page of a broad
+    # search; the index is only read on past them when they do not fill the page. Each
+    # part runs only when the search takes its order: the check gates its LIMIT, which
+    # SQLite tests before opening a cursor (a WHERE condition would be tested on every
+    # match). BM25 counts the matches of every word, which for one word the count
+    # bounds already. A ranked cursor on a search that can no longer be ranked gets no
+    # rows.
+    rankable = ["(SELECT count(*) FROM hits) <= :candidates"]
+    if len(words) > 1:
+        for index, word in enumerate(words):
+            rankable.append(
+                "(SELECT count(*) FROM (SELECT rowid FROM inventory_fts "
+                f"WHERE inventory_fts MATCH :word_{index} LIMIT :word_probe)) <= :word_matches"
+            )
+            params[f"word_{index}"] = word
+    params.update(
+        probe=candidates + 1, candidates=candidates, first_page=after is None,
+        word_matches=MAX_RANKED_WORD_MATCHES, word_probe=MAX_RANKED_WORD_MATCHES + 1,
+        after_rank=after_rank, name_weight=NAME_WEIGHT, description_weight=DESCRIPTION_WEIGHT,
+    )
+    query = sql(
+        "WITH hits AS MATERIALIZED (SELECT rowid AS ItemID FROM inventory_fts WHERE inventory_fts MATCH :match LIMIT :probe), "
+        f"ranking AS MATERIALIZED (SELECT {' AND '.join(rankable)} AS ranked) "
+        f"SELECT * FROM (SELECT {columns}, {UNRANKED} AS Rank "
+        "FROM hits CROSS JOIN inventory_items AS i ON i.ItemID = hits.ItemID "
+        f"WHERE 1 {category_condition}"
+        f"UNION ALL {listed}(SELECT max(ItemID) FROM hits) "
+        "LIMIT CASE WHEN :first_page AND NOT (SELECT ranked FROM ranking) THEN :limit ELSE 0 END) "
+        "UNION ALL "
+        "SELECT * FROM (SELECT * FROM ("
+        f"SELECT {columns}, bm25(inventory_fts, :name_weight, :description_weight) AS Rank "
+        "FROM inventory_fts CROSS JOIN inventory_items AS i ON i.ItemID = inventory_fts.rowid "
+        f"WHERE inventory_fts MATCH :match {category_condition}"
+        ") AS ranked WHERE :after_rank IS NULL OR ranked.Rank > :after_rank "
+        "OR (ranked.Rank = :after_rank AND ranked.ItemID > :after_id) "
+        "ORDER BY ranked.Rank, ranked.ItemID "
+        "LIMIT CASE WHEN (SELECT ranked FROM ranking) THEN :limit ELSE 0 END)"
+    )
+    return session.execute(query, params).all()
@@ -0,0 +1,83 @@
+"""
+Stock Adjustment Module.
+
+This module applies batches of signed stock deltas, as pushed by the warehouse
+management system, with set-based statements inside a single transaction:
+
+- ``UPDATE inventory_items SET StockCount = StockCount + CASE ItemID WHEN ... END
+  WHERE ItemID IN (...) AND StockCount + CASE ItemID WHEN ... END >= 0 RETURNING ItemID, StockCount``
+
+Items missing from the ``RETURNING`` rows were rejected, either because they do not
+exist or because the delta would make their stock negative; the rest of the batch
+is still applied. Each batch is recorded in ``stock_batches`` under its batch ID,
+together with its report, so a batch that is sent again is not re-applied and the
+original report is returned instead. Functions are meant to be run through
+``app.database.connection.run_transaction``.
+
+Functions:
+    apply_stock_batch(session, batch_id, deltas): Apply a batch of stock deltas once.
+"""
+
+import json
+from sqlalchemy import select, update, case
+from app.database.models import InventoryItem, StockBatch
+
+# Items per UPDATE statement, keeping the bound parameters well below SQLite's limit
+STATEMENT_SIZE = 1000
+
+def _apply_deltas(session, deltas):
+    """Apply ``{item_id: delta}`` with guarded updates; return ``{item_id: new stock}`` of applied items."""
+    applied = {}
+    item_ids = list(deltas)
+    for start in range(0, len(item_ids), STATEMENT_SIZE):
+        chunk = {item_id: deltas[item_id] for item_id in item_ids[start:start + STATEMENT_SIZE]}
+        new_stock = InventoryItem.StockCount + case(chunk, value=InventoryItem.ItemID, else_=0)
+        rows = session.execute(
+            update(InventoryItem)
+            .where(InventoryItem.ItemID.in_(chunk), new_stock >= 0)
+            .values(StockCount=new_stock)
+            .returning(InventoryItem.ItemID, InventoryItem.StockCount)
+            .execution_options(synchronize_session=False)
+        ).all()
+        applied.update(rows)
+    return applied
+
+def apply_stock_batch(session, batch_id, deltas):
+    """
+    Apply a batch of signed stock deltas, unless the batch was already applied.
+
+    Args:
+        session (Session): Session of the batch transaction.
+        batch_id (str): Client-supplied idempotency key of the batch.
+        deltas (list[tuple[int, int]]): ``(item_id, delta)`` pairs; deltas of a repeated
+            item are summed.
+
+    Returns:
+        dict: Report with BatchID, Replayed, Applied (ItemID and new StockCount per
+        item) and Rejected (ItemID, Delta and Error per item).
+    """
+    recorded = session.get(StockBatch, batch_id)
+    if recorded is not None:
+        return {**json.loads(recorded.Report), "Replayed": True}
+
+    totals = {}
+    for item_id, delta in deltas:
+        totals[item_id] = totals.get(item_id, 0) + delta
+    applied = _apply_deltas(session, totals)
+
+    rejected_ids = [item_id for item_id in totals if item_id not in applied]
+    existing = set(session.scalars(select(InventoryItem.ItemID).where(InventoryItem.ItemID.in_(rejected_ids))))
+    report = {
+        "BatchID": batch_id,
+        "Applied": [{"ItemID": item_id, "StockCount": stock} for item_id, stock in sorted(applied.items())],
+        "Rejected": [
+            {
+                "ItemID": item_id,
+                "Delta": totals[item_id],
+                "Error": "Insufficient stock" if item_id in existing else "Item not found",
+            }
+            for item_id in rejected_ids
+        ],
+    }
+    session.add(StockBatch(BatchID=batch_id, Report=json.dumps(report)))
+    return {**report, "Replayed": False}
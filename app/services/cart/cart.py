@@ -1,15 +1,26 @@
 from flask import Flask, Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from datetime import datetime
 from pathlib import Path
 import sys
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from database.models import Cart, Customer, InventoryItem, Sale, engine
+from app.database.models import Cart, Customer, InventoryItem, Sale, Session
+from app.database.connection import remove_session, run_transaction
+from app.database.instrumentation import query_budget
+from app.database.checkout import checkout_cart, CheckoutError
+from app.database.catalogue import invalidate_items
+from app.database.abandoned_carts import sweep_abandoned_carts
+from app.utils.validation import Field, Schema, validation_error
 
 cart_bp = Blueprint("cart", __name__)
+cart_bp.teardown_request(remove_session)
 
-Session = sessionmaker(bind=engine)
+# Request payload schema of a cart line
+CART_LINE_SCHEMA = Schema({
+    "item_id": Field(int, minimum=1),
+    "quantity": Field(int, minimum=1, message="Invalid quantity"),
+})
 
 @cart_bp.route("/<int:customer_id>/cart", methods=["POST"])
 def add_to_cart(customer_id):
@@ -23,11 +34,11 @@ def add_to_cart(customer_id):
     Returns:
         JSON message indicating success or failure.
     """
-    data = request.json
-    item_id = data.get("item_id")
-    quantity = data.get("quantity")
-    if not item_id or not quantity:
-        return jsonify({"error": "Missing item_id or quantity"}), 400
+    data, errors = CART_LINE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    item_id = data["item_id"]
+    quantity = data["quantity"]
     
     session = Session()
     try:
@@ -50,22 +61,29 @@ def add_to_cart(customer_id):
         session.close()
 
 @cart_bp.route("/<int:customer_id>/cart", methods=["GET"])
+@query_budget(1)
 def view_cart(customer_id):
     """
     View the customer's cart.
+
+    Cart lines and item names are read with a single joined select.
     
     Returns:
         JSON list of cart items.
     """
     session = Session()
     try:
-        cart_items = session.query(Cart).filter_by(CustomerID=customer_id).all()
+        rows = session.execute(
+            select(Cart.ItemID, InventoryItem.Name, Cart.Quantity, Cart.AddedAt)
+            .join(InventoryItem, InventoryItem.ItemID == Cart.ItemID)
+            .where(Cart.CustomerID == customer_id)
+        ).all()
         cart = [{
-            "ItemID": item.ItemID,
-            "Name": item.inventory_item.Name,
-            "Quantity": item.Quantity,
-            "AddedAt": item.AddedAt.isoformat()
-        } for item in cart_items]
+            "ItemID": item_id,
+            "Name": name,
+            "Quantity": quantity,
+            "AddedAt": added_at.isoformat()
+        } for item_id, name, quantity, added_at in rows]
         return jsonify(cart), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -94,24 +112,58 @@ def remove_from_cart(customer_id, item_id):
     finally:
         session.close()
 
-# Scheduled task to identify abandoned carts
-def identify_abandoned_carts():
-    session = Session()
+@cart_bp.route("/<int:customer_id>/checkout", methods=["POST"])
+def checkout_cart_route(customer_id):
+    """
+    Purchase every item in the customer's cart in a single transaction.
+
+    The whole cart is priced with one query, the wallet is debited once, stock is
+    decremented with one bulk statement, all sales are inserted together and the
+    cart is cleared.
+
+    Returns:
+        JSON message with the number of items purchased and the total price, or an
+        error if the cart is empty or stock or wallet balance is insufficient.
+    """
     try:
-        threshold = datetime.utcnow() - timedelta(hours=24)  # 24 hours threshold
-        abandoned_carts = session.query(Cart).filter(Cart.AddedAt < threshold).all()
-        for cart in abandoned_carts:
-            customer = session.query(Customer).filter_by(CustomerID=cart.CustomerID).first()
-            # Implement notification logic here (e.g., send email)
-            print(f"Notify {customer.Username} about abandoned cart.")
-            session.delete(cart)
-        session.commit()
+        result = run_transaction(lambda session: checkout_cart(session, customer_id))
+        invalidate_items(*result["ItemIDs"])
+        return jsonify({"message": "Checkout completed successfully", **result}), 201
+    except CheckoutError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
-        session.rollback()
-        print(f"Error identifying abandoned carts: {e}")
-    finally:
-        session.close()
-    
+        return jsonify({"error": str(e)}), 500
+
+def notify_abandoned_carts(rows):
+    """
+    Notification sink of the abandoned cart sweep.
+
+    Args:
+        rows (list[Row]): Swept cart lines of (CustomerID, Username, ItemID, Quantity, AddedAt).
+    """
+    customers = {}
+    for row in rows:
+        customers.setdefault(row.Username, []).append(row.ItemID)
+    for username, item_ids in customers.items():
+        # Implement notification logic here (e.g., send email)
+        print(f"Notify {username} about abandoned cart items {item_ids}.")
+
+# Scheduled task to identify abandoned carts
+def identify_abandoned_carts():
+    """
+    Notify customers about cart lines older than the configured threshold and delete them.
+
+    Errors propagate to the caller, so the scheduler's ``timed_job`` wrapper logs the
+    failure and records it as an error run.
+
+    Returns:
+        dict: Sweep statistics, see ``sweep_abandoned_carts``.
+    """
+    stats = sweep_abandoned_carts(notify=notify_abandoned_carts)
+    print(f"Abandoned cart sweep: {stats['RowsDeleted']} rows deleted for "
+          f"{stats['Customers']} customers in {stats['DurationSeconds']:.3f}s")
+    return stats
+
 app = Flask(__name__)
 app.register_blueprint(cart_bp, url_prefix="/cart")
 
@@ -9,30 +9,61 @@ Blueprint:
     customers_bp: Blueprint for the customers service.
 
 Database Session:
-    Session: SQLAlchemy session factory for database interactions.
+    Session: Shared scoped SQLAlchemy session, removed after every request.
 
 Routes:
     /register (POST): Register a new customer.
-    / (GET): Retrieve all customers.
+    / (GET): Retrieve customers, one keyset-paginated page at a time.
+    /export (GET): Stream all customers as NDJSON or CSV.
     /<string:username> (GET): Retrieve a specific customer by username.
     /<int:customer_id> (PUT): Update a customer's information.
     /<int:customer_id> (DELETE): Delete a customer.
     /<int:customer_id>/charge (POST): Add funds to a customer's wallet.
     /<int:customer_id>/deduct (POST): Deduct funds from a customer's wallet.
+    /logout (POST): Revoke the token used to authenticate the request.
 """
 # run: python -m services.customers.customers
-from flask import Flask, Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
+from flask import Flask, Blueprint, request, jsonify, g
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from app.utils.authentication import generate_token, verify_token
-from app.utils.validation import validate_username, validate_password
-from app.database.models import Customer, InventoryItem, Wishlist, engine, Base
+from app.utils.authentication import generate_token, verify_token, revoke_token, require_auth
+from app.utils.validation import (
+    Field, Schema, validation_error, USERNAME_PATTERN, PASSWORD_PATTERN, GENDERS, MARITAL_STATUSES,
+)
+from app.utils.passwords import password_hasher, PasswordHasherBusy
+from app.database.models import Customer, InventoryItem, Wishlist, Session, Base
+from app.database.connection import remove_session
+from app.database.instrumentation import query_budget
+from app.utils.pagination import parse_limit, parse_fields, paginated_response
+from app.utils.streaming import parse_export_format, stream_export
 customers_bp = Blueprint("customers", __name__)
 
-# Database session setup
-Session = sessionmaker(bind=engine)
+# Close the shared scoped session after every request
+customers_bp.teardown_request(remove_session)
+
+# Customer columns that may be listed (never the password hash)
+CUSTOMER_FIELDS = ("CustomerID", "FullName", "Username", "Age", "Address", "Gender", "MaritalStatus", "WalletBalance")
+CUSTOMER_EXPORT_FIELDS = CUSTOMER_FIELDS + ("CreatedAt",)
+
+# Request payload schemas
+CUSTOMER_PAYLOAD_FIELDS = {
+    "FullName": Field(str, min_length=1),
+    "Username": Field(str, pattern=USERNAME_PATTERN, message="Invalid username"),
+    "PasswordHash": Field(str, pattern=PASSWORD_PATTERN, message="Invalid password"),
+    "Age": Field(int, minimum=1, message="Invalid age"),
+    "Address": Field(str),
+    "Gender": Field(str, choices=GENDERS, message="Invalid gender"),
+    "MaritalStatus": Field(str, choices=MARITAL_STATUSES, message="Invalid marital status"),
+}
+REGISTER_SCHEMA = Schema(CUSTOMER_PAYLOAD_FIELDS)
+UPDATE_SCHEMA = Schema(CUSTOMER_PAYLOAD_FIELDS, partial=True)
+LOGIN_SCHEMA = Schema({"Username": Field(str), "PasswordHash": Field(str)})
+WALLET_SCHEMA = Schema({"amount": Field(float, greater_than=0, message="Invalid amount")})
+WISHLIST_SCHEMA = Schema({"item_id": Field(int, minimum=1)})
+CODE_SCHEMA = Schema({"token": Field(str), "code": Field(str)})
 
 @customers_bp.route("/register", methods=["POST"])
 def register_customer():
@@ -42,7 +73,7 @@ def register_customer():
     JSON Parameters:
         FullName (str): Full name of the customer.
         Username (str): Unique username for the customer.
-        PasswordHash (str): Hashed password for the customer.
+        PasswordHash (str): Password of the customer, stored as a salted scrypt/PBKDF2 hash.
         Age (int): Age of the customer.
         Address (str): Address of the customer.
         Gender (str): Gender of the customer.
@@ -51,27 +82,23 @@ def register_customer():
     Returns:
         Response: JSON message indicating success or failure.
     """
-    data = request.json
-    required_fields = ["FullName", "Username", "PasswordHash", "Age", "Address", "Gender", "MaritalStatus"]
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing field: {field}"}), 400
-
-    # Validate username and password
-    if not validate_username(data["Username"]):
-        return jsonify({"error": "Invalid username"}), 400
-
-    if not validate_password(data["PasswordHash"]):
-        return jsonify({"error": "Invalid password"}), 400
+    data, errors = REGISTER_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
 
     session = Session()
     if session.query(Customer).filter_by(Username=data["Username"]).first():
         return jsonify({"error": "Username already taken"}), 400
 
+    try:
+        password_hash = password_hasher.hash_password(data["PasswordHash"])
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503
+
     customer = Customer(
         FullName=data["FullName"],
         Username=data["Username"],
-        PasswordHash=data["PasswordHash"],
+        PasswordHash=password_hash,
         Age=data["Age"],
         Address=data["Address"],
         Gender=data["Gender"],
@@ -86,17 +113,29 @@ def register_customer():
 
 @customers_bp.route("/login", methods=["POST"])
 def login_customer():
-    """Authenticate and generate JWT token for the customer."""
-    data = request.json
-    username = data.get("Username")
-    password = data.get("PasswordHash")
+    """
+    Authenticate and generate JWT token for the customer.
+
+    The password is verified on the password hashing pool. Hashes made with outdated
+    cost parameters (and legacy plain-text passwords) are replaced on success.
+    """
+    data, errors = LOGIN_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    password = data["PasswordHash"]
 
     session = Session()
-    customer = session.query(Customer).filter_by(Username=username).first()
-    
-    if not customer or customer.PasswordHash != password:
+    customer = session.query(Customer).filter_by(Username=data["Username"]).first()
+    try:
+        valid, new_hash = password_hasher.check_password(password, customer.PasswordHash if customer else None)
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503
+    if not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
+    if new_hash:
+        customer.PasswordHash = new_hash
+        session.commit()
     token = generate_token(customer.CustomerID)  # Generate JWT token for the customer
     session.close()
 
@@ -105,9 +144,11 @@ def login_customer():
 @customers_bp.route("/validate_code", methods=["POST"])
 def validate_code_usage():
     """Validate if the customer has permission to use a code."""
-    data = request.json
-    token = data.get("token")
-    code = data.get("code")
+    data, errors = CODE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    token = data["token"]
+    code = data["code"]
 
     # Validate token
     user_id = verify_token(token)
@@ -122,43 +163,83 @@ def validate_code_usage():
 
     return jsonify({"message": "Code is valid"}), 200
 
+@customers_bp.route("/logout", methods=["POST"])
+@require_auth
+def logout_customer():
+    """Revoke the JWT token used to authenticate the request."""
+    revoke_token(request.headers.get("Authorization"))
+    return jsonify({"message": "Logged out"}), 200
+
 # Example of protected route
 @customers_bp.route("/protected", methods=["GET"])
+@require_auth
 def protected_route():
     """A protected route requiring authentication."""
-    token = request.headers.get("Authorization")
-    if not token:
-        return jsonify({"error": "Token is missing"}), 401
-
-    user_id = verify_token(token)
-    if "error" in user_id:
-        return jsonify({"error": user_id["error"]}), 401
-
-    return jsonify({"message": f"Welcome user {user_id['user_id']}"}), 200
+    return jsonify({"message": f"Welcome user {g.token_payload['user_id']}"}), 200
 
 @customers_bp.route("/", methods=["GET"])
+@query_budget(1)
 def get_all_customers():
     """
-    Retrieve all customers.
+    Retrieve customers ordered by CustomerID, one page at a time.
+
+    Pages are selected with a keyset condition (``CustomerID > after``) so every page
+    costs one primary-key range scan, and only the requested columns are read.
+
+    Query Parameters:
+        limit (int, optional): Page size, bounded by ``Config.PAGE_SIZE_MAX``.
+        after (int, optional): CustomerID of the last customer of the previous page.
+        fields (str, optional): Comma-separated customer fields to return.
 
     Returns:
-        Response: JSON list of all customer details.
+        Response: JSON list of customer details. The ``X-Next-Cursor`` header holds
+        the ``after`` value of the next page when more customers exist.
     """
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        after = int(request.args.get("after", 0))
+        fields = parse_fields(request.args.get("fields"), CUSTOMER_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     session = Session()
-    customers = session.query(Customer).all()
-    session.close()
-    return jsonify([
-        {
-            "CustomerID": c.CustomerID,
-            "FullName": c.FullName,
-            "Username": c.Username,
-            "Age": c.Age,
-            "Address": c.Address,
-            "Gender": c.Gender,
-            "MaritalStatus": c.MaritalStatus,
-            "WalletBalance": c.WalletBalance
-        } for c in customers
-    ]), 200
+    try:
+        rows = session.execute(
+            select(Customer.CustomerID, *(getattr(Customer, field) for field in fields))
+            .where(Customer.CustomerID > after)
+            .order_by(Customer.CustomerID)
+            .limit(limit + 1)
+        ).all()
+    finally:
+        session.close()
+
+    next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+    return paginated_response([dict(zip(fields, row[1:])) for row in rows[:limit]], next_cursor), 200
+
+
+@customers_bp.route("/export", methods=["GET"])
+@require_auth
+def export_customers():
+    """
+    Stream every customer as NDJSON or CSV.
+
+    Rows are read with a server-side cursor in fixed-size batches and written to the
+    client as they are produced, so memory use does not grow with the table size.
+
+    Query Parameters:
+        format (str, optional): "ndjson" (default) or "csv".
+        fields (str, optional): Comma-separated Customer fields to export.
+
+    Returns:
+        Response: Streaming NDJSON or CSV download, or a 400 JSON error.
+    """
+    try:
+        export_format = parse_export_format(request.args.get("format"))
+        fields = parse_fields(request.args.get("fields"), CUSTOMER_EXPORT_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = [getattr(Customer, field) for field in fields]
+    return stream_export(columns, Customer.CustomerID, export_format, "customers")
 
 
 @customers_bp.route("/<string:username>", methods=["GET"])
@@ -198,20 +279,29 @@ def update_customer(customer_id):
         customer_id (int): Unique ID of the customer.
 
     JSON Parameters:
-        Any valid customer field: Updated values for the specified fields.
+        Any registration field: Updated values for the specified fields. The wallet
+        balance is changed through the charge and deduct endpoints only.
 
     Returns:
         Response: JSON message indicating success or failure.
     """
-    data = request.json
+    data, errors = UPDATE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+
     session = Session()
     customer = session.query(Customer).filter_by(CustomerID=customer_id).first()
     if not customer:
         return jsonify({"error": "Customer not found"}), 404
 
+    if "PasswordHash" in data:
+        try:
+            data["PasswordHash"] = password_hasher.hash_password(data["PasswordHash"])
+        except PasswordHasherBusy as e:
+            return jsonify({"error": str(e)}), 503
+
     for key, value in data.items():
-        if hasattr(customer, key):
-            setattr(customer, key, value)
+        setattr(customer, key, value)
     session.commit()
     session.close()
     return jsonify({"message": "Customer information updated successfully!"}), 200
@@ -225,18 +315,29 @@ def delete_customer(customer_id):
     URL Parameters:
         customer_id (int): Unique ID of the customer.
 
+    The row is deleted with a single statement, so the ORM does not try to detach
+    dependent rows. Where foreign keys are enforced (the "production" SQLite
+    profile), customers with sales, reviews, cart or wishlist entries are kept.
+
     Returns:
-        Response: JSON message indicating success or failure.
+        Response: JSON message indicating success, 404 if the customer does not
+        exist, or 409 if other records still reference the customer.
     """
     session = Session()
-    customer = session.query(Customer).filter_by(CustomerID=customer_id).first()
-    if not customer:
-        return jsonify({"error": "Customer not found"}), 404
-
-    session.delete(customer)
-    session.commit()
-    session.close()
-    return jsonify({"message": "Customer deleted successfully!"}), 200
+    try:
+        deleted = session.execute(delete(Customer).where(Customer.CustomerID == customer_id)).rowcount
+        if not deleted:
+            return jsonify({"error": "Customer not found"}), 404
+        session.commit()
+        return jsonify({"message": "Customer deleted successfully!"}), 200
+    except IntegrityError:
+        session.rollback()
+        return jsonify({"error": "Customer has sales, reviews, cart or wishlist entries"}), 409
+    except Exception as e:
+        session.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
 
 
 @customers_bp.route("/<int:customer_id>/charge", methods=["POST"])
@@ -253,10 +354,10 @@ def charge_wallet(customer_id):
     Returns:
         Response: JSON message indicating success or failure.
     """
-    data = request.json
-    amount = data.get("amount")
-    if not amount or amount <= 0:
-        return jsonify({"error": "Invalid amount"}), 400
+    data, errors = WALLET_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    amount = data["amount"]
 
     session = Session()
     customer = session.query(Customer).filter_by(CustomerID=customer_id).first()
@@ -283,10 +384,10 @@ def deduct_wallet(customer_id):
     Returns:
         Response: JSON message indicating success or failure.
     """
-    data = request.json
-    amount = data.get("amount")
-    if not amount or amount <= 0:
-        return jsonify({"error": "Invalid amount"}), 400
+    data, errors = WALLET_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    amount = data["amount"]
 
     session = Session()
     customer = session.query(Customer).filter_by(CustomerID=customer_id).first()
@@ -311,10 +412,10 @@ def add_to_wishlist(customer_id):
     Returns:
         JSON message indicating success or failure.
     """
-    data = request.json
-    item_id = data.get("item_id")
-    if not item_id:
-        return jsonify({"error": "Missing item_id"}), 400
+    data, errors = WISHLIST_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    item_id = data["item_id"]
 
     session = Session()
     try:
@@ -339,25 +440,29 @@ def add_to_wishlist(customer_id):
         session.close()
 
 @customers_bp.route("/<int:customer_id>/wishlist", methods=["GET"])
+@query_budget(1)
 def view_wishlist(customer_id):
     """
     View the customer's wishlist.
 
+    Wishlist entries and item details are read with a single joined select.
+
     Returns:
         JSON list of items in the wishlist.
     """
     session = Session()
     try:
-        wishlist_entries = session.query(Wishlist).filter_by(customerID=customer_id).all()
-        if not wishlist_entries:
-            return jsonify([]), 200
-
+        rows = session.execute(
+            select(InventoryItem.ItemID, InventoryItem.Name, InventoryItem.PricePerItem)
+            .join(Wishlist, Wishlist.itemID == InventoryItem.ItemID)
+            .where(Wishlist.customerID == customer_id)
+        ).all()
         wishlist = [
             {
-                "ItemID": entry.itemID,
-                "Name": entry.inventory_item.Name,
-                "PricePerItem": entry.inventory_item.PricePerItem
-            } for entry in wishlist_entries
+                "ItemID": item_id,
+                "Name": name,
+                "PricePerItem": price
+            } for item_id, name, price in rows
         ]
         return jsonify(wishlist), 200
     except Exception as e:
@@ -11,8 +11,11 @@ Blueprint:
 Endpoints:
 ----------
 - POST /add: Add a new good to the inventory.
+- POST /bulk: Insert or update many goods from an NDJSON or CSV upload.
+- POST /stock/batch: Apply a batch of signed stock deltas idempotently.
 - PUT /<int:item_id>: Update details of a specific good.
 - POST /<int:item_id>/deduct: Deduct stock of a specific good.
+- GET /export: Stream all goods as NDJSON or CSV.
 
 Dependencies:
 -------------
@@ -21,34 +24,65 @@ Dependencies:
 """
 
 from flask import Flask, Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from database.models import InventoryItem, engine
-from app.utils.authentication import generate_token, verify_token 
-from app.utils.validation import validate_positive_int
-#from app.database.models import InventoryItem, engine
+from app.database.models import InventoryItem, Session
+from app.config import get_config
+from app.database.connection import remove_session, run_transaction
+from app.database.catalogue import get_item, invalidate_items, invalidate_all
+from app.database.bulk_import import upsert_items
+from app.database.stock import apply_stock_batch
+from sqlalchemy.exc import IntegrityError
+from app.utils.pagination import parse_fields
+from app.utils.streaming import parse_export_format, stream_export, iter_records, MalformedRecord
+from app.utils.authentication import require_auth
+from app.utils.validation import Field, Schema, validation_error
 
 inventory_bp = Blueprint("inventory", __name__)
 
-# Database session setup
-Session = sessionmaker(bind=engine)
+# Close the shared scoped session after every request
+inventory_bp.teardown_request(remove_session)
 
-# Add JWT authentication to the API
-def authenticate_request():
-    """Check for valid JWT token."""
-    token = request.headers.get("Authorization")
-    if not token:
-        return jsonify({"error": "Token is missing"}), 401
+# Inventory item columns that may be exported
+ITEM_FIELDS = ("ItemID", "Name", "Category", "PricePerItem", "Description", "StockCount", "CreatedAt")
 
-    user_id = verify_token(token)  # Assume verify_token returns a dict with user info
-    if "error" in user_id:
-        return jsonify({"error": user_id["error"]}), 401
+# Request payload schemas
+ITEM_PAYLOAD_FIELDS = {
+    "Name": Field(str, min_length=1),
+    "Category": Field(str, min_length=1),
+    "PricePerItem": Field(float, minimum=0, message="Invalid price"),
+    "Description": Field(str),
+    "StockCount": Field(int, minimum=0, message="Invalid stock count"),
+}
+ITEM_SCHEMA = Schema(ITEM_PAYLOAD_FIELDS)
+ITEM_UPDATE_SCHEMA = Schema(ITEM_PAYLOAD_FIELDS, partial=True)
+DEDUCT_SCHEMA = Schema({"quantity": Field(int, minimum=1, message="Invalid quantity")})
+STOCK_BATCH_SCHEMA = Schema({
+    "batch_id": Field(str, min_length=1, max_length=128),
+    "adjustments": Field(list, min_length=1, max_length=get_config().STOCK_BATCH_MAX_ITEMS),
+})
+ADJUSTMENT_SCHEMA = Schema({"item_id": Field(int, minimum=1), "delta": Field(int)})
+BULK_ITEM_SCHEMA = Schema({**ITEM_PAYLOAD_FIELDS, "ItemID": Field(int, minimum=1, required=False, default=None)})
 
-    return user_id  # Return the user ID if authentication is successful
+# Converters applied to CSV values, which arrive as strings
+CSV_CONVERTERS = {"ItemID": int, "PricePerItem": float, "StockCount": int}
+
+def _convert_csv_row(row):
+    """Convert the numeric columns of a CSV row, leaving unparsable values for the schema to reject."""
+    for name, convert in CSV_CONVERTERS.items():
+        value = row.get(name)
+        if value == "":
+            row[name] = None
+        elif value is not None:
+            try:
+                row[name] = convert(value)
+            except ValueError:
+                pass
+    return row
 
 @inventory_bp.route("/add", methods=["POST"])
+@require_auth
 def add_good():
     """
     Add a new good to the inventory.
@@ -64,32 +98,139 @@ def add_good():
     Returns:
     --------
     - 201: JSON message indicating success.
-    - 400: JSON error message if a required field is missing.
+    - 400: JSON error message listing every missing or invalid field.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    data = request.json
-    required_fields = ["Name", "Category", "PricePerItem", "Description", "StockCount"]
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing field: {field}"}), 400
+    data, errors = ITEM_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
 
     session = Session()
-    good = InventoryItem(
-        Name=data["Name"],
-        Category=data["Category"],
-        PricePerItem=data["PricePerItem"],
-        Description=data["Description"],
-        StockCount=data["StockCount"]
-    )
+    good = InventoryItem(**data)
     session.add(good)
     session.commit()
     session.close()
+    invalidate_items()
     return jsonify({"message": "Good added to inventory successfully!"}), 201
 
+@inventory_bp.route("/bulk", methods=["POST"])
+@require_auth
+def bulk_import_goods():
+    """
+    Insert or update many goods from an NDJSON or CSV upload.
+
+    The body is read as a stream, one record at a time. Valid records are upserted in
+    chunks of ``Config.INVENTORY_BULK_CHUNK_SIZE``, each chunk in its own transaction
+    with one prepared upsert statement executed for every row (``executemany``);
+    invalid records are skipped and reported. Records with an ``ItemID`` update that
+    item, the others are inserted.
+
+    Query Parameters:
+    -----------------
+    - format (str, optional): "ndjson" or "csv"; defaults to CSV for a ``text/csv``
+      body and NDJSON otherwise.
+
+    Returns:
+    --------
+    - 200: JSON report with the number of rows written, chunks committed, rows
+      rejected and the per-line errors of rejected rows (the first
+      ``Config.INVENTORY_BULK_MAX_ERRORS`` of them).
+    - 400: JSON error message for an unsupported format.
+    - 500: JSON error message with the number of rows written before the failure.
+    """
+    try:
+        record_format = parse_export_format(
+            request.args.get("format") or ("csv" if request.mimetype == "text/csv" else None)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    config = get_config()
+    chunk_size = config.INVENTORY_BULK_CHUNK_SIZE
+    written = chunks = rejected = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        nonlocal written, chunks
+        written += run_transaction(lambda session: upsert_items(session, chunk))
+        chunks += 1
+        chunk.clear()
+
+    try:
+        for line, record in iter_records(request.stream, record_format):
+            if isinstance(record, MalformedRecord):
+                row_errors = {"body": str(record)}
+            else:
+                if record_format == "csv":
+                    record = _convert_csv_row(record)
+                data, row_errors = BULK_ITEM_SCHEMA.validate(record)
+            if row_errors:
+                rejected += 1
+                if len(errors) < config.INVENTORY_BULK_MAX_ERRORS:
+                    errors.append({"line": line, "errors": row_errors})
+                continue
+            chunk.append(data)
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except Exception as e:
+        return jsonify({"error": str(e), "written": written}), 500
+    finally:
+        if written:
+            invalidate_all()
+
+    return jsonify({"written": written, "chunks": chunks, "rejected": rejected, "errors": errors}), 200
+
+@inventory_bp.route("/stock/batch", methods=["POST"])
+@require_auth
+def stock_batch():
+    """
+    Apply a batch of signed stock deltas in one transaction.
+
+    Each item's stock is changed with a set-based update guarded by
+    ``StockCount + delta >= 0``; items that fail the guard or do not exist are
+    rejected while the rest of the batch is applied. A batch ID that was already
+    applied is not applied again and returns the original report.
+
+    Request JSON Parameters:
+    ------------------------
+    - batch_id (str): Idempotency key of the batch.
+    - adjustments (list): Objects with item_id (int) and delta (int, signed).
+
+    Returns:
+    --------
+    - 200: JSON report with BatchID, Replayed, Applied (ItemID and new StockCount)
+      and Rejected (ItemID, Delta and Error) entries.
+    - 400: JSON error message if the payload or an adjustment is invalid.
+    - 500: JSON error message if an exception occurs.
+    """
+    data, errors = STOCK_BATCH_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    adjustments, invalid = ADJUSTMENT_SCHEMA.validate_many(data["adjustments"])
+    if invalid:
+        return jsonify({"error": "Invalid adjustments", "errors": invalid}), 400
+
+    deltas = [(adjustment["item_id"], adjustment["delta"]) for _, adjustment in adjustments]
+
+    def apply(session):
+        return apply_stock_batch(session, data["batch_id"], deltas)
+
+    try:
+        try:
+            report = run_transaction(apply)
+        except IntegrityError:
+            # The same batch was applied concurrently; return its recorded report
+            report = run_transaction(apply)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    if not report["Replayed"]:
+        invalidate_items(*(row["ItemID"] for row in report["Applied"]))
+    return jsonify(report), 200
+
 @inventory_bp.route("/<int:item_id>", methods=["PUT"])
+@require_auth
 def update_good(item_id):
     """
     Update details of a specific good.
@@ -102,27 +243,28 @@ def update_good(item_id):
     Returns:
     --------
     - 200: JSON message indicating successful update.
+    - 400: JSON error message if a field is invalid.
     - 404: JSON error message if the good is not found.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):
-        return user_id
+    data, errors = ITEM_UPDATE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
 
-    data = request.json
     session = Session()
     good = session.query(InventoryItem).filter_by(ItemID=item_id).first()
     if not good:
         return jsonify({"error": "Good not found"}), 404
 
     for key, value in data.items():
-        if hasattr(good, key):
-            setattr(good, key, value)
+        setattr(good, key, value)
     session.commit()
     session.close()
+    invalidate_items(item_id)
     return jsonify({"message": "Good information updated successfully!"}), 200
 
 
 @inventory_bp.route("/<int:item_id>/deduct", methods=["POST"])
+@require_auth
 def deduct_good(item_id):
     """
     Deduct stock of a specific good.
@@ -138,14 +280,10 @@ def deduct_good(item_id):
     - 400: JSON error message for invalid quantity or insufficient stock.
     - 404: JSON error message if the good is not found.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):
-        return user_id
-
-    data = request.json
-    quantity = data.get("quantity")
-    if not quantity or quantity <= 0:
-        return jsonify({"error": "Invalid quantity"}), 400
+    data, errors = DEDUCT_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    quantity = data["quantity"]
 
     session = Session()
     good = session.query(InventoryItem).filter_by(ItemID=item_id).first()
@@ -157,12 +295,14 @@ def deduct_good(item_id):
     good.StockCount -= quantity
     session.commit()
     session.close()
+    invalidate_items(item_id)
     return jsonify({"message": f"{quantity} items deducted from stock"}), 200
 
 @inventory_bp.route("/<int:item_id>", methods=["GET"])
+@require_auth
 def get_good(item_id):
     """
-    Retrieve details of a specific good by ID.
+    Retrieve details of a specific good by ID, served from the catalogue cache.
 
     Parameters:
     -----------
@@ -173,24 +313,42 @@ def get_good(item_id):
     - 200: JSON object containing the good's details.
     - 404: JSON error message if the good is not found.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):
-        return user_id
-
-    session = Session()
-    good = session.query(InventoryItem).get(item_id)
-    session.close()
+    good = get_item(item_id)
     if good:
         return jsonify({
-            "Name": good.Name,
-            "Category": good.Category,
-            "PricePerItem": good.PricePerItem,
-            "Description": good.Description,
-            "StockCount": good.StockCount
+            "Name": good["Name"],
+            "Category": good["Category"],
+            "PricePerItem": good["PricePerItem"],
+            "Description": good["Description"],
+            "StockCount": good["StockCount"]
         }), 200
     else:
         return jsonify({"error": "Good not found"}), 404
-    
+
+@inventory_bp.route("/export", methods=["GET"])
+@require_auth
+def export_goods():
+    """
+    Stream every inventory item as NDJSON or CSV.
+
+    Rows are read with a server-side cursor in fixed-size batches and written to the
+    client as they are produced, so memory use does not grow with the table size.
+
+    Query Parameters:
+        format (str, optional): "ndjson" (default) or "csv".
+        fields (str, optional): Comma-separated InventoryItem fields to export.
+
+    Returns:
+        Response: Streaming NDJSON or CSV download, or a 400 JSON error.
+    """
+    try:
+        export_format = parse_export_format(request.args.get("format"))
+        fields = parse_fields(request.args.get("fields"), ITEM_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = [getattr(InventoryItem, field) for field in fields]
+    return stream_export(columns, InventoryItem.ItemID, export_format, "inventory")
+
 app = Flask(__name__)
 app.register_blueprint(inventory_bp, url_prefix="/inventory")
 
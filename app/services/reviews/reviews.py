@@ -16,13 +16,17 @@ Endpoints:
     - DELETE /delete/<int:review_id>:
         Delete an existing review.
     - GET /product/<int:product_id>:
-        Retrieve all reviews for a specific product.
+        Retrieve the reviews of a specific product, newest first, one page at a time.
+    - GET /product/<int:product_id>/summary:
+        Retrieve the rating summary of a product.
     - GET /customer/<int:customer_id>:
-        Retrieve all reviews submitted by a specific customer.
+        Retrieve the reviews submitted by a specific customer, newest first, one page at a time.
     - PATCH /moderate/<int:review_id>:
         Update moderation status of a review (e.g., flagging inappropriate content).
     - GET /details/<int:review_id>:
         Retrieve detailed information about a specific review.
+    - GET /export:
+        Stream all reviews as NDJSON or CSV.
 
 Dependencies:
     - Flask: Used to define API routes and handle requests.
@@ -32,37 +36,50 @@ Dependencies:
 """
 
 from flask import Flask, Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from sqlalchemy import select, tuple_
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from database.models import Session, Review, Customer, InventoryItem, engine
-from app.utils.authentication import generate_token, verify_token  
-from app.utils.validation import validate_positive_int
-#from app.database.models import Session, Review, Customer, InventoryItem
+from app.database.models import Session, Review, Customer, InventoryItem
+from app.database.connection import remove_session
+from app.database.review_stats import adjust_review_stats, get_review_summary
+from app.database.instrumentation import query_budget
+from app.utils.pagination import parse_fields, parse_limit, encode_cursor, decode_cursor, paginated_response
+from app.utils.streaming import parse_export_format, stream_export
+from app.utils.authentication import require_auth
+from app.utils.validation import Field, Schema, validation_error
 
 # Define the Flask blueprint for the Reviews service
 reviews_bp = Blueprint("reviews", __name__)
 
-# Database session setup
-Session = sessionmaker(bind=engine)
+# Close the shared scoped session after every request
+reviews_bp.teardown_request(remove_session)
 
-# Authenticate Request - Ensure the user is authenticated
-def authenticate_request():
-    """Check for valid JWT token."""
-    token = request.headers.get("Authorization")
-    if not token:
-        return jsonify({"error": "Token is missing"}), 401
+# Review columns that may be exported or listed
+REVIEW_FIELDS = ("ReviewID", "CustomerID", "ItemID", "Rating", "Comment", "IsFlagged", "CreatedAt")
 
-    user_id = verify_token(token)  # Assume verify_token returns a dict with user info
-    if "error" in user_id:
-        return jsonify({"error": user_id["error"]}), 401
+# Default columns of the product and customer review listings
+PRODUCT_REVIEW_FIELDS = ("ReviewID", "CustomerID", "Rating", "Comment", "CreatedAt", "IsFlagged")
+CUSTOMER_REVIEW_FIELDS = ("ReviewID", "ItemID", "Rating", "Comment", "CreatedAt", "IsFlagged")
 
-    return user_id  # Return the user ID if authentication is successful
+# Request payload schemas
+REVIEW_SCHEMA = Schema({
+    "CustomerID": Field(int, minimum=1),
+    "ItemID": Field(int, minimum=1),
+    "Rating": Field(int, minimum=1, maximum=5, message="Rating must be an integer from 1 to 5"),
+    "Comment": Field(str, required=False, default=""),
+})
+REVIEW_UPDATE_SCHEMA = Schema({
+    "Rating": REVIEW_SCHEMA.fields["Rating"],
+    "Comment": REVIEW_SCHEMA.fields["Comment"],
+}, partial=True)
+MODERATION_SCHEMA = Schema({"IsFlagged": Field(bool)})
 
 
 # Submit Review
 @reviews_bp.route("/submit", methods=["POST"])
+@require_auth
 def submit_review():
     """
     Submit a new review for a product.
@@ -76,26 +93,21 @@ def submit_review():
     Returns:
         JSON response with a success message and the newly created ReviewID.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
+    data, errors = REVIEW_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
 
-    data = request.get_json()
     session = Session()
-
-    review = Review(
-        CustomerID=data["CustomerID"],
-        ItemID=data["ItemID"],
-        Rating=data["Rating"],
-        Comment=data.get("Comment", "")
-    )
+    review = Review(**data)
     session.add(review)
+    adjust_review_stats(session, review.ItemID, added=(review.Rating, False))
     session.commit()
 
     return jsonify({"message": "Review submitted successfully!", "ReviewID": review.ReviewID}), 201
 
 # Update Review
 @reviews_bp.route('/update/<int:review_id>', methods=['PUT'])
+@require_auth
 def update_review(review_id):
     """
     Update an existing review.
@@ -110,18 +122,19 @@ def update_review(review_id):
     Returns:
         JSON response indicating success or a 404 error if the review does not exist.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    data = request.get_json()
+    data, errors = REVIEW_UPDATE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+
     session = Session()
     review = session.query(Review).get(review_id)
     if not review:
         return jsonify({"message": "Review not found"}), 404
 
+    previous = (review.Rating, review.IsFlagged)
     review.Rating = data.get("Rating", review.Rating)
     review.Comment = data.get("Comment", review.Comment)
+    adjust_review_stats(session, review.ItemID, removed=previous, added=(review.Rating, review.IsFlagged))
     session.commit()
     session.close()
     return jsonify({"message": "Review updated successfully!"}), 200
@@ -129,6 +142,7 @@ def update_review(review_id):
 
 # Delete Review
 @reviews_bp.route('/delete/<int:review_id>', methods=['DELETE'])
+@require_auth
 def delete_review(review_id):
     """
     Delete an existing review.
@@ -139,79 +153,141 @@ def delete_review(review_id):
     Returns:
         JSON response indicating success or a 404 error if the review does not exist.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
     session = Session()
     review = session.query(Review).get(review_id)
     if not review:
         return jsonify({"message": "Review not found"}), 404
 
     session.delete(review)
+    adjust_review_stats(session, review.ItemID, removed=(review.Rating, review.IsFlagged))
     session.commit()
     session.close()
     return jsonify({"message": "Review deleted successfully!"}), 200
 
 
+def _list_reviews(owner_column, owner_id, default_fields):
+    """
+    Build one page of the reviews of a product or customer, newest first.
+
+    Pages are selected with a keyset condition on ``(CreatedAt, ReviewID)``, which
+    follows the ``(ItemID, CreatedAt)`` and ``(CustomerID, CreatedAt)`` indexes, so a
+    page costs one index range scan, and only the requested columns are read.
+
+    Args:
+        owner_column (Column): ``Review.ItemID`` or ``Review.CustomerID``.
+        owner_id (int): ID of the product or customer.
+        default_fields (Sequence[str]): Columns returned when ``fields`` is not given.
+
+    Returns:
+        Response: JSON list of reviews with the ``X-Next-Cursor`` header, or a 400 JSON error.
+    """
+    args = request.args
+    try:
+        limit = parse_limit(args.get("limit"))
+        fields = parse_fields(args.get("fields"), REVIEW_FIELDS) if args.get("fields") else list(default_fields)
+        rating = int(args["rating"]) if args.get("rating") else None
+        flagged = args.get("flagged", "").lower() or None
+        if flagged not in (None, "true", "false", "1", "0"):
+            raise ValueError("flagged must be true or false")
+        since = datetime.fromisoformat(args["since"]) if args.get("since") else None
+        after = None
+        if args.get("after"):
+            created_at, review_id = decode_cursor(args["after"])
+            after = (datetime.fromisoformat(created_at), int(review_id))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    stmt = select(Review.ReviewID, Review.CreatedAt, *(getattr(Review, field) for field in fields)) \
+        .where(owner_column == owner_id)
+    if rating is not None:
+        stmt = stmt.where(Review.Rating == rating)
+    if flagged is not None:
+        stmt = stmt.where(Review.IsFlagged.is_(True) if flagged in ("true", "1") else Review.IsFlagged.is_not(True))
+    if since is not None:
+        stmt = stmt.where(Review.CreatedAt >= since)
+    if after is not None:
+        stmt = stmt.where(tuple_(Review.CreatedAt, Review.ReviewID) < tuple_(*after))
+    stmt = stmt.order_by(Review.CreatedAt.desc(), Review.ReviewID.desc()).limit(limit + 1)
+
+    session = Session()
+    try:
+        rows = session.execute(stmt).all()
+    finally:
+        session.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[1].isoformat(), last[0])
+    return paginated_response([dict(zip(fields, row[2:])) for row in rows[:limit]], next_cursor), 200
+
 # Get Product Reviews
 @reviews_bp.route("/product/<int:product_id>", methods=["GET"])
+@require_auth
+@query_budget(1)
 def get_product_reviews(product_id):
     """
-    Retrieve all reviews for a specific product.
+    Retrieve the reviews of a specific product, newest first, one page at a time.
 
     Path Parameters:
         - product_id (int): ID of the product.
 
+    Query Parameters:
+        - limit (int, optional): Page size, bounded by ``Config.PAGE_SIZE_MAX``.
+        - after (str, optional): Cursor from the ``X-Next-Cursor`` header of the previous page.
+        - fields (str, optional): Comma-separated review fields to return.
+        - rating (int, optional): Only return reviews with this rating.
+        - flagged (bool, optional): Only return flagged (true) or unflagged (false) reviews.
+        - since (str, optional): ISO timestamp; only return reviews created at or after it.
+
     Returns:
-        JSON response with a list of reviews for the product.
+        JSON response with a page of the product's reviews.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    session = Session()
+    return _list_reviews(Review.ItemID, product_id, PRODUCT_REVIEW_FIELDS)
+
+# Get Product Review Summary
+@reviews_bp.route("/product/<int:product_id>/summary", methods=["GET"])
+@require_auth
+@query_budget(1)
+def get_product_review_summary(product_id):
+    """
+    Retrieve the rating summary of a product.
 
-    reviews = session.query(Review).filter_by(ItemID=product_id).all()
-    return jsonify([{
-        "ReviewID": review.ReviewID,
-        "CustomerID": review.CustomerID,
-        "Rating": review.Rating,
-        "Comment": review.Comment,
-        "CreatedAt": review.CreatedAt,
-        "IsFlagged": review.IsFlagged
-    } for review in reviews])
+    Read from the ``review_stats`` aggregates with a single primary-key lookup, so the
+    cost does not depend on the number of reviews.
+
+    Path Parameters:
+        - product_id (int): ID of the product.
+
+    Returns:
+        JSON response with ItemID, ReviewCount, AverageRating, Histogram (review count
+        per rating) and FlaggedCount.
+    """
+    session = Session()
+    return jsonify(get_review_summary(session, product_id))
 
 # Get Customer Reviews
 @reviews_bp.route("/customer/<int:customer_id>", methods=["GET"])
+@require_auth
+@query_budget(1)
 def get_customer_reviews(customer_id):
     """
-    Retrieve all reviews submitted by a specific customer.
+    Retrieve the reviews submitted by a specific customer, newest first, one page at a time.
 
     Path Parameters:
         - customer_id (int): ID of the customer.
 
+    Query Parameters:
+        Same as ``GET /product/<int:product_id>``.
+
     Returns:
-        JSON response with a list of reviews submitted by the customer.
+        JSON response with a page of the customer's reviews.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    session = Session()
-
-    reviews = session.query(Review).filter_by(CustomerID=customer_id).all()
-    return jsonify([{
-        "ReviewID": review.ReviewID,
-        "ItemID": review.ItemID,
-        "Rating": review.Rating,
-        "Comment": review.Comment,
-        "CreatedAt": review.CreatedAt,
-        "IsFlagged": review.IsFlagged
-    } for review in reviews])
+    return _list_reviews(Review.CustomerID, customer_id, CUSTOMER_REVIEW_FIELDS)
 
 # Moderate Review
 @reviews_bp.route("/moderate/<int:review_id>", methods=["PATCH"])
+@require_auth
 def moderate_review(review_id):
     """
     Update the moderation status of a review.
@@ -225,28 +301,32 @@ def moderate_review(review_id):
     Returns:
         JSON response with a success message and updated moderation status.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    data = request.get_json()
-    session = Session()
+    data, errors = MODERATION_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
 
+    session = Session()
     review = session.query(Review).get(review_id)
     if not review:
         return jsonify({"error": "Review not found"}), 404
 
+    previous = (review.Rating, review.IsFlagged)
     review.IsFlagged = data["IsFlagged"]
+    adjust_review_stats(session, review.ItemID, removed=previous, added=(review.Rating, review.IsFlagged))
     session.commit()
 
     return jsonify({"message": "Review moderation updated successfully!", "IsFlagged": review.IsFlagged})
 
 # Get Review Details
 @reviews_bp.route("/details/<int:review_id>", methods=["GET"])
+@require_auth
+@query_budget(1)
 def get_review_details(review_id):
     """
     Retrieve detailed information about a specific review.
 
+    The review, customer name and product name are read with a single joined select.
+
     Path Parameters:
         - review_id (int): ID of the review.
 
@@ -260,28 +340,48 @@ def get_review_details(review_id):
             - CreatedAt
             - IsFlagged
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
     session = Session()
-
-    review = session.query(Review).get(review_id)
-    if not review:
+    try:
+        row = session.execute(
+            select(
+                Review.ReviewID, Customer.FullName.label("CustomerName"), InventoryItem.Name.label("ProductName"),
+                Review.Rating, Review.Comment, Review.CreatedAt, Review.IsFlagged,
+            )
+            .outerjoin(Customer, Customer.CustomerID == Review.CustomerID)
+            .outerjoin(InventoryItem, InventoryItem.ItemID == Review.ItemID)
+            .where(Review.ReviewID == review_id)
+        ).first()
+    finally:
+        session.close()
+    if row is None:
         return jsonify({"error": "Review not found"}), 404
+    return jsonify(row._asdict())
+
+# Export Reviews
+@reviews_bp.route("/export", methods=["GET"])
+@require_auth
+def export_reviews():
+    """
+    Stream every review as NDJSON or CSV.
+
+    Rows are read with a server-side cursor in fixed-size batches and written to the
+    client as they are produced, so memory use does not grow with the table size.
+
+    Query Parameters:
+        format (str, optional): "ndjson" (default) or "csv".
+        fields (str, optional): Comma-separated Review fields to export.
+
+    Returns:
+        Response: Streaming NDJSON or CSV download, or a 400 JSON error.
+    """
+    try:
+        export_format = parse_export_format(request.args.get("format"))
+        fields = parse_fields(request.args.get("fields"), REVIEW_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = [getattr(Review, field) for field in fields]
+    return stream_export(columns, Review.ReviewID, export_format, "reviews")
 
-    customer = session.query(Customer).get(review.CustomerID)
-    product = session.query(InventoryItem).get(review.ItemID)
-
-    return jsonify({
-        "ReviewID": review.ReviewID,
-        "CustomerName": customer.FullName,
-        "ProductName": product.Name,
-        "Rating": review.Rating,
-        "Comment": review.Comment,
-        "CreatedAt": review.CreatedAt,
-        "IsFlagged": review.IsFlagged
-    })
 app = Flask(__name__)
 app.register_blueprint(reviews_bp, url_prefix="/reviews")
 
@@ -3,9 +3,11 @@ Module: sales.py
 Description: Handles sales-related operations and API endpoints.
 
 Endpoints:
-    - GET /sales/goods: Retrieves a list of all available goods with their prices.
+    - GET /sales/goods: Lists goods, filtered by category, price and stock, one page at a time.
     - GET /sales/goods/<int:item_id>: Fetches detailed information about a specific item.
+    - GET /sales/search: Full-text search of goods by name and description.
     - POST /sales/sale: Processes a new sale, updates the inventory, and records the transaction.
+    - GET /sales/export: Streams all sales as NDJSON or CSV.
 
 Dependencies:
     - Flask: For creating API endpoints.
@@ -13,67 +15,169 @@ Dependencies:
 """
 
 from flask import Flask, Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from database.models import Base, InventoryItem, Customer, Sale
-from app.utils.authentication import generate_token, verify_token 
-from app.utils.validation import validate_positive_int
-
-# Database setup
-DATABASE_URL = "sqlite:///ecommerce.db"
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+from app.database.models import Base, InventoryItem, Customer, Sale, Session
+from app.database.connection import engine, remove_session, run_transaction
+from app.database.checkout import checkout_item, CheckoutError
+from app.database.catalogue import get_item, list_goods, list_available_goods, invalidate_items, GOODS_SORTS
+from app.database.search import search_items, ensure_search_index
+from app.utils.pagination import parse_fields, parse_limit, encode_cursor, decode_cursor, paginated_response
+from app.utils.streaming import parse_export_format, stream_export
+from app.utils.authentication import require_auth
+from app.utils.validation import Field, Schema, validation_error
+from app.database.instrumentation import query_budget
 
 # Blueprint setup
 sales_bp = Blueprint("sales", __name__)
 
-# Authenticate Request - Ensure the user is authenticated
-def authenticate_request():
-    """Check for valid JWT token."""
-    token = request.headers.get("Authorization")
-    if not token:
-        return jsonify({"error": "Token is missing"}), 401
+# Close the shared scoped session after every request
+sales_bp.teardown_request(remove_session)
+
+# Sale columns that may be exported
+SALE_FIELDS = ("SaleID", "CustomerID", "ItemID", "Quantity", "TotalPrice", "SoldAt")
+
+# Request payload schema of a sale
+SALE_SCHEMA = Schema({
+    "CustomerUsername": Field(str, min_length=1),
+    "ItemName": Field(str, min_length=1),
+    "Quantity": Field(int, minimum=1, message="Invalid quantity"),
+})
+
+# Goods listing query parameters; the listing is served from the cache when none is given
+GOODS_QUERY_PARAMETERS = ("category", "min_price", "max_price", "in_stock", "sort", "limit", "after")
+
+def _parse_goods_query(args):
+    """
+    Parse the query parameters of the goods listing.
+
+    Args:
+        args (MultiDict): Request query parameters.
 
-    user_id = verify_token(token)  # Assume verify_token returns a dict with user info
-    if "error" in user_id:
-        return jsonify({"error": user_id["error"]}), 401
+    Returns:
+        dict: Keyword arguments of ``list_goods``.
 
-    return user_id  # Return the user ID if authentication is successful
+    Raises:
+        ValueError: If a parameter is invalid.
+    """
+    sort = args.get("sort", "id")
+    if sort not in GOODS_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(GOODS_SORTS)}")
+    in_stock = args.get("in_stock", "true").lower()
+    if in_stock not in ("true", "false", "1", "0"):
+        raise ValueError("in_stock must be true or false")
+    after = args.get("after")
+    if after:
+        after = decode_cursor(after)
+        if len(after) != (1 if sort == "id" else 2):
+            raise ValueError("Invalid cursor")
+    return {
+        "category": args.get("category") or None,
+        "min_price": float(args["min_price"]) if args.get("min_price") else None,
+        "max_price": float(args["max_price"]) if args.get("max_price") else None,
+        "in_stock": in_stock in ("true", "1"),
+        "sort": sort,
+        "limit": parse_limit(args.get("limit")),
+        "after": after or None,
+    }
 
 # API to display available goods
 @sales_bp.route("/goods", methods=["GET"])
+@require_auth
+@query_budget(1)
 def display_goods():
     """
-    Retrieves a list of all available goods with their names and prices.
-    
+    Lists goods one page at a time, filtered and ordered in SQL.
+
+    The default listing (no query parameters) is served from the catalogue cache; the
+    database is only read on a cold cache.
+
+    Query Parameters:
+        category (str, optional): Only list goods of this category.
+        min_price (float, optional): Lowest price per item, inclusive.
+        max_price (float, optional): Highest price per item, inclusive.
+        in_stock (bool, optional): Only list goods with stock; defaults to true.
+        sort (str, optional): "id" (default), "price", "-price" or "name".
+        limit (int, optional): Page size, bounded by ``Config.PAGE_SIZE_MAX``.
+        after (str, optional): Cursor from the ``X-Next-Cursor`` header of the previous page.
+
     Returns:
-        - 200: JSON list of available goods with fields:
-            - Name: Name of the product.
-            - Price: Price per item.
-        - 500: JSON error message if an exception occurs.
+        - 200: JSON list of goods with ItemID, Name, Category, Price and StockCount.
+        - 400: JSON error message if a query parameter is invalid.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
+    if not any(name in request.args for name in GOODS_QUERY_PARAMETERS):
+        goods, next_cursor = list_available_goods()
+        return paginated_response(goods, next_cursor), 200
+    try:
+        query = _parse_goods_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    goods, next_cursor = list_goods(**query)
+    return paginated_response(goods, next_cursor), 200
+
+# API to search goods
+@sales_bp.route("/search", methods=["GET"])
+@require_auth
+@query_budget(2)
+def search_goods():
+    """
+    Search goods by name and description, best match first.
+
+    Backed by the ``inventory_fts`` full-text index: every word of the query must match,
+    the last one also as the start of a longer word until it is a complete indexed word.
+    Narrow searches are ranked by BM25 with names weighing more than descriptions,
+    broad ones are listed by ItemID (see ``app.database.search``), and pages are
+    selected with a keyset condition on ``(rank, ItemID)``.
+
+    Query Parameters:
+        q (str): Search terms.
+        category (str, optional): Only return goods of this category.
+        limit (int, optional): Page size, bounded by ``Config.PAGE_SIZE_MAX``.
+        after (str, optional): Cursor from the ``X-Next-Cursor`` header of the previous page.
+
+    Returns:
+        - 200: JSON list of matching goods with ItemID, Name, Category, Price and StockCount.
+        - 400: JSON error message if the query, limit or cursor is invalid.
+        - 503: JSON error message if the search index cannot be read.
+    """
+    text = request.args.get("q", "").strip()
+    if not text:
+        return jsonify({"error": "Missing query parameter: q"}), 400
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        after = request.args.get("after")
+        if after:
+            rank, item_id = decode_cursor(after)
+            after = (float(rank), int(item_id))
+        else:
+            after = None
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+
     session = Session()
     try:
-        goods = session.query(InventoryItem).all()
-        available_goods = [{"Name": good.Name, "Price": good.PricePerItem} for good in goods if good.StockCount > 0]
-        return jsonify(available_goods), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        rows = search_items(session, text, request.args.get("category"), limit, after)
+    except OperationalError:
+        return jsonify({"error": "Search is currently unavailable"}), 503
     finally:
         session.close()
 
+    next_cursor = encode_cursor(rows[limit - 1].Rank, rows[limit - 1].ItemID) if len(rows) > limit else None
+    goods = [
+        {"ItemID": row.ItemID, "Name": row.Name, "Category": row.Category,
+         "Price": row.PricePerItem, "StockCount": row.StockCount}
+        for row in rows[:limit]
+    ]
+    return paginated_response(goods, next_cursor), 200
+
 # API to get goods details
 @sales_bp.route("/goods/<int:item_id>", methods=["GET"])
+@require_auth
 def get_goods_details(item_id):
     """
-    Retrieves detailed information about a specific item.
+    Retrieves detailed information about a specific item, served from the catalogue cache.
     
     Args:
         item_id (int): The ID of the item to retrieve details for.
@@ -89,33 +193,30 @@ def get_goods_details(item_id):
         - 404: JSON error message if the item is not found.
         - 500: JSON error message if an exception occurs.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-    
-    session = Session()
     try:
-        item = session.query(InventoryItem).filter_by(ItemID=item_id).first()
+        item = get_item(item_id)
         if not item:
             return jsonify({"error": "Item not found"}), 404
         return jsonify({
-            "Name": item.Name,
-            "Category": item.Category,
-            "Price": item.PricePerItem,
-            "Description": item.Description,
-            "StockCount": item.StockCount,
-            "CreatedAt": item.CreatedAt.isoformat()
+            "Name": item["Name"],
+            "Category": item["Category"],
+            "Price": item["PricePerItem"],
+            "Description": item["Description"],
+            "StockCount": item["StockCount"],
+            "CreatedAt": item["CreatedAt"]
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 # API to handle a sale
 @sales_bp.route("/sale", methods=["POST"])
+@require_auth
 def create_sale():
     """
     Processes a sale by validating the customer's wallet, item stock, and updating the database.
+
+    Stock and wallet are debited with conditional updates in a single short transaction,
+    which is retried when it conflicts with a concurrent writer.
     
     Request JSON:
         - CustomerUsername (str): The username of the customer making the purchase.
@@ -126,6 +227,7 @@ def create_sale():
         - 201: JSON success message if the sale is completed.
         - 400: JSON error message for:
             - Missing required fields.
+            - Invalid quantity.
             - Insufficient stock.
             - Insufficient wallet balance.
         - 404: JSON error message for:
@@ -133,51 +235,51 @@ def create_sale():
             - Item not found.
         - 500: JSON error message if an exception occurs.
     """
-    user_id = authenticate_request()  # Ensure user is authenticated
-    if isinstance(user_id, tuple):  # Check if error response was returned
-        return user_id
-
-    data = request.get_json()
-    customer_username = data.get("CustomerUsername")
-    item_name = data.get("ItemName")
-    quantity = data.get("Quantity")
+    data, errors = SALE_SCHEMA.validate(request.get_json(silent=True))
+    if errors:
+        return validation_error(errors)
+    customer_username = data["CustomerUsername"]
+    item_name = data["ItemName"]
+    quantity = data["Quantity"]
 
-    if not customer_username or not item_name or not quantity:
-        return jsonify({"error": "Missing required fields"}), 400
-
-    session = Session()
     try:
-        customer = session.query(Customer).filter_by(Username=customer_username).first()
-        item = session.query(InventoryItem).filter_by(Name=item_name).first()
+        # Guarded stock and wallet updates plus the sale insert, in one short transaction
+        item_id = run_transaction(lambda session: checkout_item(session, customer_username, item_name, quantity).ItemID)
+        invalidate_items(item_id)
+        return jsonify({"message": "Sale completed successfully"}), 201
+    except CheckoutError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        if not customer:
-            return jsonify({"error": "Customer not found"}), 404
-        if not item:
-            return jsonify({"error": "Item not found"}), 404
-        if item.StockCount < quantity:
-            return jsonify({"error": "Insufficient stock"}), 400
-        total_price = item.PricePerItem * quantity
-        if customer.WalletBalance < total_price:
-            return jsonify({"error": "Insufficient wallet balance"}), 400
+# API to export sales
+@sales_bp.route("/export", methods=["GET"])
+@require_auth
+def export_sales():
+    """
+    Stream every sale as NDJSON or CSV.
 
-        # Update inventory and customer wallet
-        item.StockCount -= quantity
-        customer.WalletBalance -= total_price
+    Rows are read with a server-side cursor in fixed-size batches and written to the
+    client as they are produced, so memory use does not grow with the table size.
 
-        # Record the sale
-        sale = Sale(CustomerID=customer.CustomerID, ItemID=item.ItemID, Quantity=quantity, TotalPrice=total_price)
-        session.add(sale)
-        session.commit()
+    Query Parameters:
+        format (str, optional): "ndjson" (default) or "csv".
+        fields (str, optional): Comma-separated Sale fields to export.
 
-        return jsonify({"message": "Sale completed successfully"}), 201
-    except Exception as e:
-        session.rollback()
-        return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
+    Returns:
+        Response: Streaming NDJSON or CSV download, or a 400 JSON error.
+    """
+    try:
+        export_format = parse_export_format(request.args.get("format"))
+        fields = parse_fields(request.args.get("fields"), SALE_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    columns = [getattr(Sale, field) for field in fields]
+    return stream_export(columns, Sale.SaleID, export_format, "sales")
 
 app = Flask(__name__)
 app.register_blueprint(sales_bp, url_prefix="/sales")
 
 if __name__ == "__main__":
+    ensure_search_index(engine)
     app.run(host="0.0.0.0", port=5004)
\ No newline at end of file
@@ -4,12 +4,33 @@ Authentication Module
 This module provides utilities for generating and verifying JSON Web Tokens (JWT)
 for user authentication and extracting user information from tokens.
 
+Verified tokens are cached by their SHA-256 digest until their ``exp`` claim, so a
+token presented repeatedly is only decoded and signature-checked once. Revoked
+tokens are evicted from the cache and denied until they would have expired.
+
+Tokens are signed with the shared ``SECRET_KEY`` (HS256) by default. Setting
+``Config.JWT_ALGORITHM`` to RS256 or EdDSA switches to asymmetric keys: public keys
+are read from the key-set file ``Config.JWT_KEYSET_FILE`` and parsed once, tokens
+carry the ``kid`` of their signing key, and only services configured with
+``Config.JWT_PRIVATE_KEY_FILE`` can issue tokens. All other services verify with the
+public keys alone. Asymmetric mode requires the ``cryptography`` package.
+
+The key-set file has the form::
+
+    {"keys": [{"kid": "2024-06", "alg": "EdDSA", "public_key": "-----BEGIN PUBLIC KEY-----..."}]}
+
 Constants:
 ----------
 SECRET_KEY : str
     The secret key used for encoding and decoding JWT tokens.
 TOKEN_EXPIRATION_MINUTES : int
     The duration (in minutes) for which the token remains valid.
+token_cache : TTLCache
+    Payloads of verified tokens keyed by token digest, bounded by ``Config.TOKEN_CACHE_SIZE``.
+revoked_tokens : TTLCache
+    Digests of revoked tokens that have not expired yet.
+ASYMMETRIC_ALGORITHMS : tuple
+    Supported public-key signature algorithms.
 
 Functions:
 ----------
@@ -19,14 +40,55 @@ Functions:
     Verifies a JWT token and decodes its payload.
 - get_user_id_from_token(token: str) -> Optional[int]
     Extracts the user ID from the provided JWT token.
+- revoke_token(token: str) -> bool
+    Evicts a token from the cache and denies it until it expires.
+- require_auth(view: Callable) -> Callable
+    Route decorator rejecting requests without a valid ``Authorization`` token.
+- load_keyset(path: str) -> dict
+    Parses the public keys of a key-set file, keyed by ``kid``.
+- configure_keys(config: Optional[class]) -> None
+    Applies the signing algorithm and keys of a configuration class.
+- generate_key_pair(algorithm: str) -> tuple
+    Generates a PEM-encoded private and public key for an asymmetric algorithm.
+
+Usage:
+------
+    python -m app.utils.authentication --alg EdDSA --kid 2024-06 --out keys/
 """
 
+import hashlib
+import json
+import time
+from functools import wraps
 import jwt
+from jwt.algorithms import get_default_algorithms, has_crypto
 from datetime import datetime, timedelta, timezone
+from flask import request, jsonify, g
+from app.config import get_config
+from app.utils.cache import TTLCache
 
 SECRET_KEY = "your_secret_key"
 TOKEN_EXPIRATION_MINUTES = 30
 
+token_cache = TTLCache(maxsize=get_config().TOKEN_CACHE_SIZE)
+# Unbounded so revocations are never evicted; entries only live until the token expires
+revoked_tokens = TTLCache(maxsize=float("inf"))
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+# Active signing mode, set by configure_keys()
+_algorithm = "HS256"
+_verification_keys = {}  # kid -> (algorithm, parsed public key)
+_signing_key = None  # (kid, algorithm, parsed private key) on token-issuing services only
+
+def _token_digest(token):
+    """Returns the cache key of a token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _seconds_until(exp):
+    """Returns the seconds left until an ``exp`` claim, or None if the token has no expiry."""
+    return None if exp is None else exp - time.time()
+
 def generate_token(user_id):
     """
     Generates a JWT token for a given user ID.
@@ -46,8 +108,23 @@ def generate_token(user_id):
         "exp": datetime.now(timezone.utc) + timedelta(minutes=TOKEN_EXPIRATION_MINUTES),
         "iat": datetime.now(timezone.utc)
     }
-    token = jwt.encode(payload, SECRET_KEY, algorithm="HS256")
-    return token
+    if _algorithm == "HS256":
+        return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
+    if _signing_key is None:
+        raise RuntimeError("No private key is configured; this service can only verify tokens")
+    kid, algorithm, key = _signing_key
+    return jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
+
+def _decode(token, verify_exp=True):
+    """Verifies a token with the configured key and returns its payload."""
+    options = None if verify_exp else {"verify_exp": False}
+    if _algorithm == "HS256":
+        return jwt.decode(token, SECRET_KEY, algorithms=["HS256"], options=options)
+    kid = jwt.get_unverified_header(token).get("kid")
+    if kid not in _verification_keys:
+        raise jwt.InvalidTokenError("Unknown key ID")
+    algorithm, key = _verification_keys[kid]
+    return jwt.decode(token, key, algorithms=[algorithm], options=options)
 
 def verify_token(token):
     """
@@ -63,13 +140,24 @@ def verify_token(token):
     dict
         The decoded payload if the token is valid, or an error message.
     """
+    if not isinstance(token, str):
+        return {"error": "Invalid token"}
+    digest = _token_digest(token)
+    if revoked_tokens.get(digest) is not None:
+        return {"error": "Token has been revoked"}
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        return payload
+        payload = _decode(token)
     except jwt.ExpiredSignatureError:
         return {"error": "Token has expired"}
     except jwt.InvalidTokenError:
         return {"error": "Invalid token"}
+    ttl = _seconds_until(payload.get("exp"))
+    if ttl is None or ttl > 0:
+        token_cache.set(digest, dict(payload), ttl)
+    return payload
 
 def get_user_id_from_token(token):
     """
@@ -89,3 +177,188 @@ def get_user_id_from_token(token):
     if "user_id" in payload:
         return payload["user_id"]
     return None
+
+def revoke_token(token):
+    """
+    Revokes a JWT token.
+
+    The token is evicted from the verified-token cache and denied by ``verify_token``
+    until its ``exp`` claim passes.
+
+    Parameters:
+    ----------
+    token : str
+        The JWT token to revoke.
+
+    Returns:
+    -------
+    bool
+        True if the token was signed by this service and has been revoked.
+    """
+    try:
+        payload = _decode(token, verify_exp=False)
+    except jwt.InvalidTokenError:
+        return False
+    digest = _token_digest(token)
+    token_cache.delete(digest)
+    ttl = _seconds_until(payload.get("exp"))
+    if ttl is None or ttl > 0:
+        revoked_tokens.set(digest, True, float("inf") if ttl is None else ttl)
+    return True
+
+def require_auth(view):
+    """
+    Route decorator rejecting requests without a valid ``Authorization`` token.
+
+    The verified payload is made available to the view as ``flask.g.token_payload``.
+
+    Parameters:
+    ----------
+    view : Callable
+        The Flask view function to protect.
+
+    Returns:
+    -------
+    Callable
+        The wrapped view, returning a 401 JSON error when authentication fails.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get("Authorization")
+        if not token:
+            return jsonify({"error": "Token is missing"}), 401
+        payload = verify_token(token)
+        if "error" in payload:
+            return jsonify({"error": payload["error"]}), 401
+        g.token_payload = payload
+        return view(*args, **kwargs)
+    return wrapper
+
+def _parse_key(algorithm, pem):
+    """Parses a PEM-encoded key for an asymmetric algorithm."""
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Unsupported token algorithm: {algorithm}")
+    if not has_crypto:
+        raise RuntimeError("The cryptography package is required for RS256 and EdDSA tokens")
+    return get_default_algorithms()[algorithm].prepare_key(pem)
+
+def load_keyset(path):
+    """
+    Parses the public keys of a key-set file.
+
+    Parameters:
+    ----------
+    path : str
+        Path of a JSON file with a ``keys`` list of ``kid``, ``alg`` and ``public_key`` entries.
+
+    Returns:
+    -------
+    dict
+        ``(algorithm, parsed public key)`` tuples keyed by ``kid``.
+
+    Raises:
+    ------
+    ValueError
+        If an entry uses an unsupported algorithm.
+    RuntimeError
+        If the cryptography package is not installed.
+    """
+    with open(path) as keyset_file:
+        entries = json.load(keyset_file)["keys"]
+    return {entry["kid"]: (entry["alg"], _parse_key(entry["alg"], entry["public_key"])) for entry in entries}
+
+def configure_keys(config=None):
+    """
+    Applies the signing algorithm and keys of a configuration class.
+
+    The private key is only loaded when ``JWT_PRIVATE_KEY_FILE`` is set; services
+    without it verify tokens but cannot issue them. Cached verifications are dropped.
+
+    Parameters:
+    ----------
+    config : Optional[class]
+        Configuration class. Defaults to ``get_config()``.
+
+    Raises:
+    ------
+    ValueError
+        If the algorithm is unsupported or the signing key ID is not in the key set.
+    """
+    global _algorithm, _verification_keys, _signing_key
+    config = config or get_config()
+    algorithm = config.JWT_ALGORITHM
+    verification_keys = {}
+    signing_key = None
+    if algorithm != "HS256":
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unsupported token algorithm: {algorithm}")
+        verification_keys = load_keyset(config.JWT_KEYSET_FILE)
+        if config.JWT_PRIVATE_KEY_FILE:
+            kid = config.JWT_SIGNING_KID
+            if verification_keys.get(kid, (None,))[0] != algorithm:
+                raise ValueError(f"Signing key {kid!r} is not an {algorithm} key of the key set")
+            with open(config.JWT_PRIVATE_KEY_FILE) as key_file:
+                signing_key = (kid, algorithm, _parse_key(algorithm, key_file.read()))
+    _algorithm, _verification_keys, _signing_key = algorithm, verification_keys, signing_key
+    token_cache.clear()
+
+def generate_key_pair(algorithm):
+    """
+    Generates a key pair for an asymmetric token algorithm.
+
+    Parameters:
+    ----------
+    algorithm : str
+        "RS256" (2048-bit RSA) or "EdDSA" (Ed25519).
+
+    Returns:
+    -------
+    tuple
+        PEM-encoded private key and public key strings.
+    """
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Unsupported token algorithm: {algorithm}")
+    if not has_crypto:
+        raise RuntimeError("The cryptography package is required for RS256 and EdDSA tokens")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+configure_keys()
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Generate a token signing key and add it to a key set.")
+    parser.add_argument("--alg", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--kid", required=True, help="Key ID written to the token header")
+    parser.add_argument("--out", default="keys", help="Directory of the key set and private key")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    private_pem, public_pem = generate_key_pair(args.alg)
+    keyset_path = os.path.join(args.out, "keyset.json")
+    keyset = {"keys": []}
+    if os.path.exists(keyset_path):
+        with open(keyset_path) as keyset_file:
+            keyset = json.load(keyset_file)
+    keyset["keys"] = [key for key in keyset["keys"] if key["kid"] != args.kid]
+    keyset["keys"].append({"kid": args.kid, "alg": args.alg, "public_key": public_pem})
+    with open(keyset_path, "w") as keyset_file:
+        json.dump(keyset, keyset_file, indent=2)
+    private_path = os.path.join(args.out, f"{args.kid}.pem")
+    with open(os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as key_file:
+        key_file.write(private_pem)
+    print(f"Public key added to {keyset_path}; private key written to {private_path}")
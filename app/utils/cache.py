@@ -0,0 +1,208 @@
+"""
+Cache Module
+------------
+This module provides the caching primitives used by the services: a thread-safe
+in-process LRU cache with per-entry expiry, a pluggable shared backend interface,
+and a read-through cache that layers the two.
+
+Classes:
+--------
+- TTLCache
+    Bounded in-process LRU cache whose entries expire after a time-to-live.
+- SharedCacheBackend
+    Interface for a cache shared between processes (e.g. Redis or memcached).
+- LocalSharedBackend
+    In-memory stand-in for a shared backend, used in development and tests.
+- ReadThroughCache
+    Looks keys up in the local cache, then the shared backend, then a loader.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache with a time-to-live per entry.
+
+    Parameters:
+    ----------
+    maxsize : int
+        Maximum number of entries; the least recently used entry is evicted first.
+    ttl : float
+        Seconds after which an entry expires.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        """Remove ``keys`` from the cache if present."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SharedCacheBackend:
+    """
+    Interface of a cache shared by several processes.
+
+    Values are JSON-serialisable objects. Implementations must be safe to call from
+    multiple threads and should treat a missing or expired key as ``None``.
+    """
+
+    def get(self, key):
+        """Return the value stored under ``key`` or None."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """Remove ``keys`` from the backend."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every key from the backend."""
+        raise NotImplementedError
+
+class LocalSharedBackend(SharedCacheBackend):
+    """
+    In-memory stand-in for a shared cache backend.
+
+    Values are stored JSON-encoded, as they would be in a network cache, so that
+    callers never share mutable objects with the backend.
+    """
+
+    def __init__(self):
+        self._store = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._store[key]
+                return None
+            return json.loads(entry[1])
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._store[key] = (time.monotonic() + ttl, json.dumps(value))
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._store.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+class ReadThroughCache:
+    """
+    Two-level read-through cache.
+
+    Lookups try the in-process ``TTLCache`` first, then the optional shared backend,
+    and finally call the loader; loaded values are written back to both levels.
+    ``None`` results are never cached, so missing records are always re-checked.
+
+    Parameters:
+    ----------
+    maxsize : int
+        Maximum number of entries of the in-process cache.
+    ttl : float
+        Time-to-live of entries, in seconds, at both levels.
+    shared : SharedCacheBackend, optional
+        Shared backend consulted after the in-process cache.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, shared=None):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+
+    def set_shared_backend(self, backend):
+        """Plug in (or remove, with None) the shared backend."""
+        self.shared = backend
+        self.local.clear()
+
+    def get_or_load(self, key, loader):
+        """
+        Return the value for ``key``, calling ``loader()`` on a miss at both levels.
+
+        Parameters:
+        ----------
+        key : str
+            Cache key.
+        loader : Callable[[], Any]
+            Function returning the value from the source of truth.
+
+        Returns:
+        -------
+        Any
+            The cached or freshly loaded value.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+                return value
+        value = loader()
+        if value is not None:
+            self.local.set(key, value)
+            if self.shared is not None:
+                self.shared.set(key, value, self.local.ttl)
+        return value
+
+    def invalidate(self, *keys):
+        """Remove ``keys`` from both cache levels."""
+        self.local.delete(*keys)
+        if self.shared is not None:
+            self.shared.delete(*keys)
+
+    def clear(self):
+        """Remove every entry from both cache levels."""
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
@@ -0,0 +1,645 @@
+"""
+Metrics Module
+--------------
+This module provides a small Prometheus metrics registry for the gateway and its
+text exposition, with no dependency on ``prometheus_client``.
+
+Metric values live in a value store. By default every process keeps its own values
+in memory. When ``Config.METRICS_MULTIPROC_DIR`` is set, each worker process writes
+its values into memory-mapped files in that directory instead (one file for
+counters and histograms, one for gauges), and ``/metrics`` sums the files of all
+workers, so any worker answering a scrape reports the whole server.
+
+Updating a metric is a dictionary lookup and an in-place write under a lock; no
+system call or serialisation happens on the request path once a label set has been
+seen. Files of exited workers keep contributing their counters; call
+``mark_process_dead(pid)`` from the process manager (e.g. gunicorn's ``child_exit``
+hook) to drop their gauges, and empty the directory when the server starts.
+
+Classes:
+--------
+- LocalValueStore
+    Float values keyed by string in the memory of this process.
+- MmapValueStore
+    Float values keyed by string in a memory-mapped file, written by one process.
+- Counter, Gauge, Histogram
+    Metric families with optional labels, created through a registry.
+- MetricsRegistry
+    Creates counters, gauges and histograms and renders them as Prometheus text.
+- CircuitBreakerMetrics
+    ``pybreaker`` listener recording circuit breaker states and transitions.
+
+Functions:
+----------
+- install_metrics(app)
+    Count, time and track the in-flight requests of a Flask app.
+- record_rate_limit_rejection(request_limit)
+    ``flask_limiter`` ``on_breach`` callback counting rejected requests.
+- instrument_engine(engine, name)
+    Count the connection pool checkouts of a SQLAlchemy engine.
+- timed_job(func)
+    Record the runs and durations of a scheduled job.
+- mark_process_dead(pid, directory)
+    Remove the gauge file of an exited worker process.
+
+Constants:
+----------
+registry : MetricsRegistry
+    The process-wide registry holding the gateway metrics below.
+CONTENT_TYPE : str
+    Content type of the text exposition format.
+"""
+
+import bisect
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from functools import wraps
+from flask import g, request
+from sqlalchemy import event
+import pybreaker
+from app.config import get_config
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds, from 5 ms to 10 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Scheduled job duration buckets in seconds, from 100 ms to 1 hour
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Store file layout: an 8-byte header holding the bytes in use, then entries of a
+# 4-byte key length, the UTF-8 key padded to 8 bytes and an 8-byte double.
+_HEADER = struct.Struct("i4x")
+_KEY_LENGTH = struct.Struct("i")
+_VALUE = struct.Struct("d")
+
+def _entry_size(key_length):
+    return _KEY_LENGTH.size + key_length + (-(_KEY_LENGTH.size + key_length) % 8) + _VALUE.size
+
+def _read_entries(data):
+    """Yield the key, value and value offset of every entry of a store file's bytes."""
+    used = _HEADER.unpack_from(data, 0)[0] if len(data) >= _HEADER.size else 0
+    position = _HEADER.size
+    while position < used:
+        key_length = _KEY_LENGTH.unpack_from(data, position)[0]
+        key = data[position + _KEY_LENGTH.size:position + _KEY_LENGTH.size + key_length].decode("utf-8")
+        offset = position + _entry_size(key_length) - _VALUE.size
+        yield key, _VALUE.unpack_from(data, offset)[0], offset
+        position = offset + _VALUE.size
+
+class LocalValueStore:
+    """Float values keyed by string, kept in the memory of this process."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, amount):
+        """Add ``amount`` to the value of ``key``."""
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        """Set the value of ``key``."""
+        with self._lock:
+            self._values[key] = value
+
+    def items(self):
+        """Return the (key, value) pairs of the store."""
+        with self._lock:
+            return list(self._values.items())
+
+class MmapValueStore:
+    """
+    Float values keyed by string in a memory-mapped file.
+
+    Only the owning process writes the file; other processes read it with ``read_file``.
+    An entry is written before the header advances past it, so readers never see a
+    partial entry. The file doubles in size when full.
+
+    Parameters:
+    ----------
+    path : str
+        File holding the values; existing entries are loaded.
+    initial_size : int
+        Size in bytes of a new file.
+    """
+
+    def __init__(self, path, initial_size=1 << 16):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(initial_size)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = _HEADER.unpack_from(self._mmap, 0)[0]
+        if self._used == 0:
+            self._used = _HEADER.size
+            _HEADER.pack_into(self._mmap, 0, self._used)
+        self._offsets = {key: offset for key, _, offset in _read_entries(self._mmap)}
+
+    def _offset(self, key):
+        """Return the value offset of ``key``, appending a zero entry if it is new."""
+        offset = self._offsets.get(key)
+        if offset is None:
+            encoded = key.encode("utf-8")
+            size = _entry_size(len(encoded))
+            if self._used + size > self._capacity:
+                while self._used + size > self._capacity:
+                    self._capacity *= 2
+                self._mmap.close()
+                self._file.truncate(self._capacity)
+                self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+            _KEY_LENGTH.pack_into(self._mmap, self._used, len(encoded))
+            self._mmap[self._used + _KEY_LENGTH.size:self._used + _KEY_LENGTH.size + len(encoded)] = encoded
+            offset = self._used + size - _VALUE.size
+            _VALUE.pack_into(self._mmap, offset, 0.0)
+            self._used += size
+            _HEADER.pack_into(self._mmap, 0, self._used)
+            self._offsets[key] = offset
+        return offset
+
+    def add(self, key, amount):
+        """Add ``amount`` to the value of ``key``."""
+        with self._lock:
+            offset = self._offset(key)
+            _VALUE.pack_into(self._mmap, offset, _VALUE.unpack_from(self._mmap, offset)[0] + amount)
+
+    def set(self, key, value):
+        """Set the value of ``key``."""
+        with self._lock:
+            _VALUE.pack_into(self._mmap, self._offset(key), value)
+
+    def items(self):
+        """Return the (key, value) pairs of the store."""
+        with self._lock:
+            return [(key, value) for key, value, _ in _read_entries(self._mmap)]
+
+    def close(self):
+        """Unmap and close the file."""
+        with self._lock:
+            self._mmap.close()
+            self._file.close()
+
+    @staticmethod
+    def read_file(path):
+        """
+        Read the (key, value) pairs of a store file written by any process.
+
+        Parameters:
+        ----------
+        path : str
+            Store file.
+
+        Returns:
+        -------
+        list[tuple[str, float]]
+            The entries of the file; empty if it disappeared meanwhile.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return []
+        return [(key, value) for key, value, _ in _read_entries(data)]
+
+def _sample_key(family, sample, labels):
+    return json.dumps([family, sample, labels], separators=(",", ":"))
+
+class _Metric:
+    """A metric family: a name, help text, label names and one child per label set."""
+
+    kind = None
+    store = "counter"
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Return the child of the given label values, in ``labelnames`` order."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            labels = [[name, str(value)] for name, value in zip(self.labelnames, values)]
+            with self._lock:
+                child = self._children.setdefault(values, self._child(labels))
+        return child
+
+    def _child(self, labels):
+        raise NotImplementedError
+
+    def render(self, samples):
+        """Return the exposition lines of the aggregated (sample, labels, value) triples."""
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for sample, labels, value in sorted(samples, key=lambda entry: (entry[0], entry[1])):
+            lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class _CounterChild:
+    def __init__(self, metric, labels):
+        self._registry = metric.registry
+        self._key = _sample_key(metric.name, metric.name, labels)
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._registry.store("counter").add(self._key, amount)
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. of requests served."""
+
+    kind = "counter"
+
+    def _child(self, labels):
+        return _CounterChild(self, labels)
+
+    def inc(self, amount=1):
+        """Increase the unlabelled counter."""
+        self.labels().inc(amount)
+
+class _GaugeChild:
+    def __init__(self, metric, labels):
+        self._registry = metric.registry
+        self._key = _sample_key(metric.name, metric.name, labels)
+
+    def inc(self, amount=1):
+        self._registry.store("gauge").add(self._key, amount)
+
+    def dec(self, amount=1):
+        self._registry.store("gauge").add(self._key, -amount)
+
+    def set(self, value):
+        self._registry.store("gauge").set(self._key, value)
+
+class Gauge(_Metric):
+    """Value that goes up and down; summed over the live worker processes."""
+
+    kind = "gauge"
+    store = "gauge"
+
+    def _child(self, labels):
+        return _GaugeChild(self, labels)
+
+    def inc(self, amount=1):
+        """Increase the unlabelled gauge."""
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        """Decrease the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value):
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+class _HistogramChild:
+    def __init__(self, metric, labels):
+        self._registry = metric.registry
+        self._bounds = metric.buckets
+        self._bucket_keys = [
+            _sample_key(metric.name, metric.name + "_bucket", labels + [["le", _format_value(bound)]])
+            for bound in metric.buckets + (math.inf,)
+        ]
+        self._sum_key = _sample_key(metric.name, metric.name + "_sum", labels)
+        self._count_key = _sample_key(metric.name, metric.name + "_count", labels)
+
+    def observe(self, value):
+        store = self._registry.store("counter")
+        store.add(self._bucket_keys[bisect.bisect_left(self._bounds, value)], 1)
+        store.add(self._sum_key, value)
+        store.add(self._count_key, 1)
+
+class Histogram(_Metric):
+    """
+    Distribution of observations in cumulative ``le`` buckets, with their sum and count.
+
+    Buckets are stored per bucket and accumulated when rendered, so an observation
+    costs three writes whatever the number of buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def _child(self, labels):
+        return _HistogramChild(self, labels)
+
+    def observe(self, value):
+        """Record an observation in the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def render(self, samples):
+        bounds = self.buckets + (math.inf,)
+        bucket_index = {_format_value(bound): index for index, bound in enumerate(bounds)}
+        series = {}
+        others = []
+        for sample, labels, value in samples:
+            if sample.endswith("_bucket") and labels[-1][1] in bucket_index:
+                counts = series.setdefault(tuple(map(tuple, labels[:-1])), [0.0] * len(bounds))
+                counts[bucket_index[labels[-1][1]]] += value
+            else:
+                others.append((sample, labels, value))
+        lines = super().render(others)
+        buckets = []
+        for labels, counts in sorted(series.items()):
+            total = 0.0
+            for bound, count in zip(bounds, counts):
+                total += count
+                le = [*map(list, labels), ["le", _format_value(bound)]]
+                buckets.append(f"{self.name}_bucket{_format_labels(le)} {_format_value(total)}")
+        return lines[:2] + buckets + lines[2:]
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+class MetricsRegistry:
+    """
+    Registry of the metrics of a process and their Prometheus text exposition.
+
+    Parameters:
+    ----------
+    multiprocess_dir : str, optional
+        Directory shared by the worker processes. When set, values are written to
+        ``counter_<pid>.db`` and ``gauge_<pid>.db`` memory-mapped files there and
+        ``exposition`` aggregates the files of every worker; otherwise values are
+        kept in memory and only this process is reported.
+    """
+
+    def __init__(self, multiprocess_dir=None):
+        self.multiprocess_dir = multiprocess_dir
+        self._metrics = {}
+        self._stores = {}
+        self._lock = threading.Lock()
+        if multiprocess_dir:
+            os.makedirs(multiprocess_dir, exist_ok=True)
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Create and register a ``Counter``."""
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Create and register a ``Gauge``."""
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Create and register a ``Histogram``."""
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def store(self, kind):
+        """Return this process's value store for "counter" or "gauge" values."""
+        store = self._stores.get(kind)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(kind)
+                if store is None:
+                    if self.multiprocess_dir:
+                        path = os.path.join(self.multiprocess_dir, f"{kind}_{os.getpid()}.db")
+                        store = MmapValueStore(path)
+                    else:
+                        store = LocalValueStore()
+                    self._stores[kind] = store
+        return store
+
+    def reset_after_fork(self):
+        """Drop the stores inherited from the parent so a forked worker writes its own files."""
+        self._stores = {}
+
+    def _collect(self):
+        """Return the values of every sample, summed over the worker processes."""
+        if self.multiprocess_dir:
+            entries = []
+            for path in glob.glob(os.path.join(self.multiprocess_dir, "*.db")):
+                entries.extend(MmapValueStore.read_file(path))
+        else:
+            entries = [entry for store in list(self._stores.values()) for entry in store.items()]
+        totals = {}
+        for key, value in entries:
+            totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def exposition(self):
+        """
+        Render every registered metric in the Prometheus text exposition format.
+
+        Returns:
+        -------
+        str
+            The exposition, ending with a newline.
+        """
+        samples = {}
+        for key, value in self._collect().items():
+            family, sample, labels = json.loads(key)
+            samples.setdefault(family, []).append((sample, labels, value))
+        lines = []
+        for name, metric in list(self._metrics.items()):
+            lines.extend(metric.render(samples.get(name, [])))
+        return "\n".join(lines) + "\n"
+
+def mark_process_dead(pid, directory=None):
+    """
+    Remove the gauge file of an exited worker so its in-flight values stop counting.
+
+    Parameters:
+    ----------
+    pid : int
+        Process ID of the exited worker.
+    directory : str, optional
+        Multiprocess directory. Defaults to ``Config.METRICS_MULTIPROC_DIR``.
+    """
+    directory = directory or get_config().METRICS_MULTIPROC_DIR
+    if directory:
+        try:
+            os.remove(os.path.join(directory, f"gauge_{pid}.db"))
+        except FileNotFoundError:
+            pass
+
+registry = MetricsRegistry(get_config().METRICS_MULTIPROC_DIR)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset_after_fork)
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests served.", ("method", "endpoint", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds.", ("method", "endpoint", "status"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.")
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter.", ("endpoint", "limit"))
+circuit_breaker_state = registry.gauge(
+    "circuit_breaker_state", "Processes whose circuit breaker is in each state.", ("breaker", "state"))
+circuit_breaker_transitions = registry.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes.", ("breaker", "from_state", "to_state"))
+db_pool_checkouts = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the database pool.", ("database",))
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Database connections currently checked out.", ("database",))
+db_pool_connects = registry.counter(
+    "db_pool_connects_total", "New database connections opened by the pool.", ("database",))
+scheduler_job_runs = registry.counter(
+    "scheduler_job_runs_total", "Scheduled job runs by outcome.", ("job", "outcome"))
+scheduler_job_duration = registry.histogram(
+    "scheduler_job_duration_seconds", "Scheduled job run time in seconds.", ("job",), buckets=JOB_BUCKETS)
+
+def install_metrics(app):
+    """
+    Count, time and track the in-flight requests of a Flask app.
+
+    Install before the rate limiter so that the requests it rejects are measured too.
+
+    Parameters:
+    ----------
+    app : Flask
+        Application to instrument.
+    """
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+    @app.after_request
+    def record_metrics(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            labels = (request.method, request.endpoint or "unmatched", str(response.status_code))
+            http_requests.labels(*labels).inc()
+            http_request_duration.labels(*labels).observe(time.perf_counter() - started)
+        return response
+
+    @app.teardown_request
+    def finish_metrics(exception=None):
+        if g.pop("metrics_started", None) is not None:
+            http_requests_in_flight.dec()
+
+def record_rate_limit_rejection(request_limit):
+    """
+    Count a request rejected by the rate limiter; pass as ``Limiter(on_breach=...)``.
+
+    Returns None so the limiter still sends its default 429 response.
+    """
+    rate_limit_rejections.labels(request.endpoint or "unmatched", str(request_limit.limit)).inc()
+
+class CircuitBreakerMetrics(pybreaker.CircuitBreakerListener):
+    """
+    ``pybreaker`` listener recording the state and transitions of a circuit breaker.
+
+    Parameters:
+    ----------
+    name : str
+        Breaker name used as the ``breaker`` label.
+    state : str
+        Initial state of the breaker.
+    """
+
+    def __init__(self, name, state=pybreaker.STATE_CLOSED):
+        self.name = name
+        circuit_breaker_state.labels(name, state).set(1)
+
+    def state_change(self, cb, old_state, new_state):
+        old_name = old_state.name if old_state is not None else "none"
+        if old_state is not None:
+            circuit_breaker_state.labels(self.name, old_name).set(0)
+        circuit_breaker_state.labels(self.name, new_state.name).set(1)
+        circuit_breaker_transitions.labels(self.name, old_name, new_state.name).inc()
+
+def instrument_engine(engine, name):
+    """
+    Count the connection pool checkouts and new connections of a SQLAlchemy engine.
+
+    Parameters:
+    ----------
+    engine : Engine
+        Engine whose pool is measured.
+    name : str
+        Value of the ``database`` label.
+    """
+    checkouts = db_pool_checkouts.labels(name)
+    checked_out = db_pool_checked_out.labels(name)
+    connects = db_pool_connects.labels(name)
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+        checked_out.inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    def on_connect(dbapi_connection, connection_record):
+        connects.inc()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    event.listen(engine, "connect", on_connect)
+
+def timed_job(func):
+    """
+    Record the runs, outcome and duration of a scheduled job under its function name.
+
+    An exception raised by the job is printed, counted as an ``error`` run and raised
+    again for the scheduler.
+
+    Parameters:
+    ----------
+    func : Callable
+        The job function.
+
+    Returns:
+    -------
+    Callable
+        The wrapped job, to pass to ``scheduler.add_job``.
+    """
+    duration = scheduler_job_duration.labels(func.__name__)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "success"
+            return result
+        except Exception as e:
+            print(f"Error in scheduled job {func.__name__}: {e}")
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+            scheduler_job_runs.labels(func.__name__, outcome).inc()
+    return wrapper
@@ -0,0 +1,150 @@
+"""
+Pagination Module
+-----------------
+This module provides helpers shared by the listing endpoints for keyset (cursor)
+pagination and column projection.
+
+Listings return a plain JSON list; when more rows are available, the opaque cursor
+of the next page is returned in the ``X-Next-Cursor`` response header and is passed
+back by the client as the ``after`` query parameter.
+
+Functions:
+----------
+- parse_limit(value: Optional[str]) -> int
+    Parses and bounds the ``limit`` query parameter.
+- parse_fields(value: Optional[str], allowed: Sequence[str]) -> list
+    Parses the ``fields`` query parameter against the allowed columns.
+- encode_cursor(*values) -> str
+    Encodes the sort key of the last row of a page into an opaque cursor.
+- decode_cursor(cursor: str) -> list
+    Decodes a cursor produced by ``encode_cursor``.
+- paginated_response(items: list, next_cursor: Optional[str]) -> Response
+    Builds the JSON response of a page, with the next-page cursor header.
+"""
+
+import base64
+import json
+from flask import jsonify
+from app.config import get_config
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def parse_limit(value):
+    """
+    Parses and bounds the ``limit`` query parameter.
+
+    Parameters:
+    ----------
+    value : Optional[str]
+        Raw query parameter value; the configured default is used when missing.
+
+    Returns:
+    -------
+    int
+        Page size between 1 and ``Config.PAGE_SIZE_MAX``.
+
+    Raises:
+    ------
+    ValueError
+        If the value is not a positive integer.
+    """
+    config = get_config()
+    if value is None or value == "":
+        return config.PAGE_SIZE_DEFAULT
+    limit = int(value)
+    if limit <= 0:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, config.PAGE_SIZE_MAX)
+
+def parse_fields(value, allowed):
+    """
+    Parses the comma-separated ``fields`` query parameter.
+
+    Parameters:
+    ----------
+    value : Optional[str]
+        Raw query parameter value; all allowed fields are returned when missing.
+    allowed : Sequence[str]
+        Names of the columns that may be requested, in default output order.
+
+    Returns:
+    -------
+    list
+        Requested field names, without duplicates.
+
+    Raises:
+    ------
+    ValueError
+        If an unknown field is requested.
+    """
+    if not value:
+        return list(allowed)
+    fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def encode_cursor(*values):
+    """
+    Encodes the sort key of the last row of a page into an opaque cursor.
+
+    Parameters:
+    ----------
+    *values : Any
+        JSON-serialisable sort key values (datetimes must be converted first).
+
+    Returns:
+    -------
+    str
+        URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode()
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by ``encode_cursor``.
+
+    Parameters:
+    ----------
+    cursor : str
+        Cursor received in the ``after`` query parameter.
+
+    Returns:
+    -------
+    list
+        The encoded sort key values.
+
+    Raises:
+    ------
+    ValueError
+        If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def paginated_response(items, next_cursor=None):
+    """
+    Builds the JSON response of a page.
+
+    Parameters:
+    ----------
+    items : list
+        Serialisable rows of the page.
+    next_cursor : Optional[str]
+        Cursor of the next page, or None on the last page.
+
+    Returns:
+    -------
+    Response
+        JSON list response carrying the ``X-Next-Cursor`` header when applicable.
+    """
+    response = jsonify(items)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
@@ -0,0 +1,217 @@
+"""
+Password Hashing Module
+-----------------------
+This module hashes and verifies customer passwords with a standard-library key
+derivation function (scrypt or PBKDF2-HMAC-SHA256) whose cost parameters come from
+``app.config``.
+
+Hashes are stored as self-describing strings, so older hashes stay verifiable after
+the cost parameters change and can be upgraded on the next successful login:
+
+- ``scrypt$<n>$<r>$<p>$<salt>$<hash>``
+- ``pbkdf2_sha256$<iterations>$<salt>$<hash>``
+
+Values in any other format are treated as legacy plain-text passwords; they verify
+by constant-time comparison and are always due for a rehash.
+
+Key derivation is CPU-heavy by design, so the routes run it on a bounded worker pool
+instead of the web worker thread. At most ``PASSWORD_HASH_MAX_PENDING`` operations
+may be queued or running; further requests wait up to ``PASSWORD_HASH_QUEUE_TIMEOUT``
+seconds for a slot and then fail with ``PasswordHasherBusy``.
+
+Classes:
+--------
+- PasswordHasherBusy
+    Raised when the worker pool has no free slot in time.
+- PasswordHasher
+    Hashes, verifies and upgrades passwords on a bounded worker pool.
+
+Constants:
+----------
+password_hasher : PasswordHasher
+    The process-wide hasher configured from ``get_config()``.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import get_config
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode().rstrip("=")
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+class PasswordHasherBusy(Exception):
+    """Raised when no worker pool slot becomes free within the queue timeout."""
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords on a bounded worker pool.
+
+    Parameters:
+    ----------
+    config : class
+        Configuration class providing the ``PASSWORD_*`` settings.
+    """
+
+    def __init__(self, config):
+        self.algorithm = config.PASSWORD_HASH_ALGORITHM
+        if self.algorithm not in ("scrypt", "pbkdf2_sha256"):
+            raise ValueError(f"Unsupported password hash algorithm: {self.algorithm}")
+        self.scrypt_params = (config.PASSWORD_SCRYPT_N, config.PASSWORD_SCRYPT_R, config.PASSWORD_SCRYPT_P)
+        self.pbkdf2_iterations = config.PASSWORD_PBKDF2_ITERATIONS
+        self.queue_timeout = config.PASSWORD_HASH_QUEUE_TIMEOUT
+        self._executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+        self._slots = threading.BoundedSemaphore(config.PASSWORD_HASH_MAX_PENDING)
+
+    def _derive(self, password, salt, stored_params=None):
+        """Derives a key with the given (or current) parameters; returns (key, encoded prefix)."""
+        algorithm = stored_params[0] if stored_params else self.algorithm
+        if algorithm == "scrypt":
+            n, r, p = map(int, stored_params[1:]) if stored_params else self.scrypt_params
+            key = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                                 maxmem=128 * r * (n + p + 2), dklen=KEY_BYTES)
+            return key, f"scrypt${n}${r}${p}"
+        iterations = int(stored_params[1]) if stored_params else self.pbkdf2_iterations
+        key = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+        return key, f"pbkdf2_sha256${iterations}"
+
+    def hash_now(self, password):
+        """
+        Hashes a password on the calling thread with the current parameters.
+
+        Parameters:
+        ----------
+        password : str
+            The plain-text password.
+
+        Returns:
+        -------
+        str
+            The encoded hash.
+        """
+        salt = os.urandom(SALT_BYTES)
+        key, prefix = self._derive(password, salt)
+        return f"{prefix}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify_now(self, password, stored):
+        """
+        Verifies a password against a stored value on the calling thread.
+
+        Parameters:
+        ----------
+        password : str
+            The plain-text password presented by the user.
+        stored : str
+            The stored hash, or a legacy plain-text password.
+
+        Returns:
+        -------
+        bool
+            True if the password matches.
+        """
+        parts = stored.split("$")
+        if parts[0] == "scrypt" and len(parts) == 6:
+            params, salt, expected = parts[:4], parts[4], parts[5]
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            params, salt, expected = parts[:2], parts[2], parts[3]
+        else:
+            return hmac.compare_digest(password.encode(), stored.encode())
+        key, _ = self._derive(password, _b64decode(salt), params)
+        return hmac.compare_digest(key, _b64decode(expected))
+
+    def needs_rehash(self, stored):
+        """
+        Tells whether a stored value was produced with other than the current parameters.
+
+        Parameters:
+        ----------
+        stored : str
+            The stored hash, or a legacy plain-text password.
+
+        Returns:
+        -------
+        bool
+            True for legacy plain-text values and hashes with other algorithms or costs.
+        """
+        if self.algorithm == "scrypt":
+            prefix = "scrypt${}${}${}$".format(*self.scrypt_params)
+        else:
+            prefix = f"pbkdf2_sha256${self.pbkdf2_iterations}$"
+        return not stored.startswith(prefix)
+
+    def _run(self, func, *args):
+        """Runs ``func`` on the worker pool, waiting for a free slot first."""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Too many concurrent password operations")
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash_password(self, password):
+        """
+        Hashes a password on the worker pool.
+
+        Parameters:
+        ----------
+        password : str
+            The plain-text password.
+
+        Returns:
+        -------
+        str
+            The encoded hash.
+
+        Raises:
+        ------
+        PasswordHasherBusy
+            If no worker pool slot is free within the queue timeout.
+        """
+        return self._run(self.hash_now, password)
+
+    def check_password(self, password, stored):
+        """
+        Verifies a password on the worker pool and upgrades outdated hashes.
+
+        Parameters:
+        ----------
+        password : str
+            The plain-text password presented by the user.
+        stored : Optional[str]
+            The stored hash; None runs a dummy verification so unknown users take
+            as long to reject as wrong passwords.
+
+        Returns:
+        -------
+        tuple
+            ``(valid, new_hash)`` where ``new_hash`` is a replacement hash with the
+            current parameters when the password is valid but ``stored`` is outdated,
+            otherwise None.
+
+        Raises:
+        ------
+        PasswordHasherBusy
+            If no worker pool slot is free within the queue timeout.
+        """
+        def check():
+            if stored is None:
+                self.hash_now(password)
+                return False, None
+            if not self.verify_now(password, stored):
+                return False, None
+            return True, self.hash_now(password) if self.needs_rehash(stored) else None
+        return self._run(check)
+
+password_hasher = PasswordHasher(get_config())
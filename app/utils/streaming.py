@@ -0,0 +1,188 @@
+"""
+Streaming Export Module
+-----------------------
+This module provides streaming table exports for the services. Rows are read with a
+server-side cursor in batches of ``Config.EXPORT_BATCH_SIZE`` (``yield_per``) and
+written to the client as they are produced, so memory use stays flat regardless of
+the size of the exported table.
+
+Uploads in the same formats are read incrementally with ``iter_records``.
+
+Constants:
+----------
+EXPORT_FORMATS : dict
+    Supported export formats mapped to their MIME types.
+
+Functions:
+----------
+- parse_export_format(value: Optional[str]) -> str
+    Validates the ``format`` query parameter.
+- stream_export(columns: Sequence[Column], order_by: Column, export_format: str, filename: str) -> Response
+    Streams the selected columns of a table as NDJSON or CSV.
+- iter_records(stream: BinaryIO, record_format: str) -> Iterator[tuple]
+    Reads NDJSON or CSV records from a binary stream one at a time.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from app.config import get_config
+from app.database.connection import get_session_factory
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+def parse_export_format(value):
+    """
+    Validates the ``format`` query parameter.
+
+    Parameters:
+    ----------
+    value : Optional[str]
+        Requested format; defaults to "ndjson".
+
+    Returns:
+    -------
+    str
+        A key of ``EXPORT_FORMATS``.
+
+    Raises:
+    ------
+    ValueError
+        If the format is not supported.
+    """
+    export_format = (value or "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {value}")
+    return export_format
+
+def _serialise(value):
+    """Converts a column value to a JSON/CSV friendly representation."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _ndjson_chunk(names, rows):
+    """Encodes a batch of rows as newline-delimited JSON."""
+    return "".join(
+        json.dumps({name: _serialise(value) for name, value in zip(names, row)}) + "\n" for row in rows
+    )
+
+def _csv_chunk(rows):
+    """Encodes a batch of rows as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_serialise(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def stream_export(columns, order_by, export_format, filename):
+    """
+    Streams the selected columns of a table as NDJSON or CSV.
+
+    The generator owns its own session so the export is independent of the
+    request-scoped session.
+
+    Parameters:
+    ----------
+    columns : Sequence[InstrumentedAttribute]
+        Model columns to export.
+    order_by : InstrumentedAttribute
+        Column the rows are ordered by, normally the primary key.
+    export_format : str
+        A key of ``EXPORT_FORMATS``.
+    filename : str
+        Base name of the downloaded file, without extension.
+
+    Returns:
+    -------
+    Response
+        Streaming response whose body is produced batch by batch.
+    """
+    names = [column.key for column in columns]
+    batch_size = get_config().EXPORT_BATCH_SIZE
+
+    def generate():
+        if export_format == "csv":
+            yield _csv_chunk([names])
+        session = get_session_factory()()
+        try:
+            result = session.execute(
+                select(*columns).order_by(order_by).execution_options(yield_per=batch_size)
+            )
+            for rows in result.partitions():
+                if export_format == "csv":
+                    yield _csv_chunk(rows)
+                else:
+                    yield _ndjson_chunk(names, rows)
+        finally:
+            session.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{export_format}"},
+    )
+
+class MalformedRecord(ValueError):
+    """Placeholder yielded by ``iter_records`` for a line that cannot be decoded."""
+
+def _decode_lines(stream, invalid):
+    """Decodes a binary stream line by line, adding the numbers of non-UTF-8 lines to ``invalid``."""
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError:
+            invalid.add(line_number)
+            yield line.decode("utf-8", errors="replace")
+
+def iter_records(stream, record_format):
+    """
+    Reads NDJSON or CSV records from a binary stream one at a time.
+
+    CSV values are returned as strings, keyed by the header row; blank lines are
+    skipped. Lines are decoded one at a time, so a line that is not valid UTF-8 or
+    cannot be parsed is yielded as a ``MalformedRecord`` instance and the caller can
+    report it and carry on.
+
+    Parameters:
+    ----------
+    stream : BinaryIO
+        Request body stream.
+    record_format : str
+        A key of ``EXPORT_FORMATS``.
+
+    Yields:
+    ------
+    tuple
+        ``(line_number, record)`` pairs, where ``record`` is a dict or a ``MalformedRecord``.
+    """
+    invalid = set()
+    lines = _decode_lines(stream, invalid)
+    if record_format == "csv":
+        reader = csv.DictReader(lines)
+        reader.fieldnames  # Reads the header row
+        previous = reader.line_num
+        for row in reader:
+            if invalid.intersection(range(previous + 1, reader.line_num + 1)):
+                yield reader.line_num, MalformedRecord("Invalid UTF-8")
+            elif None in row or None in row.values():
+                yield reader.line_num, MalformedRecord("Row does not match the header")
+            else:
+                yield reader.line_num, row
+            previous = reader.line_num
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if line_number in invalid:
+            yield line_number, MalformedRecord("Invalid UTF-8")
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, MalformedRecord("Invalid JSON")
@@ -2,7 +2,21 @@
 Validation Module
 -----------------
 This module provides utilities for validating user input fields,
-including usernames, passwords, email addresses, and other attributes.
+including usernames, passwords, email addresses, and other attributes,
+and a declarative schema layer for validating request payloads.
+
+A ``Schema`` is declared once per payload at import time. Its ``Field`` specs are
+compiled into one validator function per field, with precompiled regular
+expressions, so validating a payload is a single pass over the declared fields
+that reports every error at once. ``Schema.validate_many`` applies the same
+validators to batches of records.
+
+Classes:
+--------
+- Field
+    Declarative specification of one payload field.
+- Schema
+    Compiled validator of a JSON object payload.
 
 Functions:
 ----------
@@ -22,9 +36,18 @@ Functions:
     Ensures the value is a positive float.
 - validate_positive_int(value: int) -> bool
     Ensures the value is a positive integer.
+- validation_error(errors: dict) -> tuple
+    Builds the 400 JSON response reporting validation errors.
 """
 
 import re
+from flask import jsonify
+
+USERNAME_PATTERN = re.compile(r"^[^ ]{3,30}$")
+PASSWORD_PATTERN = re.compile(r"^(?=.*[A-Za-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$")
+EMAIL_PATTERN = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
+GENDERS = ("Male", "Female", "Other")
+MARITAL_STATUSES = ("Single", "Married", "Divorced", "Widowed")
 
 def validate_username(username):
     """
@@ -40,9 +63,7 @@ def validate_username(username):
     bool
         True if valid, False otherwise.
     """
-    if not username or len(username) < 3 or len(username) > 30 or " " in username:
-        return False
-    return True
+    return isinstance(username, str) and USERNAME_PATTERN.match(username) is not None
 
 def validate_password(password):
     """
@@ -58,8 +79,7 @@ def validate_password(password):
     bool
         True if valid, False otherwise.
     """
-    pattern = r"^(?=.*[A-Za-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$"
-    return bool(re.match(pattern, password))
+    return isinstance(password, str) and PASSWORD_PATTERN.match(password) is not None
 
 def validate_email(email):
     """
@@ -75,8 +95,7 @@ def validate_email(email):
     bool
         True if valid, False otherwise.
     """
-    pattern = r"^[\w\.-]+@[\w\.-]+\.\w+$"
-    return bool(re.match(pattern, email))
+    return isinstance(email, str) and EMAIL_PATTERN.match(email) is not None
 
 def validate_age(age):
     """
@@ -108,7 +127,7 @@ def validate_gender(gender):
     bool
         True if valid, False otherwise.
     """
-    return gender in ["Male", "Female", "Other"]
+    return gender in GENDERS
 
 def validate_marital_status(status):
     """
@@ -124,7 +143,7 @@ def validate_marital_status(status):
     bool
         True if valid, False otherwise.
     """
-    return status in ["Single", "Married", "Divorced", "Widowed"]
+    return status in MARITAL_STATUSES
 
 def validate_positive_float(value):
     """
@@ -157,3 +176,195 @@ def validate_positive_int(value):
         True if valid, False otherwise.
     """
     return isinstance(value, int) and value > 0
+
+_INVALID = object()
+_MISSING = object()
+
+class Field:
+    """
+    Declarative specification of one payload field.
+
+    Parameters:
+    ----------
+    kind : type
+        Expected JSON type: ``str``, ``int``, ``float`` (integers accepted) or ``bool``
+        (0 and 1 accepted and converted).
+    required : bool
+        Whether the field must be present (ignored by partial schemas).
+    default : Any
+        Value used when an optional field is absent; omitted from the result if unset.
+    minimum, maximum : Optional[float]
+        Inclusive bounds of numeric values.
+    greater_than : Optional[float]
+        Exclusive lower bound of numeric values.
+    min_length, max_length : Optional[int]
+        Bounds of string lengths.
+    pattern : Optional[re.Pattern]
+        Precompiled expression a string value must match.
+    choices : Optional[Sequence]
+        Allowed values.
+    message : Optional[str]
+        Error reported for an invalid value; defaults to "Invalid <name>".
+    """
+
+    def __init__(self, kind=str, required=True, default=_MISSING, minimum=None, maximum=None,
+                 greater_than=None, min_length=None, max_length=None, pattern=None, choices=None, message=None):
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.greater_than = greater_than
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern = pattern
+        self.choices = choices
+        self.message = message
+
+    def compile(self):
+        """
+        Compiles the spec into a validator function.
+
+        Returns:
+        -------
+        Callable[[Any], Any]
+            Function returning the (possibly converted) value, or ``_INVALID``.
+        """
+        kind = self.kind
+        checks = []
+        if self.minimum is not None:
+            checks.append(lambda value, bound=self.minimum: value >= bound)
+        if self.maximum is not None:
+            checks.append(lambda value, bound=self.maximum: value <= bound)
+        if self.greater_than is not None:
+            checks.append(lambda value, bound=self.greater_than: value > bound)
+        if self.min_length is not None:
+            checks.append(lambda value, bound=self.min_length: len(value) >= bound)
+        if self.max_length is not None:
+            checks.append(lambda value, bound=self.max_length: len(value) <= bound)
+        if self.pattern is not None:
+            checks.append(lambda value, match=self.pattern.match: match(value) is not None)
+        if self.choices is not None:
+            checks.append(lambda value, allowed=frozenset(self.choices): value in allowed)
+        checks = tuple(checks)
+
+        if kind is bool:
+            def convert(value):
+                return bool(value) if type(value) is bool or (type(value) is int and value in (0, 1)) else _INVALID
+        elif kind is float:
+            def convert(value):
+                return value if type(value) in (int, float) else _INVALID
+        else:
+            def convert(value):
+                return value if type(value) is kind else _INVALID
+
+        def validator(value):
+            value = convert(value)
+            if value is _INVALID:
+                return _INVALID
+            for check in checks:
+                if not check(value):
+                    return _INVALID
+            return value
+        return validator
+
+class Schema:
+    """
+    Compiled validator of a JSON object payload.
+
+    Fields are compiled when the schema is created, normally once at import time.
+    Undeclared keys are dropped from the validated data, so routes never copy
+    unexpected attributes onto their models.
+
+    Parameters:
+    ----------
+    fields : dict
+        ``Field`` specs keyed by field name.
+    partial : bool
+        Treat every field as optional, as for update payloads.
+    """
+
+    def __init__(self, fields, partial=False):
+        self.fields = fields
+        self.partial = partial
+        self._validators = tuple(
+            (name, field.required and not partial, field.default, field.compile(), field.message or f"Invalid {name}")
+            for name, field in fields.items()
+        )
+
+    def validate(self, payload):
+        """
+        Validates a payload in a single pass, collecting every error.
+
+        Parameters:
+        ----------
+        payload : Any
+            Decoded JSON request body.
+
+        Returns:
+        -------
+        tuple
+            ``(data, errors)``: the validated fields and a dict of error messages keyed
+            by field name (empty when the payload is valid).
+        """
+        if not isinstance(payload, dict):
+            return {}, {"body": "Request body must be a JSON object"}
+        data = {}
+        errors = {}
+        for name, required, default, validator, message in self._validators:
+            value = payload.get(name, _MISSING)
+            if value is _MISSING or value is None:
+                if required:
+                    errors[name] = f"Missing field: {name}"
+                elif default is not _MISSING:
+                    data[name] = default
+                continue
+            value = validator(value)
+            if value is _INVALID:
+                errors[name] = message
+            else:
+                data[name] = value
+        return data, errors
+
+    def validate_many(self, records):
+        """
+        Validates a batch of records.
+
+        Parameters:
+        ----------
+        records : Iterable[Any]
+            Decoded records.
+
+        Returns:
+        -------
+        tuple
+            ``(valid, invalid)``: a list of ``(index, data)`` pairs for valid records
+            and a list of ``{"index", "errors"}`` dicts for the others.
+        """
+        valid = []
+        invalid = []
+        validate = self.validate
+        for index, record in enumerate(records):
+            data, errors = validate(record)
+            if errors:
+                invalid.append({"index": index, "errors": errors})
+            else:
+                valid.append((index, data))
+        return valid, invalid
+
+def validation_error(errors):
+    """
+    Builds the 400 JSON response reporting validation errors.
+
+    Parameters:
+    ----------
+    errors : dict
+        Error messages keyed by field name, as returned by ``Schema.validate``.
+
+    Returns:
+    -------
+    tuple
+        JSON response with every message joined in ``error`` and the per-field
+        ``errors``, and the 400 status code.
+    """
+    return jsonify({"error": "; ".join(errors.values()), "errors": errors}), 400
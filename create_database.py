@@ -2,172 +2,464 @@
 create_database.py
 ==================
 
-This module contains the `create_database` function for setting up the SQLite database and tables for the e-commerce platform.
+This module creates the SQLite database of the e-commerce platform and fills it
+with either a few sample rows or a large synthetic dataset.
+
+The schema always comes from the ORM models (``app.database.models``), so the tables,
+indexes, full-text index and triggers are exactly those the services use.
+
+The synthetic dataset is deterministic for a given ``seed``. Item popularity follows
+a Zipf distribution (ItemID 1 is the most popular item, ItemID 2 half as popular, and
+so on), which decides the items of sales, reviews, wishlists and carts. It is loaded
+with one ``executemany`` per table and batch, in a single transaction, without syncing
+and with the secondary indexes built once after the load. The review aggregates and
+co-purchase index are counted in Python while the rows are generated, instead of being
+rebuilt from the loaded tables.
 
 Functions:
 ----------
-- `create_database()`: Connects to the SQLite database and creates the necessary tables if they don't already exist.
+- `create_database(database)`: Creates the tables and inserts the sample rows.
+- `generate_dataset(database, ...)`: Creates the tables and inserts a synthetic dataset.
+
+Classes:
+--------
+- `ZipfSampler`: Draws item IDs by Zipf-distributed popularity.
+
+Usage:
+------
+    python create_database.py
+    python create_database.py --customers 1000000 --items 100000 --sales 5000000 --reviews 1000000
 """
 
+import argparse
+import bisect
+import calendar
+import collections
+import gc
+import itertools
+import operator
+import os
+import random
 import sqlite3
-from datetime import datetime
+import time
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from app import create_database_with_sqlalchemy
+from app.database.connection import get_engine
+from app.database.models import (
+    Base, Customer, InventoryItem, Sale, Review, Wishlist, Cart, ReviewStats, ItemCoPurchase, INVENTORY_FTS_DDL,
+)
+from app.database.review_stats import rebuild_review_stats, COUNTER_COLUMNS
+from app.database.copurchase import rebuild_copurchase_index
+
+# Pragmas of the load connection: an in-memory rollback journal (it only records the
+# pages the load changes, which for empty tables are few) so a failed load is rolled
+# back, no fsync, an exclusive lock and a large page cache for the index builds.
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "locking_mode": "EXCLUSIVE",
+    "temp_store": "MEMORY",
+    "cache_size": -262144,  # 256 MiB
+    "threads": os.cpu_count() or 1,  # Helper threads sorting the index builds
+}
+
+CATEGORIES = ("Food", "Clothes", "Accessories", "Electronics")
+GENDERS = ("Male", "Female", "Other")
+MARITAL_STATUSES = ("Single", "Married", "Divorced", "Widowed")
+RATING_WEIGHTS = (0.05, 0.07, 0.15, 0.33, 0.40)
+
+# Words of generated names, descriptions and comments, drawn with Zipf frequencies
+WORDS = [
+    "".join(random.Random(index).choices("abcdefghijklmnopqrstuvwxyz", k=random.Random(-index).randint(4, 10)))
+    for index in range(5000)
+]
+WORD_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1)))
+
+# Timestamps are generated as seconds since EPOCH and stored in SQLAlchemy's DateTime
+# format, assembled from pools of formatted dates and times of day
+EPOCH = calendar.timegm((2024, 1, 1, 0, 0, 0))
+YEAR_SECONDS = 365 * 24 * 3600
+DAY_SECONDS = 24 * 3600
+DATES = [time.strftime("%Y-%m-%d ", time.gmtime(EPOCH + day * DAY_SECONDS)) for day in range(366)]
+TIMES = [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}.000000" for second in range(DAY_SECONDS)]
 
-def create_database():
+SAMPLE_ROWS = {
+    Customer: [
+        {"FullName": "John Doe", "Username": "johndoe", "PasswordHash": "hashedpassword", "Age": 30,
+         "Address": "123 Main St", "Gender": "Male", "MaritalStatus": "Single", "WalletBalance": 500.0},
+        {"FullName": "Jane Smith", "Username": "janesmith", "PasswordHash": "hashedpassword", "Age": 25,
+         "Address": "456 Elm St", "Gender": "Female", "MaritalStatus": "Married", "WalletBalance": 300.0},
+    ],
+    InventoryItem: [
+        {"Name": "Laptop", "Category": "Electronics", "PricePerItem": 1000.0,
+         "Description": "A high-performance laptop", "StockCount": 10},
+        {"Name": "T-shirt", "Category": "Clothes", "PricePerItem": 20.0,
+         "Description": "A comfortable cotton t-shirt", "StockCount": 50},
+    ],
+    Sale: [
+        {"CustomerID": 1, "ItemID": 1, "Quantity": 1, "TotalPrice": 1000.0},
+        {"CustomerID": 2, "ItemID": 2, "Quantity": 2, "TotalPrice": 40.0},
+    ],
+    Review: [
+        {"CustomerID": 1, "ItemID": 1, "Rating": 5, "Comment": "Amazing product! Highly recommend."},
+        {"CustomerID": 2, "ItemID": 2, "Rating": 4, "Comment": "Good quality but could be cheaper."},
+    ],
+    Wishlist: [{"customerID": 1, "itemID": 1}, {"customerID": 2, "itemID": 2}],
+    Cart: [{"CustomerID": 1, "ItemID": 1, "Quantity": 1}, {"CustomerID": 2, "ItemID": 2, "Quantity": 2}],
+}
+
+
+class ZipfSampler:
     """
-    Creates the SQLite database and necessary tables for the e-commerce platform
-    based on the updated models file.
-
-    Tables Created:
-    ---------------
-    - `Customers`: Stores customer details.
-    - `InventoryItems`: Stores inventory items.
-    - `Sales`: Tracks sales transactions.
-    - `Reviews`: Stores customer reviews for items.
-    - `Wishlist`: Stores wishlist items for customers.
-    - `Carts`: Stores shopping cart items for customers.
+    Draws item IDs with probability proportional to ``1 / ItemID ** exponent``.
+
+    Parameters:
+    -----------
+    items : int
+        Number of items; IDs are drawn from 1 to ``items``.
+    exponent : float
+        Zipf exponent; larger values concentrate popularity on fewer items.
     """
-    # Connect to SQLite database (creates a file if it doesn't exist)
-    connection = sqlite3.connect("ecommerce.db")
-    cursor = connection.cursor()
-
-    # Create Customers table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Customers (
-            CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
-            FullName TEXT NOT NULL,
-            Username TEXT UNIQUE NOT NULL,
-            PasswordHash TEXT NOT NULL,
-            Age INTEGER CHECK (Age > 0),
-            Address TEXT NOT NULL,
-            Gender TEXT CHECK (Gender IN ('Male', 'Female', 'Other')) NOT NULL,
-            MaritalStatus TEXT CHECK (MaritalStatus IN ('Single', 'Married', 'Divorced', 'Widowed')) NOT NULL,
-            WalletBalance REAL DEFAULT 0.0,
-            CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # Create InventoryItems table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS InventoryItems (
-            ItemID INTEGER PRIMARY KEY AUTOINCREMENT,
-            Name TEXT NOT NULL,
-            Category TEXT CHECK (Category IN ('Food', 'Clothes', 'Accessories', 'Electronics')) NOT NULL,
-            PricePerItem REAL NOT NULL,
-            Description TEXT,
-            StockCount INTEGER CHECK (StockCount >= 0) NOT NULL,
-            CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # Create Sales table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Sales (
-            SaleID INTEGER PRIMARY KEY AUTOINCREMENT,
-            CustomerID INTEGER NOT NULL,
-            ItemID INTEGER NOT NULL,
-            Quantity INTEGER CHECK (Quantity > 0) NOT NULL,
-            TotalPrice REAL NOT NULL,
-            SoldAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (CustomerID) REFERENCES Customers(CustomerID) ON DELETE CASCADE,
-            FOREIGN KEY (ItemID) REFERENCES InventoryItems(ItemID) ON DELETE CASCADE
-        )
-    ''')
-
-    # Create Reviews table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Reviews (
-            ReviewID INTEGER PRIMARY KEY AUTOINCREMENT,
-            CustomerID INTEGER NOT NULL,
-            ItemID INTEGER NOT NULL,
-            Rating INTEGER CHECK (Rating >= 1 AND Rating <= 5) NOT NULL,
-            Comment TEXT,
-            IsFlagged BOOLEAN DEFAULT 0,
-            CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (CustomerID) REFERENCES Customers(CustomerID) ON DELETE CASCADE,
-            FOREIGN KEY (ItemID) REFERENCES InventoryItems(ItemID) ON DELETE CASCADE
-        )
-    ''')
-
-    # Create Wishlist table (junction table for many-to-many relationship)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Wishlist (
-            WishlistID INTEGER PRIMARY KEY AUTOINCREMENT,
-            customerID INTEGER NOT NULL,
-            itemID INTEGER NOT NULL,
-            FOREIGN KEY (customerID) REFERENCES Customers(CustomerID) ON DELETE CASCADE,
-            FOREIGN KEY (itemID) REFERENCES InventoryItems(ItemID) ON DELETE CASCADE
-        )
-    ''')
-
-    # Create Carts table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Carts (
-            CustomerID INTEGER NOT NULL,
-            ItemID INTEGER NOT NULL,
-            Quantity INTEGER CHECK (Quantity > 0) NOT NULL,
-            AddedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (CustomerID, ItemID),
-            FOREIGN KEY (CustomerID) REFERENCES Customers(CustomerID) ON DELETE CASCADE,
-            FOREIGN KEY (ItemID) REFERENCES InventoryItems(ItemID) ON DELETE CASCADE
-        )
-    ''')
 
-    # Insert sample data (adjust as needed)
-    try:
-        cursor.executemany('''
-            INSERT INTO Customers (FullName, Username, PasswordHash, Age, Address, Gender, MaritalStatus, WalletBalance)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', [
-            ('John Doe', 'johndoe', 'hashedpassword', 30, '123 Main St', 'Male', 'Single', 500.0),
-            ('Jane Smith', 'janesmith', 'hashedpassword', 25, '456 Elm St', 'Female', 'Married', 300.0)
-        ])
-
-        cursor.executemany('''
-            INSERT INTO InventoryItems (Name, Category, PricePerItem, Description, StockCount)
-            VALUES (?, ?, ?, ?, ?)
-        ''', [
-            ('Laptop', 'Electronics', 1000.0, 'A high-performance laptop', 10),
-            ('T-shirt', 'Clothes', 20.0, 'A comfortable cotton t-shirt', 50)
-        ])
-
-        cursor.executemany('''
-            INSERT INTO Sales (CustomerID, ItemID, Quantity, TotalPrice)
-            VALUES (?, ?, ?, ?)
-        ''', [
-            (1, 1, 1, 1000.0),  
-            (2, 2, 2, 40.0)     
-        ])
-
-        cursor.executemany('''
-            INSERT INTO Reviews (CustomerID, ItemID, Rating, Comment)
-            VALUES (?, ?, ?, ?)
-        ''', [
-            (1, 1, 5, 'Amazing product! Highly recommend.'),
-            (2, 2, 4, 'Good quality but could be cheaper.')
-        ])
-
-        cursor.executemany('''
-            INSERT INTO Wishlist (customerID, itemID)
-            VALUES (?, ?)
-        ''', [
-            (1, 1),
-            (2, 2)
-        ])
-
-        cursor.executemany('''
-            INSERT INTO Carts (CustomerID, ItemID, Quantity)
-            VALUES (?, ?, ?)
-        ''', [
-            (1, 1, 1),
-            (2, 2, 2)
-        ])
-    except sqlite3.IntegrityError as e:
-        print(f"Error inserting sample data: {e}")
-
-    # Commit and close
-    connection.commit()
-    connection.close()
+    def __init__(self, items, exponent=1.0):
+        self.items = items
+        self._weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, items + 1)))
+        self._total = self._weights[-1] if items else 0.0
+
+    def sample(self, rng):
+        """Return one item ID drawn with ``rng``."""
+        return bisect.bisect_left(self._weights, rng.random() * self._total) + 1
+
+    def sample_many(self, rng, count):
+        """Return a list of ``count`` item IDs drawn with ``rng``."""
+        weights, total, draw, bisect_left = self._weights, self._total, rng.random, bisect.bisect_left
+        return [bisect_left(weights, draw() * total) + 1 for _ in range(count)]
+
+    def distinct(self, rng, count):
+        """Return up to ``count`` distinct item IDs drawn with ``rng``."""
+        count = min(count, self.items)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(self.sample(rng))
+        return chosen
+
+
+def _timestamps(days, seconds):
+    """Format days since EPOCH (within the first year) and seconds of the day as DateTime values."""
+    return list(map(operator.add, map(DATES.__getitem__, days), map(TIMES.__getitem__, seconds)))
+
+
+def _columns(rows, width):
+    """Transpose ``rows`` of ``width`` values into ``width`` column tuples."""
+    return list(zip(*rows)) or [()] * width
+
+
+def _insert_sql(table, columns):
+    """Build a positional INSERT for ``columns`` of a table."""
+    for column in columns:
+        table.c[column]  # Raises KeyError for columns the model does not define
+    return f'INSERT INTO "{table.name}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+
+
+def _insert_batches(connection, sql, make_rows, count, batch_size):
+    """Insert the rows built by ``make_rows(start, stop)`` for ``range(count)`` with one executemany per batch."""
+    for start in range(0, count, batch_size):
+        connection.executemany(sql, make_rows(start, min(start + batch_size, count)))
+
+
+def create_database(database="ecommerce.db"):
+    """
+    Creates the database tables from the ORM models and inserts the sample rows.
+
+    Tables that already hold rows are left untouched.
+
+    Parameters:
+    -----------
+    database : str
+        Path of the SQLite database file.
+    """
+    url = f"sqlite:///{database}"
+    create_database_with_sqlalchemy(url)
+    engine = get_engine(url)
+    with engine.begin() as connection:
+        for model, rows in SAMPLE_ROWS.items():
+            if connection.execute(model.__table__.select().limit(1)).first() is None:
+                connection.execute(model.__table__.insert(), rows)
+    with Session(engine) as session:
+        rebuild_review_stats(session)
+        rebuild_copurchase_index(session)
+        session.commit()
+    engine.dispose()
     print("Database and tables created successfully with sample data!")
 
+
+def generate_dataset(database, customers, items, sales, reviews, wishlists=0, carts=0, copurchases=False,
+                     seed=42, zipf_exponent=1.0, batch_size=100000):
+    """
+    Creates the database tables and fills them with a synthetic dataset.
+
+    The database must not hold any rows yet, since generated rows refer to
+    customers and items by the IDs 1 to ``customers`` and 1 to ``items``.
+
+    - Customers are named ``customer<CustomerID>`` and have a large wallet balance.
+    - Every tenth item is out of stock.
+    - Sales and reviews are spread over one year, by uniformly drawn customers,
+      of Zipf-drawn items. They are stored grouped by customer.
+    - Wishlists and carts hold up to three distinct Zipf-drawn items each, for
+      customers 1 to ``wishlists`` and 1 to ``carts``.
+
+    The review aggregates, and optionally the co-purchase index, are counted while
+    the reviews and sales are generated. Everything is written in one transaction:
+    the rows, the secondary and full-text indexes built once the rows are in, the
+    aggregates and the planner statistics. A failure rolls all of it back.
+
+    Parameters:
+    -----------
+    database : str
+        Path of the SQLite database file.
+    customers, items, sales, reviews : int
+        Number of rows of each table.
+    wishlists, carts : int
+        Number of customers with a wishlist and with a cart.
+    copurchases : bool
+        Also fill the co-purchase index of the recommendations service. It holds a
+        row per pair of items bought by a same customer, millions for a large
+        dataset, which makes it the slowest table to generate. Without it the index
+        stays empty until ``python -m app.database.copurchase`` rebuilds it.
+    seed : int
+        Random seed; the same arguments always produce the same rows.
+    zipf_exponent : float
+        Exponent of the item popularity distribution.
+    batch_size : int
+        Rows (or customers, for sales, reviews, wishlists and carts) per executemany call.
+
+    Returns:
+    --------
+    dict
+        Number of rows inserted per table.
+    """
+    if customers < 1 or items < 1:
+        raise ValueError("At least one customer and one item are required")
+    url = f"sqlite:///{database}"
+    create_database_with_sqlalchemy(url)
+    get_engine(url).dispose()
+    popularity = ZipfSampler(items, zipf_exponent)
+    rng = random.Random(seed)
+    # Rows are built a batch at a time, column by column, with rng.random()
+    # arithmetic instead of randint/choice, and text is picked from pools of phrases
+    # drawn once; this keeps generation of millions of rows in the tens of seconds.
+    draw = rng.random
+    uniform = lambda count, scale: [int(scale * draw()) for _ in range(count)]
+    words = lambda count, size=65536: [
+        " ".join(phrase) for phrase in zip(*[iter(rng.choices(WORDS, cum_weights=WORD_WEIGHTS, k=count * size))] * count)
+    ]
+    streets, names, descriptions, comments = words(1, 4096), words(3), words(12), words(8)
+    prices = [round(1 + 1999 * draw(), 2) for _ in range(items)]
+    # Total price of a sale, indexed by (Quantity - 1) * stride + ItemID
+    stride = items + 1
+    totals = [round(quantity * price, 2) for quantity in (1, 2, 3) for price in [0.0, *prices]]
+    rating_weights = list(itertools.accumulate(RATING_WEIGHTS))
+    created_at = _timestamps([0], [0])[0]
+
+    def per_customer(count):
+        """Spread ``count`` rows over uniformly drawn customers; return the rows of each customer."""
+        counts = [0] * customers
+        for customer in uniform(count, customers):
+            counts[customer] += 1
+        return counts
+
+    def owners(counts, start):
+        """Repeat the IDs of customers ``start + 1`` onwards as often as ``counts`` says."""
+        return list(itertools.chain.from_iterable(map(itertools.repeat, itertools.count(start + 1), counts)))
+
+    sales_per_customer, reviews_per_customer = per_customer(sales), per_customer(reviews)
+    # For every item, the number of customers who bought it with each other item
+    related = collections.defaultdict(collections.Counter)
+    # Reviews per (ItemID, Rating), and flagged reviews per ItemID
+    ratings, flagged = collections.Counter(), collections.Counter()
+
+    def customer_rows(start, stop):
+        count = stop - start
+        return [
+            (f"Customer {customer_id}", f"customer{customer_id}", "generated", 18 + age,
+             f"{1 + number} {streets[street].title()} St", GENDERS[gender], MARITAL_STATUSES[status], 1e9, created_at)
+            for customer_id, age, number, street, gender, status in zip(
+                range(start + 1, stop + 1), uniform(count, 63), uniform(count, 999), uniform(count, 4096),
+                uniform(count, 3), uniform(count, 4),
+            )
+        ]
+
+    def item_rows(start, stop):
+        count = stop - start
+        return [
+            (f"{names[name]} {item_id}", CATEGORIES[category], prices[item_id - 1], descriptions[description],
+             0 if item_id % 10 == 0 else 1 + stock, created_at)
+            for item_id, name, category, description, stock in zip(
+                range(start + 1, stop + 1), uniform(count, 65536), uniform(count, 4), uniform(count, 65536),
+                uniform(count, 1000),
+            )
+        ]
+
+    def sale_rows(start, stop):
+        # Sales of a customer are adjacent and ordered by item, which makes the
+        # (CustomerID, ItemID) index cheap to build and yields each customer's basket
+        counts = sales_per_customer[start:stop]
+        buyers, bought = _columns(sorted(zip(owners(counts, start), popularity.sample_many(rng, sum(counts)))), 2)
+        position = 0
+        for purchases in counts if copurchases else ():
+            if purchases > 1:
+                basket = set(bought[position:position + purchases])
+                if len(basket) > 1:
+                    for item_id in basket:
+                        related[item_id].update(basket)
+            position += purchases
+        quantities = uniform(len(bought), 3)
+        return list(zip(
+            buyers, bought, [1 + quantity for quantity in quantities],
+            map(totals.__getitem__, map(operator.add, map(operator.mul, quantities, itertools.repeat(stride)), bought)),
+            _timestamps(uniform(len(bought), 365), uniform(len(bought), DAY_SECONDS)),
+        ))
+
+    def review_rows(start, stop):
+        # Reviews of a customer are adjacent and in creation order, like the
+        # (CustomerID, CreatedAt) index
+        counts = reviews_per_customer[start:stop]
+        count = sum(counts)
+        reviewers, days, seconds = _columns(sorted(zip(
+            owners(counts, start), uniform(count, 365), uniform(count, DAY_SECONDS)
+        )), 3)
+        reviewed = popularity.sample_many(rng, count)
+        stars = [1 + bisect.bisect_left(rating_weights, draw() * rating_weights[-1]) for _ in range(count)]
+        flags = [draw() < 0.01 for _ in range(count)]
+        ratings.update(zip(reviewed, stars))
+        flagged.update(itertools.compress(reviewed, flags))
+        return list(zip(
+            reviewers, reviewed, stars, map(comments.__getitem__, uniform(count, 65536)), flags,
+            _timestamps(days, seconds),
+        ))
+
+    def wishlist_rows(start, stop):
+        return [
+            (customer_id, item_id)
+            for customer_id in range(start + 1, stop + 1) for item_id in popularity.distinct(rng, 3)
+        ]
+
+    def cart_rows(start, stop):
+        return [
+            (customer_id, item_id, 1 + int(3 * draw()), added_at)
+            for customer_id, added_at in zip(
+                range(start + 1, stop + 1),
+                _timestamps([358 + day for day in uniform(stop - start, 7)], uniform(stop - start, DAY_SECONDS)),
+            )
+            for item_id in popularity.distinct(rng, 3)
+        ]
+
+    def review_stats_rows(start, stop):
+        rows = []
+        for item_id in range(start, stop):
+            histogram = [ratings[item_id, rating] for rating in range(1, 6)]
+            reviewed = sum(histogram)
+            if reviewed:
+                rows.append((item_id, reviewed, sum(rating * count for rating, count in enumerate(histogram, start=1)),
+                             *histogram, flagged[item_id]))
+        return rows
+
+    def copurchase_rows(start, stop):
+        rows = []
+        for item_id in range(start, stop):
+            counts = related.get(item_id)
+            if counts:
+                del counts[item_id]
+                related_ids = sorted(counts)
+                rows += zip(itertools.repeat(item_id), related_ids, map(counts.__getitem__, related_ids))
+        return rows
+
+    # (model, columns, row builder, number of rows, customers or items); sales and
+    # reviews come before the aggregates counted while they are generated
+    loads = [
+        (Customer, ("FullName", "Username", "PasswordHash", "Age", "Address", "Gender", "MaritalStatus",
+                    "WalletBalance", "CreatedAt"), customer_rows, customers),
+        (InventoryItem, ("Name", "Category", "PricePerItem", "Description", "StockCount", "CreatedAt"),
+         item_rows, items),
+        (Sale, ("CustomerID", "ItemID", "Quantity", "TotalPrice", "SoldAt"), sale_rows, customers),
+        (Review, ("CustomerID", "ItemID", "Rating", "Comment", "IsFlagged", "CreatedAt"), review_rows, customers),
+        (Wishlist, ("customerID", "itemID"), wishlist_rows, min(wishlists, customers)),
+        (Cart, ("CustomerID", "ItemID", "Quantity", "AddedAt"), cart_rows, min(carts, customers)),
+        (ReviewStats, ("ItemID", *COUNTER_COLUMNS), review_stats_rows, stride),
+        (ItemCoPurchase, ("ItemID", "RelatedItemID", "Count"), copurchase_rows, stride if copurchases else 0),
+    ]
+    # Secondary indexes are dropped during the load and built once afterwards
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+    connection = sqlite3.connect(database, isolation_level=None)
+    # The rows are millions of new tuples, which would trigger a garbage collection
+    # every few hundred rows; none of them can form a reference cycle.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            connection.execute(f"PRAGMA {name}={value}")
+        connection.execute("BEGIN")
+        for model, _, _, _ in loads:
+            if connection.execute(f'SELECT 1 FROM "{model.__tablename__}" LIMIT 1').fetchone():
+                raise ValueError(f"Table {model.__tablename__} of {database} already holds rows")
+        connection.execute("DROP TRIGGER IF EXISTS inventory_fts_ai")
+        for index in indexes:
+            connection.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+        counts = {}
+        for model, columns, rows, count in loads:
+            _insert_batches(connection, _insert_sql(model.__table__, columns), rows, count, batch_size)
+            counts[model.__tablename__] = connection.execute(f'SELECT count(*) FROM "{model.__tablename__}"').fetchone()[0]
+        for index in indexes:
+            connection.execute(str(CreateIndex(index).compile(dialect=sqlite.dialect())))
+        connection.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+        connection.execute(INVENTORY_FTS_DDL[1])
+        # Sampled statistics for the query planner; a full ANALYZE reads every index
+        connection.execute("PRAGMA analysis_limit=1000")
+        connection.execute("ANALYZE")
+        connection.execute("COMMIT")
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+        connection.close()
+    return counts
+
+
 if __name__ == "__main__":
-    create_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the database with sample rows or a synthetic dataset.")
+    parser.add_argument("--database", default="ecommerce.db", help="SQLite database file")
+    parser.add_argument("--customers", type=int, default=0, help="Generated customers; 0 inserts the sample rows")
+    parser.add_argument("--items", type=int, default=100000, help="Generated inventory items")
+    parser.add_argument("--sales", type=int, default=None, help="Generated sales (default: 2 per customer)")
+    parser.add_argument("--reviews", type=int, default=None, help="Generated reviews (default: 1 per customer)")
+    parser.add_argument("--wishlists", type=int, default=None, help="Customers with a wishlist (default: 10%%)")
+    parser.add_argument("--carts", type=int, default=None, help="Customers with a cart (default: 5%%)")
+    parser.add_argument("--copurchases", action="store_true", help="Also fill the co-purchase index (slowest table)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--zipf", type=float, default=1.0, help="Exponent of item popularity")
+    parser.add_argument("--batch-size", type=int, default=100000, help="Rows per executemany")
+    parser.add_argument("--replace", action="store_true", help="Delete the database file first")
+    args = parser.parse_args()
+
+    if args.replace and os.path.exists(args.database):
+        os.remove(args.database)
+    if not args.customers:
+        create_database(args.database)
+    else:
+        start = time.perf_counter()
+        counts = generate_dataset(
+            args.database, args.customers, args.items,
+            sales=2 * args.customers if args.sales is None else args.sales,
+            reviews=args.customers if args.reviews is None else args.reviews,
+            wishlists=args.customers // 10 if args.wishlists is None else args.wishlists,
+            carts=args.customers // 20 if args.carts is None else args.carts,
+            copurchases=args.copurchases, seed=args.seed, zipf_exponent=args.zipf, batch_size=args.batch_size,
+        )
+        print(", ".join(f"{count} {table}" for table, count in counts.items()),
+              f"generated in {time.perf_counter() - start:.1f}s")
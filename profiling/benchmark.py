@@ -0,0 +1,369 @@
+"""
+Load-test and benchmark suite for the service routes.
+
+Generates a dataset with ``create_database.generate_dataset`` (``--scale`` customers
+and items, twice as many sales, as many reviews and Zipf-distributed item
+popularity), drives each route with
+``--concurrency`` client threads for ``--duration`` seconds and reports throughput
+and latency percentiles. Results are written as JSON with ``--output``; passing a
+previous run as ``--baseline`` compares the two and exits with status 1 when a route
+lost more than ``--tolerance`` of its throughput or its p95 latency grew by more.
+
+Requests go through the Flask test client in this process by default, which
+measures the application and database cost per request; ``--url`` sends them over
+HTTP to a running deployment instead.
+
+Usage:
+    python -m profiling.benchmark --scale 100000 --concurrency 8 --duration 10 --output run.json
+    python -m profiling.benchmark --scale 100000 --database bench.db --baseline run.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from flask import Flask
+from sqlalchemy import func, select
+from app.database.connection import get_engine, Session
+from app.database.models import Customer, InventoryItem, Review, Cart, Wishlist
+from app.services.customers.customers import customers_bp
+from app.services.inventory.inventory import inventory_bp
+from app.services.reviews.reviews import reviews_bp
+from app.services.sales.sales import sales_bp
+from app.services.cart.cart import cart_bp
+from app.services.recommendations.recommendations import recommendations_bp
+from app.utils.authentication import generate_token
+from create_database import generate_dataset, ZipfSampler, CATEGORIES, WORDS, WORD_WEIGHTS
+
+# Initialize Flask app with every service and no rate limits
+app = Flask(__name__)
+app.register_blueprint(customers_bp, url_prefix="/customers")
+app.register_blueprint(inventory_bp, url_prefix="/inventory")
+app.register_blueprint(reviews_bp, url_prefix="/reviews")
+app.register_blueprint(sales_bp, url_prefix="/sales")
+app.register_blueprint(cart_bp, url_prefix="/cart")
+app.register_blueprint(recommendations_bp, url_prefix="/recommendations")
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Dataset:
+    """
+    Row counts of a generated benchmark database and samplers of its rows.
+
+    Requests draw items with the popularity the sales and reviews were generated
+    with (see ``create_database.generate_dataset``), so popular pages are also the
+    ones with the most reviews and co-purchases.
+
+    Args:
+        customers (int): Number of customers.
+        items (int): Number of inventory items.
+        reviews (int): Number of reviews.
+        wishlists (int): Number of customers with a wishlist.
+        carts (int): Number of customers with a cart.
+    """
+
+    def __init__(self, customers, items, reviews, wishlists, carts):
+        self.customers = customers
+        self.items = items
+        self.reviews = reviews
+        self.wishlists = wishlists
+        self.carts = carts
+        self.popularity = ZipfSampler(items)
+
+    def item(self, rng):
+        """Return the ID of an item drawn by popularity."""
+        return self.popularity.sample(rng)
+
+    def customer(self, rng):
+        """Return the ID of a uniformly drawn customer."""
+        return rng.randint(1, self.customers)
+
+    def item_in_stock(self, rng, names):
+        """Return the name of an in-stock item drawn by popularity among ``names``."""
+        while True:
+            item_id = self.item(rng)
+            if item_id % 10 and item_id in names:
+                return names[item_id]
+
+    @classmethod
+    def load(cls, session):
+        """Read the row counts of a generated database."""
+        return cls(
+            session.scalar(select(func.count()).select_from(Customer)),
+            session.scalar(select(func.count()).select_from(InventoryItem)),
+            session.scalar(select(func.count()).select_from(Review)),
+            session.scalar(select(func.max(Wishlist.customerID))) or 0,
+            session.scalar(select(func.max(Cart.CustomerID))) or 0,
+        )
+
+
+def route_scenarios(dataset):
+    """
+    Return the benchmarked routes.
+
+    Args:
+        dataset (Dataset): Dataset the request parameters are drawn from.
+
+    Returns:
+        dict: Route name to a function of a random generator returning the
+        ``(method, path, json_body)`` of one request.
+    """
+    # Sales name their item; only the most popular items' names are kept in memory
+    session = Session()
+    item_names = dict(session.execute(select(InventoryItem.ItemID, InventoryItem.Name).where(InventoryItem.ItemID <= 10000)).all())
+    Session.remove()
+
+    def search_text(rng):
+        word = rng.choices(WORDS, cum_weights=WORD_WEIGHTS)[0]
+        return word[:rng.randint(3, len(word))]
+
+    return {
+        "sales.display_goods": lambda rng: ("GET", "/sales/goods", None),
+        "sales.display_goods.filtered": lambda rng: (
+            "GET", f"/sales/goods?category={rng.choice(CATEGORIES)}&max_price={rng.randint(10, 2000)}&sort=-price", None),
+        "sales.search_goods": lambda rng: ("GET", f"/sales/search?q={search_text(rng)}", None),
+        "sales.get_goods_details": lambda rng: ("GET", f"/sales/goods/{dataset.item(rng)}", None),
+        "sales.create_sale": lambda rng: ("POST", "/sales/sale", {
+            "CustomerUsername": f"customer{dataset.customer(rng)}",
+            "ItemName": dataset.item_in_stock(rng, item_names), "Quantity": 1,
+        }),
+        "inventory.get_good": lambda rng: ("GET", f"/inventory/{dataset.item(rng)}", None),
+        "customers.get_customer": lambda rng: ("GET", f"/customers/customer{dataset.customer(rng)}", None),
+        "customers.view_wishlist": lambda rng: ("GET", f"/customers/{rng.randint(1, max(dataset.wishlists, 1))}/wishlist", None),
+        "cart.view_cart": lambda rng: ("GET", f"/cart/{rng.randint(1, max(dataset.carts, 1))}/cart", None),
+        "reviews.get_product_reviews": lambda rng: ("GET", f"/reviews/product/{dataset.item(rng)}", None),
+        "reviews.get_product_review_summary": lambda rng: ("GET", f"/reviews/product/{dataset.item(rng)}/summary", None),
+        "reviews.get_customer_reviews": lambda rng: ("GET", f"/reviews/customer/{dataset.customer(rng)}", None),
+        "reviews.get_review_details": lambda rng: ("GET", f"/reviews/details/{rng.randint(1, dataset.reviews)}", None),
+        "recommendations.recommend_products": lambda rng: ("GET", f"/recommendations/recommend/{dataset.customer(rng)}", None),
+    }
+
+
+def drive(client_factory, request_for, concurrency, duration, seed):
+    """
+    Send requests of one route from ``concurrency`` threads for ``duration`` seconds.
+
+    Args:
+        client_factory (Callable[[], Callable]): Returns a per-thread function sending
+            ``(method, path, body)`` and returning the response status code.
+        request_for (Callable[[Random], tuple]): Builds the next request of the route.
+        concurrency (int): Number of client threads.
+        duration (float): Seconds to run for.
+        seed (int): Base random seed of the threads.
+
+    Returns:
+        tuple[list[float], dict, float]: Latencies in milliseconds, response counts
+        by status code and elapsed seconds.
+    """
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        send = client_factory()
+        own_latencies = []
+        own_statuses = {}
+        barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            method, path, body = request_for(rng)
+            start_time = time.perf_counter()
+            status = send(method, path, body)
+            own_latencies.append(1000 * (time.perf_counter() - start_time))
+            own_statuses[status] = own_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(own_latencies)
+            for status, count in own_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start_time
+
+
+def summarize(latencies, statuses, elapsed):
+    """
+    Summarise one route run.
+
+    Args:
+        latencies (list[float]): Request latencies in milliseconds.
+        statuses (dict): Response counts by status code.
+        elapsed (float): Seconds the run lasted.
+
+    Returns:
+        dict: Requests, errors (responses of 500 and above or failed connections),
+        statuses, throughput in requests/sec and mean, p50, p90, p95, p99 and max
+        latency in milliseconds.
+    """
+    latencies = sorted(latencies)
+    result = {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status >= 500 or status == 0),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "max_ms": latencies[-1] if latencies else None,
+    }
+    for percentile in PERCENTILES:
+        result[f"p{percentile}_ms"] = latencies[int(percentile / 100 * (len(latencies) - 1))] if latencies else None
+    return result
+
+
+def compare(baseline, current, tolerance):
+    """
+    Compare a run against a baseline run.
+
+    A route regresses when its throughput dropped, or its p95 latency grew, by more
+    than ``tolerance`` relative to the baseline, or when it returned server errors
+    the baseline did not.
+
+    Args:
+        baseline (dict): Results of the baseline run, as written by ``--output``.
+        current (dict): Results of this run.
+        tolerance (float): Allowed relative change, e.g. 0.15 for 15%.
+
+    Returns:
+        list[str]: One message per regression; empty when there is none.
+    """
+    regressions = []
+    for route, result in current["routes"].items():
+        reference = baseline.get("routes", {}).get(route)
+        if reference is None:
+            continue
+        if reference["throughput"] and result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{route}: throughput {result['throughput']:.1f}/s < baseline {reference['throughput']:.1f}/s")
+        if reference["p95_ms"] and result["p95_ms"] and result["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {result['p95_ms']:.2f} ms > baseline {reference['p95_ms']:.2f} ms")
+        if result["errors"] and not reference["errors"]:
+            regressions.append(f"{route}: {result['errors']} server errors")
+    return regressions
+
+
+def test_client_factory():
+    """Return a per-thread sender using the Flask test client of this process."""
+    headers = {"Authorization": generate_token(1)}
+
+    def factory():
+        client = app.test_client()
+
+        def send(method, path, body):
+            return client.open(path, method=method, json=body, headers=headers).status_code
+        return send
+    return factory
+
+
+def http_client_factory(url):
+    """Return a per-thread sender using HTTP keep-alive connections to ``url``."""
+    import requests
+    headers = {"Authorization": generate_token(1)}
+
+    def factory():
+        session = requests.Session()
+
+        def send(method, path, body):
+            try:
+                return session.request(method, url.rstrip("/") + path, json=body, headers=headers, timeout=30).status_code
+            except requests.RequestException:
+                return 0
+        return send
+    return factory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10000, help="Customers and items generated (10**3 to 10**6)")
+    parser.add_argument("--database", help="Database file kept between runs; generated only if it does not exist")
+    parser.add_argument("--url", help="Base URL of a running deployment; defaults to the in-process test client")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads per route")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds each route is driven for")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of discarded requests before each route")
+    parser.add_argument("--routes", nargs="+", help="Only benchmark these routes (endpoint names)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON of a previous run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.abspath(args.database or os.path.join(directory, "benchmark.db"))
+        if os.path.exists(path):
+            print(f"Reusing {path}")
+        else:
+            start_time = time.perf_counter()
+            generate_dataset(
+                path, customers=args.scale, items=args.scale, sales=2 * args.scale, reviews=args.scale,
+                wishlists=args.scale // 10, carts=args.scale // 20, copurchases=True,
+            )
+            print(f"Generated {args.scale} customers and items in {time.perf_counter() - start_time:.1f}s")
+        engine = get_engine(f"sqlite:///{path}")
+        Session.remove()
+        Session.configure(bind=engine)
+        session = Session()
+        dataset = Dataset.load(session)
+        Session.remove()
+        print(f"{dataset.customers} customers, {dataset.items} items, {dataset.reviews} reviews")
+
+        scenarios = route_scenarios(dataset)
+        unknown = set(args.routes or ()) - set(scenarios)
+        if unknown:
+            parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+        factory = http_client_factory(args.url) if args.url else test_client_factory()
+        results = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "target": args.url or "test-client",
+                "customers": dataset.customers,
+                "items": dataset.items,
+                "reviews": dataset.reviews,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+            },
+            "routes": {},
+        }
+
+        print(f"{'route':<38}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+        for seed, (route, request_for) in enumerate(scenarios.items()):
+            if args.routes and route not in args.routes:
+                continue
+            if args.warmup:
+                drive(factory, request_for, args.concurrency, args.warmup, seed)
+            result = summarize(*drive(factory, request_for, args.concurrency, args.duration, seed))
+            results["routes"][route] = result
+            print(
+                f"{route:<38}{result['throughput']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['max_ms']:>9.2f}{result['errors']:>8}"
+            )
+        engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
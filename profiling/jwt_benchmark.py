@@ -0,0 +1,98 @@
+"""
+JWT algorithm benchmark.
+
+Signs tokens with HS256, RS256 and EdDSA and reports, for each algorithm, how many
+tokens per second can be signed, verified from scratch (full signature check) and
+verified through the verified-token cache of ``app.utils.authentication``.
+Asymmetric algorithms are skipped when the ``cryptography`` package is missing.
+
+Usage:
+    python -m profiling.jwt_benchmark --tokens 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import jwt
+from app.config import get_config
+from app.utils import authentication
+from app.utils.authentication import configure_keys, generate_key_pair, generate_token, load_keyset, verify_token
+
+
+def configure_algorithm(algorithm, directory):
+    """
+    Generate a key for ``algorithm`` (if asymmetric) and make it the active signing key.
+
+    Args:
+        algorithm (str): "HS256", "RS256" or "EdDSA".
+        directory (str): Directory the key set and private key are written to.
+
+    Returns:
+        tuple: Key and algorithm list to pass to ``jwt.decode`` for uncached verification.
+    """
+    overrides = {"JWT_ALGORITHM": algorithm}
+    if algorithm != "HS256":
+        private_pem, public_pem = generate_key_pair(algorithm)
+        keyset_path = os.path.join(directory, f"{algorithm}.json")
+        private_path = os.path.join(directory, f"{algorithm}.pem")
+        with open(keyset_path, "w") as keyset_file:
+            json.dump({"keys": [{"kid": algorithm, "alg": algorithm, "public_key": public_pem}]}, keyset_file)
+        with open(private_path, "w") as key_file:
+            key_file.write(private_pem)
+        overrides.update(JWT_KEYSET_FILE=keyset_path, JWT_PRIVATE_KEY_FILE=private_path, JWT_SIGNING_KID=algorithm)
+    configure_keys(type("BenchmarkConfig", (get_config(),), overrides))
+    if algorithm == "HS256":
+        return authentication.SECRET_KEY, ["HS256"]
+    return load_keyset(overrides["JWT_KEYSET_FILE"])[algorithm][1], [algorithm]
+
+
+def rate(count, func):
+    """Return how many times per second ``func`` ran when called once per item of ``range(count)``."""
+    start = time.perf_counter()
+    for index in range(count):
+        func(index)
+    return count / (time.perf_counter() - start)
+
+
+def benchmark(algorithm, tokens, directory):
+    """
+    Measure signing, uncached verification and cached verification rates.
+
+    Args:
+        algorithm (str): Algorithm to benchmark.
+        tokens (int): Number of distinct tokens signed and verified.
+        directory (str): Directory for generated keys.
+
+    Returns:
+        dict: Operations per second for "sign", "verify" and "verify_cached".
+    """
+    key, algorithms = configure_algorithm(algorithm, directory)
+    signed = []
+    sign_rate = rate(tokens, lambda index: signed.append(generate_token(index)))
+    verify_rate = rate(tokens, lambda index: jwt.decode(signed[index], key, algorithms=algorithms))
+    for token in signed:
+        verify_token(token)
+    cached_rate = rate(tokens, lambda index: verify_token(signed[index]))
+    return {"sign": sign_rate, "verify": verify_rate, "verify_cached": cached_rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000, help="Tokens signed and verified per algorithm")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10} {'sign/s':>12} {'verify/s':>12} {'cached/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for algorithm in ("HS256", "RS256", "EdDSA"):
+            if algorithm != "HS256" and not authentication.has_crypto:
+                print(f"{algorithm:<10} skipped: the cryptography package is not installed")
+                continue
+            result = benchmark(algorithm, args.tokens, directory)
+            print(f"{algorithm:<10} {result['sign']:>12.0f} {result['verify']:>12.0f} {result['verify_cached']:>12.0f}")
+    configure_keys()
+
+
+if __name__ == "__main__":
+    main()
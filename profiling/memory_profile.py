@@ -4,6 +4,7 @@ from app.services.sales.sales import sales_bp
 from app.services.reviews.reviews import reviews_bp
 from app.services.customers.customers import customers_bp
 from app.services.inventory.inventory import inventory_bp
+from app.utils.authentication import generate_token
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -12,34 +13,44 @@ app.register_blueprint(reviews_bp, url_prefix="/reviews")
 app.register_blueprint(customers_bp, url_prefix="/customers")
 app.register_blueprint(inventory_bp, url_prefix="/inventory")
 
+# Every service route requires a token
+HEADERS = {"Authorization": generate_token(1)}
+
 
 @profile
 def profile_sales_service():
     with app.test_client() as client:
         # Simulate a POST request to create a sale
         data = {"CustomerUsername": "johndoe", "ItemName": "Laptop", "Quantity": 1}
-        client.post("/sales/sale", json=data)
+        client.post("/sales/sale", json=data, headers=HEADERS)
 
 
 @profile
 def profile_reviews_service():
     with app.test_client() as client:
         # Simulate a GET request to fetch review details
-        client.get("/reviews/details/1")
+        client.get("/reviews/details/1", headers=HEADERS)
 
 
 @profile
 def profile_customers_service():
     with app.test_client() as client:
         # Simulate a GET request to fetch customer details
-        client.get("/customers/1")
+        client.get("/customers/johndoe", headers=HEADERS)
+
+
+@profile
+def profile_goods_listing():
+    with app.test_client() as client:
+        # Simulate a GET request to list available goods
+        client.get("/sales/goods", headers=HEADERS)
 
 
 @profile
 def profile_inventory_service():
     with app.test_client() as client:
-        # Simulate a GET request to fetch available goods
-        client.get("/inventory/goods")
+        # Simulate a GET request to fetch an inventory item
+        client.get("/inventory/1", headers=HEADERS)
 
 
 if __name__ == "__main__":
@@ -47,3 +58,4 @@ if __name__ == "__main__":
     profile_reviews_service()
     profile_customers_service()
     profile_inventory_service()
+    profile_goods_listing()
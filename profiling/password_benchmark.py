@@ -0,0 +1,86 @@
+"""
+Password hashing benchmark.
+
+Measures how many password verifications per second (the CPU cost of a login) the
+bounded hashing pool sustains under concurrent logins, for a range of scrypt and
+PBKDF2 cost settings, so the ``PASSWORD_*`` parameters can be chosen for our load.
+
+Usage:
+    python -m profiling.password_benchmark --logins 64 --clients 16
+"""
+
+import argparse
+import threading
+import time
+from app.config import get_config
+from app.utils.passwords import PasswordHasher
+
+COST_SETTINGS = [
+    ("scrypt", {"PASSWORD_SCRYPT_N": 2 ** 12}),
+    ("scrypt", {"PASSWORD_SCRYPT_N": 2 ** 14}),
+    ("scrypt", {"PASSWORD_SCRYPT_N": 2 ** 15}),
+    ("pbkdf2_sha256", {"PASSWORD_PBKDF2_ITERATIONS": 100000}),
+    ("pbkdf2_sha256", {"PASSWORD_PBKDF2_ITERATIONS": 310000}),
+    ("pbkdf2_sha256", {"PASSWORD_PBKDF2_ITERATIONS": 600000}),
+]
+
+
+def benchmark(algorithm, overrides, logins, clients, workers):
+    """
+    Run ``logins`` concurrent verifications of a correct password.
+
+    Args:
+        algorithm (str): "scrypt" or "pbkdf2_sha256".
+        overrides (dict): Cost settings applied on top of the active configuration.
+        logins (int): Total number of verifications.
+        clients (int): Number of threads submitting verifications.
+        workers (int): Size of the hashing pool.
+
+    Returns:
+        tuple: Logins per second and mean latency in milliseconds.
+    """
+    config = type("BenchmarkConfig", (get_config(),), {
+        "PASSWORD_HASH_ALGORITHM": algorithm,
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_MAX_PENDING": clients,
+        **overrides,
+    })
+    hasher = PasswordHasher(config)
+    stored = hasher.hash_now("StrongP@ssword1")
+    latencies = []
+    lock = threading.Lock()
+
+    def client(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            valid, _ = hasher.check_password("StrongP@ssword1", stored)
+            assert valid
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(logins // clients,)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, 1000 * sum(latencies) / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64, help="Verifications per cost setting")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent login threads")
+    parser.add_argument("--workers", type=int, default=get_config().PASSWORD_HASH_WORKERS, help="Hashing pool size")
+    args = parser.parse_args()
+
+    print(f"{'setting':<36} {'logins/s':>10} {'mean ms':>10}")
+    for algorithm, overrides in COST_SETTINGS:
+        label = f"{algorithm} " + " ".join(f"{key.split('_')[-1]}={value}" for key, value in overrides.items())
+        per_second, latency = benchmark(algorithm, overrides, args.logins, args.clients, args.workers)
+        print(f"{label:<36} {per_second:>10.1f} {latency:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Product search benchmark.
+
+Builds a synthetic catalogue in a temporary SQLite database, indexes it with the
+``inventory_fts`` full-text table and reports p50/p99 latency of the queries run by
+``GET /sales/search`` (first page and a later page, with and without a category
+filter).
+
+Usage:
+    python -m profiling.search_benchmark --items 1000000 --queries 500
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from app.database.models import Base, InventoryItem, INVENTORY_FTS_DDL
+from app.database.search import search_items
+
+# Synthetic vocabulary; word frequencies follow a Zipf distribution, as in real
+# product text, so common words match a large share of the catalogue.
+VOCABULARY = ["".join(random.Random(index).choices("abcdefghijklmnopqrstuvwxyz", k=random.Random(-index).randint(4, 10)))
+              for index in range(5000)]
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+CATEGORIES = ["Electronics", "Accessories", "Office", "Clothes", "Home"]
+
+
+def populate(engine, items, chunk=50000):
+    """Insert ``items`` random catalogue rows, then rebuild the full-text index in one pass."""
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TRIGGER inventory_fts_ai")
+        for start in range(0, items, chunk):
+            rows = [
+                {
+                    "Name": " ".join(rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=3)) + f" {start + index}",
+                    "Category": rng.choice(CATEGORIES),
+                    "PricePerItem": round(rng.uniform(1, 2000), 2),
+                    "Description": " ".join(rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=12)),
+                    "StockCount": rng.randint(0, 100),
+                }
+                for index in range(min(chunk, items - start))
+            ]
+            connection.execute(insert(InventoryItem), rows)
+        connection.exec_driver_sql("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql(INVENTORY_FTS_DDL[1])
+
+
+def measure(engine, queries, limit, category, pages):
+    """Return p50 and p99 latency in milliseconds of ``pages`` consecutive result pages."""
+    rng = random.Random(7)
+    latencies = []
+    with Session(engine) as session:
+        for _ in range(queries):
+            words = rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=rng.randint(1, 2))
+            text = " ".join(word[:rng.randint(3, len(word))] for word in words)
+            after = None
+            for _ in range(pages):
+                start = time.perf_counter()
+                rows = search_items(session, text, category, limit, after)
+                latencies.append(1000 * (time.perf_counter() - start))
+                if len(rows) <= limit:
+                    break
+                after = (rows[limit - 1].Rank, rows[limit - 1].ItemID)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000000, help="Catalogue size")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per scenario")
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+        Base.metadata.create_all(engine)
+        start = time.perf_counter()
+        populate(engine, args.items)
+        print(f"Indexed {args.items} items in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'scenario':<28} {'p50 ms':>8} {'p99 ms':>8}")
+        for label, category, pages in (
+            ("first page", None, 1),
+            ("first page, category", "Office", 1),
+            ("three pages", None, 3),
+        ):
+            p50, p99 = measure(engine, args.queries, args.limit, category, pages)
+            print(f"{label:<28} {p50:>8.2f} {p99:>8.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
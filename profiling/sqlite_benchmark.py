@@ -0,0 +1,137 @@
+"""
+SQLite profile benchmark for concurrent checkouts.
+
+Runs concurrent ``POST /sales/sale`` requests against a fresh database file for each
+SQLite pragma profile in ``app.config.SQLITE_PROFILES`` and reports completed
+sales per second, lock errors and the journal mode in effect.
+
+Usage:
+    python -m profiling.sqlite_benchmark --workers 8 --requests 200
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from flask import Flask
+from sqlalchemy import text
+from app.config import get_config, SQLITE_PROFILES
+from app.database.connection import get_engine, Session
+from app.database.models import Base, Customer, InventoryItem
+from app.services.sales.sales import sales_bp
+from app.utils.authentication import generate_token
+
+# Initialize Flask app
+app = Flask(__name__)
+app.register_blueprint(sales_bp, url_prefix="/sales")
+
+
+def seed_database(engine, workers, requests_per_worker):
+    """
+    Create the schema and one customer and item per worker with enough funds and stock.
+
+    Args:
+        engine (Engine): Engine of the benchmark database.
+        workers (int): Number of concurrent workers.
+        requests_per_worker (int): Number of sales each worker will attempt.
+    """
+    Base.metadata.create_all(engine)
+    session = Session()
+    for index in range(workers):
+        session.add(Customer(
+            FullName=f"Bench Customer {index}",
+            Username=f"bench{index}",
+            PasswordHash="hashedpassword",
+            Age=30,
+            Address="Beirut",
+            Gender="Other",
+            MaritalStatus="Single",
+            WalletBalance=float(requests_per_worker * 10),
+        ))
+        session.add(InventoryItem(
+            Name=f"Bench Item {index}",
+            Category="Electronics",
+            PricePerItem=1.0,
+            Description="Benchmark item",
+            StockCount=requests_per_worker * 10,
+        ))
+    session.commit()
+    Session.remove()
+
+
+def run_profile(profile, workers, requests_per_worker, directory):
+    """
+    Benchmark concurrent sales against a new database using one pragma profile.
+
+    Args:
+        profile (str): Name of the profile in ``SQLITE_PROFILES``.
+        workers (int): Number of concurrent client threads.
+        requests_per_worker (int): Number of sales each thread submits.
+        directory (str): Directory in which the database file is created.
+
+    Returns:
+        dict: Profile name, journal mode, completed sales, errors, elapsed seconds and sales/sec.
+    """
+    config = type(f"{profile.title()}BenchmarkConfig", (get_config(),), {"SQLITE_PROFILE": profile})
+    engine = get_engine(f"sqlite:///{os.path.join(directory, profile + '.db')}", config)
+    Session.remove()
+    Session.configure(bind=engine)
+    seed_database(engine, workers, requests_per_worker)
+    with engine.connect() as connection:
+        journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+
+    headers = {"Authorization": generate_token(1)}
+    results = {"completed": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(workers)
+
+    def worker(index):
+        completed = errors = 0
+        sale = {"CustomerUsername": f"bench{index}", "ItemName": f"Bench Item {index}", "Quantity": 1}
+        with app.test_client() as client:
+            barrier.wait()
+            for _ in range(requests_per_worker):
+                response = client.post("/sales/sale", json=sale, headers=headers)
+                if response.status_code == 201:
+                    completed += 1
+                else:
+                    errors += 1
+        with lock:
+            results["completed"] += completed
+            results["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(workers)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "journal_mode": journal_mode,
+        "completed": results["completed"],
+        "errors": results["errors"],
+        "seconds": elapsed,
+        "sales_per_second": results["completed"] / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent client threads.")
+    parser.add_argument("--requests", type=int, default=200, help="Sales submitted per worker.")
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), help="Profiles to compare.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'Profile':<12}{'Journal':<10}{'Completed':>10}{'Errors':>8}{'Seconds':>10}{'Sales/sec':>12}")
+        for profile in args.profiles:
+            result = run_profile(profile, args.workers, args.requests, directory)
+            print(
+                f"{result['profile']:<12}{result['journal_mode']:<10}{result['completed']:>10}"
+                f"{result['errors']:>8}{result['seconds']:>10.2f}{result['sales_per_second']:>12.1f}"
+            )
@@ -0,0 +1,207 @@
+"""
+Test Suite for Cart Service
+===========================
+
+This module contains test cases for the Cart service, covering adding and viewing
+cart items and converting a whole cart into sales.
+
+Tested APIs:
+------------
+- POST /cart/<int:customer_id>/cart
+- GET /cart/<int:customer_id>/cart
+- POST /cart/<int:customer_id>/checkout
+
+The abandoned cart sweep used by the scheduled job is tested directly.
+
+Setup:
+------
+- The database is recreated before each test with one customer and two items.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from flask import Flask
+from app.services.cart.cart import cart_bp
+from app.database.abandoned_carts import sweep_abandoned_carts
+from app.database.models import Base, Cart, Customer, InventoryItem, Sale, Session, engine
+
+@pytest.fixture
+def client():
+    """
+    Fixture to provide a Flask test client with a customer and two inventory items.
+
+    Yields:
+    -------
+    Flask test client for making HTTP requests.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(cart_bp, url_prefix="/cart")
+    app.config["TESTING"] = True
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = Session()
+    session.add(Customer(
+        FullName="John Doe",
+        Username="johndoe",
+        PasswordHash="hashedpassword",
+        Age=30,
+        Address="123 Main St",
+        Gender="Male",
+        MaritalStatus="Single",
+        WalletBalance=500.0
+    ))
+    session.add(InventoryItem(Name="Laptop", Category="Electronics", PricePerItem=300.0,
+                              Description="High-performance laptop", StockCount=10))
+    session.add(InventoryItem(Name="Mouse", Category="Electronics", PricePerItem=20.0,
+                              Description="Wireless mouse", StockCount=5))
+    session.commit()
+    Session.remove()
+
+    with app.test_client() as client:
+        yield client
+
+def test_add_and_view_cart(client):
+    """
+    Test adding items to the cart and viewing it.
+
+    Verifies:
+    - Quantities of repeated additions are merged.
+    - The cart view lists every item with its name.
+    """
+    client.post("/cart/1/cart", json={"item_id": 1, "quantity": 1})
+    client.post("/cart/1/cart", json={"item_id": 2, "quantity": 1})
+    client.post("/cart/1/cart", json={"item_id": 2, "quantity": 2})
+    response = client.get("/cart/1/cart")
+    assert response.status_code == 200
+    data = {line["Name"]: line["Quantity"] for line in response.get_json()}
+    assert data == {"Laptop": 1, "Mouse": 3}
+
+def test_add_to_cart_validation(client):
+    """
+    Test that invalid cart lines are rejected with every error reported.
+
+    Verifies:
+    - Status code is 400 and both invalid fields are listed.
+    - Nothing is added to the cart.
+    """
+    response = client.post("/cart/1/cart", json={"item_id": "1", "quantity": 0})
+    assert response.status_code == 400
+    assert response.get_json()["errors"] == {"item_id": "Invalid item_id", "quantity": "Invalid quantity"}
+    assert client.get("/cart/1/cart").get_json() == []
+
+def test_checkout_cart(client):
+    """
+    Test converting a whole cart into sales.
+
+    Verifies:
+    - Status code is 201 and the total price is reported.
+    - Stock and wallet are debited, one sale is recorded per line and the cart is emptied.
+    """
+    client.post("/cart/1/cart", json={"item_id": 1, "quantity": 1})
+    client.post("/cart/1/cart", json={"item_id": 2, "quantity": 3})
+    response = client.post("/cart/1/checkout")
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["ItemsPurchased"] == 2
+    assert data["TotalPrice"] == 360.0
+
+    session = Session()
+    assert session.get(Customer, 1).WalletBalance == 140.0
+    assert session.get(InventoryItem, 1).StockCount == 9
+    assert session.get(InventoryItem, 2).StockCount == 2
+    assert session.query(Sale).count() == 2
+    assert session.query(Cart).count() == 0
+    session.close()
+
+def test_checkout_insufficient_stock(client):
+    """
+    Test that a cart with one unavailable line is rejected as a whole.
+
+    Verifies:
+    - Status code is 400.
+    - No stock, wallet, sale or cart row is changed.
+    """
+    client.post("/cart/1/cart", json={"item_id": 1, "quantity": 1})
+    client.post("/cart/1/cart", json={"item_id": 2, "quantity": 6})
+    response = client.post("/cart/1/checkout")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Insufficient stock for items: [2]"
+
+    session = Session()
+    assert session.get(Customer, 1).WalletBalance == 500.0
+    assert session.get(InventoryItem, 1).StockCount == 10
+    assert session.query(Sale).count() == 0
+    assert session.query(Cart).count() == 2
+    session.close()
+
+def test_checkout_insufficient_wallet_balance(client):
+    """
+    Test that a cart costing more than the wallet balance is rejected.
+
+    Verifies:
+    - Status code is 400.
+    - Stock is left untouched.
+    """
+    client.post("/cart/1/cart", json={"item_id": 1, "quantity": 2})
+    response = client.post("/cart/1/checkout")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Insufficient wallet balance"
+
+    session = Session()
+    assert session.get(InventoryItem, 1).StockCount == 10
+    session.close()
+
+def test_checkout_empty_cart(client):
+    """
+    Test checking out an empty cart and an unknown customer.
+
+    Verifies:
+    - An empty cart returns 400.
+    - An unknown customer returns 404.
+    """
+    assert client.post("/cart/1/checkout").status_code == 400
+    assert client.post("/cart/99/checkout").status_code == 404
+
+def test_sweep_abandoned_carts(client):
+    """
+    Test the chunked abandoned cart sweep.
+
+    Verifies:
+    - Only lines older than the threshold are notified and deleted.
+    - Lines are delivered to the sink in chunks with the customer's username.
+    - Lines of unknown customers are deleted without a notification.
+    - The returned statistics count chunks, rows and customers.
+    """
+    session = Session()
+    old = datetime.utcnow() - timedelta(days=2)
+    session.add(Customer(FullName="Jane Doe", Username="janedoe", PasswordHash="hashedpassword",
+                         Age=28, Address="456 Main St", Gender="Female", MaritalStatus="Single"))
+    session.add_all([
+        Cart(CustomerID=1, ItemID=1, Quantity=1, AddedAt=old),
+        Cart(CustomerID=1, ItemID=2, Quantity=2, AddedAt=old),
+        Cart(CustomerID=2, ItemID=1, Quantity=1, AddedAt=old),
+        Cart(CustomerID=2, ItemID=2, Quantity=1, AddedAt=datetime.utcnow()),
+        Cart(CustomerID=99, ItemID=1, Quantity=1, AddedAt=old),
+    ])
+    session.commit()
+    session.close()
+
+    chunks = []
+    stats = sweep_abandoned_carts(
+        notify=chunks.append, threshold=datetime.utcnow() - timedelta(days=1), chunk_size=2
+    )
+
+    assert [[(row.Username, row.ItemID) for row in chunk] for chunk in chunks] == [
+        [("johndoe", 1), ("johndoe", 2)],
+        [("janedoe", 1)],
+    ]
+    assert stats["Chunks"] == 2
+    assert stats["LinesNotified"] == 3
+    assert stats["RowsDeleted"] == 4
+    assert stats["Customers"] == 2
+    assert stats["DurationSeconds"] >= 0
+
+    session = Session()
+    assert [(line.CustomerID, line.ItemID) for line in session.query(Cart).all()] == [(2, 2)]
+    session.close()
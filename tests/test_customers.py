@@ -20,14 +20,28 @@ Test Cases:
 - `test_update_customer`: Validates updating a customer's details.
 - `test_delete_customer`: Validates deletion of a customer.
 - `test_wallet_operations`: Validates wallet operations (charging and deducting amounts).
+- `test_get_customers_paginated`: Validates keyset pagination of the customer listing.
+- `test_get_customers_projection`: Validates field projection of the customer listing.
+- `test_export_customers`: Validates streaming NDJSON and CSV exports of customers.
+- `test_login_upgrades_password_hash`: Validates login against hashed and legacy passwords.
+- `test_view_wishlist_single_query`: Validates the wishlist view reads every entry with one statement.
+- `test_delete_customer_with_references`: Validates deleting a referenced customer under the production profile.
 """
 
 import pytest
+import json
 import sys
 from pathlib import Path
+from flask import Flask
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from app.app import app
-from app.database.models import Base, engine, Session, Customer
+from app.config import get_config
+from app.services.customers import customers as customers_service
+from app.services.customers.customers import customers_bp
+from app.utils.passwords import PasswordHasher
+from app.utils.authentication import generate_token
+from app.database.models import Base, engine, Session, Customer, InventoryItem, Wishlist
+from app.database.connection import get_engine
 
 @pytest.fixture
 def client():
@@ -162,3 +176,200 @@ def test_wallet_operations(client):
     print("Deduct Wallet Response Data:", response.json)  # Debug print
     assert response.status_code == 200
     assert response.json["message"] == "Wallet deducted successfully!"
+
+@pytest.fixture
+def listing_client():
+    """
+    Configures a test client for the customers blueprint alone (without the gateway's
+    rate limits) and seeds five customers.
+
+    Yields:
+    -------
+    - FlaskClient: Configured test client for Flask.
+    """
+    listing_app = Flask(__name__)
+    listing_app.register_blueprint(customers_bp, url_prefix="/customers")
+    listing_app.config["TESTING"] = True
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = Session()
+    for index in range(5):
+        session.add(Customer(
+            FullName=f"Customer {index}",
+            Username=f"customer{index}",
+            PasswordHash="hashedpassword",
+            Age=20 + index,
+            Address="Beirut, Lebanon",
+            Gender="Female",
+            MaritalStatus="Single"
+        ))
+    session.commit()
+    session.close()
+    with listing_app.test_client() as client:
+        yield client
+
+def test_get_customers_paginated(listing_client):
+    """
+    Test Case: Page through customers with limit/after.
+
+    Validates:
+    ----------
+    - Pages are ordered by CustomerID and do not overlap.
+    - The X-Next-Cursor header is only present while more customers exist.
+    """
+    response = listing_client.get("/customers/?limit=2")
+    assert response.status_code == 200
+    assert [c["CustomerID"] for c in response.json] == [1, 2]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = listing_client.get(f"/customers/?limit=2&after={cursor}")
+    assert [c["CustomerID"] for c in response.json] == [3, 4]
+
+    response = listing_client.get(f"/customers/?limit=2&after={response.headers['X-Next-Cursor']}")
+    assert [c["CustomerID"] for c in response.json] == [5]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert listing_client.get("/customers/?limit=0").status_code == 400
+
+def test_get_customers_projection(listing_client):
+    """
+    Test Case: Select only some customer fields.
+
+    Validates:
+    ----------
+    - Only the requested fields are returned.
+    - Unknown fields (including the password hash) are rejected.
+    """
+    response = listing_client.get("/customers/?fields=Username,Age&limit=1")
+    assert response.status_code == 200
+    assert response.json == [{"Username": "customer0", "Age": 20}]
+    assert listing_client.get("/customers/?fields=PasswordHash").status_code == 400
+
+def test_export_customers(listing_client):
+    """
+    Test Case: Stream all customers as NDJSON and CSV.
+
+    Validates:
+    ----------
+    - The response is streamed with the format's MIME type.
+    - Every customer is exported exactly once, without the password hash.
+    - Anonymous callers are rejected with 401.
+    """
+    assert listing_client.get("/customers/export").status_code == 401
+
+    headers = {"Authorization": generate_token(1)}
+    response = listing_client.get("/customers/export", headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["Username"] for row in rows] == [f"customer{index}" for index in range(5)]
+    assert "PasswordHash" not in rows[0]
+
+    response = listing_client.get("/customers/export?format=csv&fields=CustomerID,Username", headers=headers)
+    assert response.mimetype == "text/csv"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == "CustomerID,Username"
+    assert lines[1] == "1,customer0"
+    assert len(lines) == 6
+
+    assert listing_client.get("/customers/export?format=xml", headers=headers).status_code == 400
+
+def test_login_upgrades_password_hash(listing_client, monkeypatch):
+    """
+    Test Case: Log in against a legacy plain-text password and a hash with outdated costs.
+
+    Validates:
+    ----------
+    - Wrong passwords and unknown users are rejected with 401.
+    - A successful login replaces the stored value with a hash of the current costs.
+    - The upgraded hash keeps working for later logins.
+    """
+    cheap = type("CheapConfig", (get_config(),), {"PASSWORD_SCRYPT_N": 2 ** 8})
+    monkeypatch.setattr(customers_service, "password_hasher", PasswordHasher(cheap))
+    credentials = {"Username": "customer0", "PasswordHash": "hashedpassword"}
+
+    assert listing_client.post("/customers/login", json={**credentials, "PasswordHash": "wrong"}).status_code == 401
+    assert listing_client.post("/customers/login", json={**credentials, "Username": "nobody"}).status_code == 401
+    response = listing_client.post("/customers/login", json=credentials)
+    assert response.status_code == 200
+    assert "token" in response.json
+
+    session = Session()
+    upgraded = session.query(Customer).filter_by(Username="customer0").one().PasswordHash
+    session.close()
+    assert upgraded.startswith("scrypt$256$8$1$")
+
+    stronger = type("StrongerConfig", (cheap,), {"PASSWORD_SCRYPT_N": 2 ** 9})
+    monkeypatch.setattr(customers_service, "password_hasher", PasswordHasher(stronger))
+    assert listing_client.post("/customers/login", json=credentials).status_code == 200
+    session = Session()
+    assert session.query(Customer).filter_by(Username="customer0").one().PasswordHash.startswith("scrypt$512$8$1$")
+    session.close()
+
+def test_view_wishlist_single_query(listing_client):
+    """
+    Test Case: View a wishlist of several items within the route's query budget.
+
+    Validates:
+    ----------
+    - Every entry is returned with its item name and price.
+    - The view stays within its one-statement budget (enforced in testing mode).
+    """
+    session = Session()
+    session.add_all([
+        InventoryItem(Name=f"Item {index}", Category="Books", PricePerItem=10.0 + index, StockCount=1)
+        for index in range(3)
+    ])
+    session.add_all([Wishlist(customerID=1, itemID=item_id) for item_id in (1, 2, 3)])
+    session.commit()
+    session.close()
+
+    response = listing_client.get("/customers/1/wishlist")
+    assert response.status_code == 200
+    assert sorted(response.json, key=lambda entry: entry["ItemID"]) == [
+        {"ItemID": index + 1, "Name": f"Item {index}", "PricePerItem": 10.0 + index} for index in range(3)
+    ]
+
+def test_delete_customer_with_references(tmp_path):
+    """
+    Test Case: Delete customers under the production SQLite profile, which enforces foreign keys.
+
+    Validates:
+    ----------
+    - A customer referenced by a wishlist entry is kept and the request answers 409.
+    - Unreferenced customers are deleted, unknown customers answer 404.
+    """
+    config = type("ProductionProfileConfig", (get_config(),), {"SQLITE_PROFILE": "production"})
+    profile_engine = get_engine(f"sqlite:///{tmp_path / 'customers.db'}", config)
+    Base.metadata.create_all(profile_engine)
+    Session.remove()
+    Session.configure(bind=profile_engine)
+    try:
+        session = Session()
+        session.add_all([
+            Customer(FullName=f"Customer {index}", Username=f"customer{index}", PasswordHash="hashedpassword",
+                     Age=30, Address="Beirut, Lebanon", Gender="Male", MaritalStatus="Single")
+            for index in range(2)
+        ])
+        session.add(InventoryItem(Name="Laptop", Category="Electronics", PricePerItem=1000.0,
+                                  Description="High-end laptop", StockCount=5))
+        session.flush()
+        session.add(Wishlist(customerID=1, itemID=1))
+        session.commit()
+        Session.remove()
+
+        delete_app = Flask(__name__)
+        delete_app.register_blueprint(customers_bp, url_prefix="/customers")
+        with delete_app.test_client() as client:
+            response = client.delete("/customers/1")
+            assert response.status_code == 409
+            assert "error" in response.json
+            assert client.delete("/customers/2").status_code == 200
+            assert client.delete("/customers/2").status_code == 404
+
+        assert [customer.Username for customer in Session().query(Customer)] == ["customer0"]
+    finally:
+        Session.remove()
+        Session.configure(bind=engine)
+        profile_engine.dispose()
@@ -0,0 +1,315 @@
+"""
+Test Suite for the Shared Database Layer
+========================================
+
+This module contains test cases for the engine registry and per-request session
+handling shared by all services.
+
+Test Cases:
+-----------
+- `test_engine_registry_is_shared`: Each database URL maps to exactly one engine.
+- `test_pool_metrics`: Pool statistics are reported for the shared engine.
+- `test_session_removed_after_request`: The scoped session is discarded on teardown.
+- `test_sqlite_production_profile`: The production pragma profile is applied to new connections.
+- `test_run_transaction_retries_lock_conflicts`: Lock conflicts are retried, other errors are not.
+- `test_ensure_indexes_migrates_existing_database`: Declared indexes are added to existing tables.
+- `test_route_queries_use_indexes`: No route query plans a full table scan.
+- `test_query_budget_enforced_in_testing`: Routes exceeding their query budget fail in testing mode.
+- `test_request_metrics`: Requests report SQL statistics in Server-Timing and per-endpoint percentiles.
+- `test_generate_dataset`: Generated aggregates match their rebuilds and a failed generation leaves no rows.
+"""
+
+import sqlite3
+import pytest
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
+from app.app import app
+from app.config import get_config
+from app.database import engine as database_engine
+from app.database.connection import get_engine, get_session_factory, pool_metrics, run_transaction, Session
+from app.database.indexes import ensure_indexes, explain_query_plans
+from app.database.instrumentation import (
+    Histogram, QueryBudgetExceeded, QueryCounter, RequestMetrics, install_request_metrics, query_budget,
+)
+import create_database
+from app.database.models import Base, engine
+from app.database.copurchase import rebuild_copurchase_index
+from app.database.review_stats import rebuild_review_stats
+
+def test_engine_registry_is_shared():
+    """
+    Test Case: Engines and session factories are shared per database URL.
+
+    Validates:
+    ----------
+    - The models, package and registry all expose the same engine.
+    - Repeated lookups return the same engine and session factory.
+    """
+    assert get_engine() is engine
+    assert database_engine is engine
+    assert get_session_factory() is get_session_factory()
+    assert get_engine("sqlite://") is get_engine("sqlite://")
+    assert get_engine("sqlite://") is not engine
+
+def test_pool_metrics():
+    """
+    Test Case: Pool metrics are exported for the shared engine.
+
+    Validates:
+    ----------
+    - Checkouts are counted.
+    - The gateway exposes the metrics as JSON.
+    """
+    before = pool_metrics()["checkouts"]
+    with engine.connect():
+        metrics = pool_metrics()
+        assert metrics["checkedout"] >= 1
+    assert pool_metrics()["checkouts"] == before + 1
+
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        response = client.get("/internal/pool")
+        assert response.status_code == 200
+        assert response.json["pool"] == type(engine.pool).__name__
+
+def test_session_removed_after_request():
+    """
+    Test Case: The scoped session is removed when a request finishes.
+
+    Validates:
+    ----------
+    - A session left open by a handler is not reused by the next request.
+    """
+    Base.metadata.create_all(bind=engine)
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        session = Session()
+        client.get("/customers/")
+        assert Session() is not session
+
+def test_sqlite_production_profile(tmp_path):
+    """
+    Test Case: The production SQLite profile is applied on every new connection.
+
+    Validates:
+    ----------
+    - WAL journaling, NORMAL synchronous mode, busy timeout and foreign keys are enabled.
+    """
+    config = type("ProductionProfileConfig", (get_config(),), {"SQLITE_PROFILE": "production"})
+    profile_engine = get_engine(f"sqlite:///{tmp_path / 'profile.db'}", config)
+    with profile_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    profile_engine.dispose()
+
+def test_run_transaction_retries_lock_conflicts():
+    """
+    Test Case: Transactions are retried only when they conflict with another writer.
+
+    Validates:
+    ----------
+    - A "database is locked" error is retried until the work succeeds.
+    - Other errors are raised immediately.
+    """
+    calls = []
+
+    def locked_once(session):
+        calls.append(session)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+        return "done"
+
+    assert run_transaction(locked_once, backoff_ms=0) == "done"
+    assert len(calls) == 2
+
+    def broken(session):
+        calls.append(session)
+        raise OperationalError("UPDATE", {}, Exception("no such table: missing"))
+
+    with pytest.raises(OperationalError):
+        run_transaction(broken, backoff_ms=0)
+    assert len(calls) == 3
+
+def test_ensure_indexes_migrates_existing_database(tmp_path):
+    """
+    Test Case: Indexes declared on the models are created on an existing database.
+
+    Validates:
+    ----------
+    - Indexes dropped from an existing database are recreated.
+    - A second run creates nothing.
+    """
+    migrated_engine = get_engine(f"sqlite:///{tmp_path / 'indexes.db'}")
+    Base.metadata.create_all(migrated_engine)
+    with migrated_engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_sales_customer_item"))
+        connection.execute(text("DROP INDEX ix_inventory_items_name"))
+
+    assert sorted(ensure_indexes(migrated_engine)) == ["ix_inventory_items_name", "ix_sales_customer_item"]
+    assert ensure_indexes(migrated_engine) == []
+    assert "ix_sales_customer_item" in {index["name"] for index in inspect(migrated_engine).get_indexes("sales")}
+
+def test_route_queries_use_indexes(tmp_path):
+    """
+    Test Case: The queries issued by the routes are served by indexes.
+
+    Validates:
+    ----------
+    - Every route query has a plan.
+    - No plan scans a table without an index.
+    """
+    plan_engine = get_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    Base.metadata.create_all(plan_engine)
+
+    report = explain_query_plans(plan_engine)
+    assert report
+    assert [entry["route"] for entry in report if entry["full_scan"]] == []
+
+def test_query_budget_enforced_in_testing():
+    """
+    Test Case: Statements are counted per view and budgets are enforced in testing mode.
+
+    Validates:
+    ----------
+    - A view within its budget succeeds and records its statement count.
+    - A view over its budget raises QueryBudgetExceeded in testing mode only.
+    """
+    from flask import Flask, g
+    budget_app = Flask(__name__)
+
+    @budget_app.route("/items/<int:count>")
+    @query_budget(2)
+    def run_statements(count):
+        with engine.connect() as connection:
+            for _ in range(count):
+                connection.execute(text("SELECT 1"))
+        return {"count": g.get("query_count")}
+
+    with QueryCounter() as counter:
+        assert budget_app.test_client().get("/items/3").status_code == 200
+    assert counter.count == 3
+    assert counter.statements is None
+    budget_app.config["TESTING"] = True
+    client = budget_app.test_client()
+    assert client.get("/items/2").status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="executed 3 statements, budget is 2:\nSELECT 1"):
+        client.get("/items/3")
+
+def test_request_metrics():
+    """
+    Test Case: Per-request SQL statistics are reported and summarised per endpoint.
+
+    Validates:
+    ----------
+    - The Server-Timing header reports statement count, rows fetched and database time.
+    - Endpoint summaries hold request counts, rows and histogram percentiles.
+    - Streamed responses are recorded with the SQL run while the body is sent.
+    - The gateway exposes the process-wide summaries at /internal/metrics.
+    """
+    from flask import Flask, Response, stream_with_context
+    metrics_app = Flask(__name__)
+    metrics = RequestMetrics()
+    install_request_metrics(metrics_app, metrics)
+
+    @metrics_app.route("/rows/<int:count>")
+    def fetch_rows(count):
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :count) SELECT i FROM n"
+            ), {"count": count}).all()
+        return {"rows": len(rows)}
+
+    @metrics_app.route("/stream/<int:count>")
+    def stream_rows(count):
+        def generate():
+            with engine.connect() as connection:
+                for _ in range(count):
+                    yield f"{connection.execute(text('SELECT 1')).scalar()}\n"
+        return Response(stream_with_context(generate()))
+
+    client = metrics_app.test_client()
+    response = client.get("/rows/3")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and 'desc="1 queries, 3 rows"' in timing
+    assert "db-slowest;dur=" in timing and "app;dur=" in timing
+    for count in range(1, 20):
+        client.get(f"/rows/{count}")
+
+    stats = metrics.snapshot()["fetch_rows"]
+    assert stats["requests"] == 20 and stats["errors"] == 0
+    assert stats["rows"] == 3 + sum(range(1, 20))
+    assert stats["statements"]["p50"] == stats["statements"]["p99"] == 1
+    assert 0 < stats["db_time_ms"]["p50"] <= stats["db_time_ms"]["p99"] <= stats["duration_ms"]["max"] * 1.25
+    assert "WITH RECURSIVE" in stats["slowest_statement"]["sql"]
+
+    response = client.get("/stream/4")
+    assert response.get_data(as_text=True) == "1\n" * 4
+    response.close()
+    assert "Server-Timing" not in response.headers
+    stats = metrics.snapshot()["stream_rows"]
+    assert stats["requests"] == 1 and stats["rows"] == 4
+    assert stats["statements"]["max"] == 4
+
+    histogram = Histogram([1, 2, 5, 10])
+    for value in [0.5] * 90 + [4] * 9 + [50]:
+        histogram.observe(value)
+    assert (histogram.percentile(0.5), histogram.percentile(0.95), histogram.percentile(1.0)) == (1, 5, 50)
+
+    gateway = app.test_client()
+    assert gateway.get("/internal/pool").status_code == 200
+    response = gateway.get("/internal/metrics")
+    assert response.status_code == 200
+    assert "database_pool_metrics" in response.get_json()
+
+def test_generate_dataset(tmp_path, monkeypatch):
+    """
+    Test Case: Synthetic datasets are generated in a single transaction.
+
+    Validates:
+    ----------
+    - The review aggregates and co-purchase index counted during generation equal their SQL rebuilds.
+    - The co-purchase index stays empty unless requested.
+    - A failure after the rows are inserted rolls back the rows and the dropped indexes.
+    """
+    def snapshot(connection):
+        return [
+            connection.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2")).all()
+            for table in ("review_stats", "item_copurchases")
+        ]
+
+    path = tmp_path / "generated.db"
+    counts = create_database.generate_dataset(str(path), 300, 50, 900, 400, wishlists=30, carts=20, copurchases=True)
+    assert counts["sales"] == 900 and counts["item_copurchases"] > 0
+    generated_engine = get_engine(f"sqlite:///{path}")
+    with generated_engine.connect() as connection:
+        generated = snapshot(connection)
+    session = get_session_factory(f"sqlite:///{path}")()
+    try:
+        rebuild_review_stats(session)
+        rebuild_copurchase_index(session)
+        session.commit()
+        assert snapshot(session.connection()) == generated
+    finally:
+        session.close()
+        generated_engine.dispose()
+
+    path = tmp_path / "without_copurchases.db"
+    counts = create_database.generate_dataset(str(path), 300, 50, 900, 400)
+    assert counts["item_copurchases"] == 0 and counts["review_stats"] > 0
+
+    path = tmp_path / "failed.db"
+    monkeypatch.setattr(create_database, "INVENTORY_FTS_DDL", ["", "CREATE TRIGGER broken"])
+    with pytest.raises(sqlite3.OperationalError):
+        create_database.generate_dataset(str(path), 300, 50, 900, 400, copurchases=True)
+    failed_engine = get_engine(f"sqlite:///{path}")
+    try:
+        with failed_engine.connect() as connection:
+            for table in ("customers", "sales", "reviews", "review_stats", "item_copurchases"):
+                assert connection.execute(text(f"SELECT count(*) FROM {table}")).scalar() == 0
+        assert {index.name for index in Base.metadata.tables["sales"].indexes} <= {
+            index["name"] for index in inspect(failed_engine).get_indexes("sales")
+        }
+    finally:
+        failed_engine.dispose()
@@ -14,6 +14,7 @@ Dependencies:
 Fixtures:
     - session_cleanup: Ensures the database is cleaned and recreated before each test.
     - client: Provides a test client for making API calls.
+    - bulk_client: Provides a test client for the inventory blueprint alone and a token.
 
 Constants:
     - TEST_ITEMS: Sample inventory items for testing.
@@ -24,10 +25,18 @@ Functions:
     - test_get_good(client): Tests retrieving a specific good from the inventory.
     - test_update_good(client): Tests updating the details of a good.
     - test_deduct_good(client): Tests deducting stock from a good in the inventory.
+    - test_bulk_import_ndjson(bulk_client): Tests a bulk NDJSON import with rejected rows.
+    - test_bulk_import_csv_upsert(bulk_client): Tests a chunked CSV import updating existing goods.
+    - test_stock_batch(bulk_client): Tests guarded, idempotent batch stock adjustments.
 """
 
+import json
 import pytest
+from flask import Flask
 from app.app import app
+from app.config import get_config
+from app.services.inventory.inventory import inventory_bp
+from app.utils.authentication import generate_token
 from app.database.models import Base, engine, Session, InventoryItem
 
 @pytest.fixture(autouse=True)
@@ -136,3 +145,118 @@ def test_deduct_good(client):
     response = client.get("/inventory/1")
     print("StockCount after deduction:", response.json["StockCount"])  # Debug StockCount
     assert response.json["StockCount"] == 8
+
+@pytest.fixture
+def bulk_client():
+    """
+    Fixture to provide a test client for the inventory blueprint without the gateway's
+    rate limits, together with authentication headers.
+    """
+    bulk_app = Flask(__name__)
+    bulk_app.register_blueprint(inventory_bp, url_prefix="/inventory")
+    bulk_app.config["TESTING"] = True
+    with bulk_app.test_client() as client:
+        yield client, {"Authorization": generate_token(1)}
+
+def test_bulk_import_ndjson(bulk_client):
+    """
+    Test Case: Import goods from an NDJSON upload.
+
+    Verifies that valid rows are written, and that invalid, malformed and non-UTF-8
+    lines are skipped and reported with their line numbers.
+    """
+    client, headers = bulk_client
+    lines = [json.dumps(item) for item in TEST_ITEMS]
+    lines.insert(1, json.dumps({**TEST_ITEMS[0], "StockCount": -1, "PricePerItem": "free"}))
+    lines.append("{not json")
+    lines.append('{"Name": "Caf\xe9"}')
+    response = client.post("/inventory/bulk", data="\n".join(lines).encode("latin-1") + b"\n",
+                           content_type="application/x-ndjson", headers=headers)
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["written"] == 2
+    assert report["rejected"] == 3
+    assert report["errors"] == [
+        {"line": 2, "errors": {"PricePerItem": "Invalid price", "StockCount": "Invalid stock count"}},
+        {"line": 4, "errors": {"body": "Invalid JSON"}},
+        {"line": 5, "errors": {"body": "Invalid UTF-8"}},
+    ]
+
+    session = Session()
+    assert [item.Name for item in session.query(InventoryItem).order_by(InventoryItem.ItemID)] == [
+        TEST_ITEMS[0]["Name"], TEST_ITEMS[1]["Name"],
+    ]
+    session.close()
+
+def test_bulk_import_csv_upsert(bulk_client, monkeypatch):
+    """
+    Test Case: Import goods from a CSV upload in several chunks.
+
+    Verifies that rows with an ItemID update the existing good, that the other rows
+    are inserted, that every chunk is committed, and that a non-UTF-8 row is reported.
+    """
+    client, headers = bulk_client
+    monkeypatch.setattr(get_config(), "INVENTORY_BULK_CHUNK_SIZE", 2)
+    session = Session()
+    session.add(InventoryItem(**TEST_ITEMS[0]))
+    session.commit()
+    session.close()
+
+    rows = ["ItemID,Name,Category,PricePerItem,Description,StockCount",
+            '1,"MacBook Pro 16""",Electronics,1999.5,Discounted,3']
+    rows += [f",Item {index},Misc,{index}.5,Bulk item,{index}" for index in range(4)]
+    rows.append(",Caf\xe9,Food,2.5,Latin-1 encoded,1")
+    response = client.post("/inventory/bulk", data="\n".join(rows).encode("latin-1"), content_type="text/csv",
+                           headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "written": 5, "chunks": 3, "rejected": 1, "errors": [{"line": 7, "errors": {"body": "Invalid UTF-8"}}],
+    }
+
+    session = Session()
+    assert session.query(InventoryItem).count() == 5
+    updated = session.get(InventoryItem, 1)
+    assert (updated.PricePerItem, updated.Description, updated.StockCount) == (1999.5, "Discounted", 3)
+    session.close()
+
+def test_stock_batch(bulk_client):
+    """
+    Test Case: Apply a batch of stock deltas.
+
+    Verifies that deltas are applied where stock allows, that items which would go
+    negative or do not exist are rejected, that repeated deltas for an item are summed,
+    and that sending the same batch again does not re-apply it.
+    """
+    client, headers = bulk_client
+    session = Session()
+    session.add_all([InventoryItem(**item) for item in TEST_ITEMS])
+    session.commit()
+    session.close()
+
+    batch = {"batch_id": "wms-0001", "adjustments": [
+        {"item_id": 1, "delta": -4},
+        {"item_id": 1, "delta": 1},
+        {"item_id": 2, "delta": -6},
+        {"item_id": 99, "delta": 3},
+    ]}
+    response = client.post("/inventory/stock/batch", json=batch, headers=headers)
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report["Replayed"] is False
+    assert report["Applied"] == [{"ItemID": 1, "StockCount": 7}]
+    assert report["Rejected"] == [
+        {"ItemID": 2, "Delta": -6, "Error": "Insufficient stock"},
+        {"ItemID": 99, "Delta": 3, "Error": "Item not found"},
+    ]
+
+    replay = client.post("/inventory/stock/batch", json=batch, headers=headers).get_json()
+    assert replay == {**report, "Replayed": True}
+    session = Session()
+    assert session.get(InventoryItem, 1).StockCount == 7
+    assert session.get(InventoryItem, 2).StockCount == 5
+    session.close()
+
+    invalid = client.post("/inventory/stock/batch", headers=headers,
+                          json={"batch_id": "wms-0002", "adjustments": [{"item_id": 1}]})
+    assert invalid.status_code == 400
+    assert invalid.get_json()["errors"] == [{"index": 0, "errors": {"delta": "Missing field: delta"}}]
@@ -0,0 +1,137 @@
+"""
+Test Suite for Recommendations Service
+=====================================
+
+This module contains test cases for the co-purchase based recommendations API and
+the item co-purchase index that backs it.
+
+Tested APIs:
+------------
+- GET /recommendations/recommend/<int:customer_id>
+- POST /sales/sale (incremental co-purchase index maintenance)
+
+Setup:
+------
+- The database is recreated before each test and populated with three customers,
+  four inventory items and a small purchase history.
+"""
+
+import pytest
+from flask import Flask
+from app.services.recommendations.recommendations import recommendations_bp
+from app.services.sales.sales import sales_bp
+from app.database.models import Base, Customer, InventoryItem, Sale, ItemCoPurchase
+from app.database.copurchase import rebuild_copurchase_index
+from app.utils.authentication import generate_token
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Database connection setup
+DATABASE_URL = "sqlite:///ecommerce.db"
+engine = create_engine(DATABASE_URL)
+Session = sessionmaker(bind=engine)
+
+# (CustomerID, ItemID) purchase history seeded before each test
+PURCHASES = [(1, 1), (1, 2), (2, 1), (2, 2), (2, 3), (3, 1), (3, 3), (3, 4)]
+
+@pytest.fixture
+def client():
+    """
+    Fixture to provide a Flask test client with a seeded purchase history and
+    a freshly built co-purchase index.
+
+    Yields:
+    -------
+    Flask test client for making HTTP requests.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(recommendations_bp, url_prefix="/recommendations")
+    app.register_blueprint(sales_bp, url_prefix="/sales")
+    app.config["TESTING"] = True
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = Session()
+    for index in range(1, 4):
+        session.add(Customer(
+            FullName=f"Customer {index}",
+            Username=f"customer{index}",
+            PasswordHash="hashedpassword",
+            Age=30,
+            Address="Beirut",
+            Gender="Other",
+            MaritalStatus="Single",
+            WalletBalance=1000.0
+        ))
+    for index in range(1, 5):
+        session.add(InventoryItem(
+            Name=f"Item {index}",
+            Category="Electronics",
+            PricePerItem=10.0 * index,
+            Description="Test item",
+            StockCount=100
+        ))
+    session.flush()
+    for customer_id, item_id in PURCHASES:
+        session.add(Sale(CustomerID=customer_id, ItemID=item_id, Quantity=1, TotalPrice=10.0))
+    session.flush()
+    rebuild_copurchase_index(session)
+    session.commit()
+    session.close()
+
+    with app.test_client() as client:
+        yield client
+
+def copurchase_count(item_id, related_item_id):
+    """Return the indexed co-purchase count for a pair of items (0 when absent)."""
+    session = Session()
+    edge = session.get(ItemCoPurchase, (item_id, related_item_id))
+    session.close()
+    return edge.Count if edge else 0
+
+def test_rebuild_copurchase_index(client):
+    """
+    Test the bulk index rebuild.
+
+    Verifies:
+    - Pair counts equal the number of distinct customers who bought both items.
+    - The index is symmetric.
+    """
+    assert copurchase_count(1, 2) == 2
+    assert copurchase_count(2, 1) == 2
+    assert copurchase_count(1, 3) == 2
+    assert copurchase_count(3, 4) == 1
+    assert copurchase_count(2, 4) == 0
+
+def test_recommend_products(client):
+    """
+    Test the recommendations API.
+
+    Verifies:
+    - Items already bought by the customer are excluded.
+    - Items are ranked by co-purchase score.
+    """
+    response = client.get("/recommendations/recommend/1")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [item["ItemID"] for item in data] == [3, 4]
+    assert data[0]["Name"] == "Item 3"
+
+def test_sale_updates_copurchase_index(client):
+    """
+    Test that a committed sale updates the index incrementally.
+
+    Verifies:
+    - A first purchase of an item adds one co-purchase for every item bought before.
+    - Repeat purchases of the same item do not inflate the counts.
+    """
+    headers = {"Authorization": generate_token(1)}
+    sale = {"CustomerUsername": "customer1", "ItemName": "Item 4", "Quantity": 1}
+    response = client.post("/sales/sale", json=sale, headers=headers)
+    assert response.status_code == 201
+    assert copurchase_count(4, 1) == 2
+    assert copurchase_count(2, 4) == 1
+
+    response = client.post("/sales/sale", json=sale, headers=headers)
+    assert response.status_code == 201
+    assert copurchase_count(4, 1) == 2
@@ -26,11 +26,20 @@ Test Cases
 5. `test_get_customer_reviews(client)`: Tests retrieving all reviews submitted by a specific customer.
 6. `test_moderate_review(client)`: Tests the moderation functionality for reviews.
 7. `test_get_review_details(client)`: Tests retrieving detailed information about a specific review.
+8. `test_review_summary()`: Tests the incrementally maintained rating summary of a product.
+9. `test_review_listing_pages()`: Tests paginated, filtered and projected review listings.
+10. `test_review_details_single_query()`: Tests review details are read within the route's query budget.
+11. `test_review_summary_legacy_rating()`: Tests review writes on legacy reviews rated outside 1 to 5.
 """
 
 import pytest
+from flask import Flask
 from app import create_app
-from app.database.models import Base, Session, Customer, InventoryItem, Review
+from app.database.models import Base, Session, Customer, InventoryItem, Review, ReviewStats
+from app.database.review_stats import rebuild_review_stats, get_review_summary
+from app.services.reviews.reviews import reviews_bp
+from app.utils.authentication import generate_token
+from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 
 # Test Data
@@ -83,6 +92,7 @@ def setup_and_cleanup():
     session.query(Customer).delete()
     session.query(InventoryItem).delete()
     session.query(Review).delete()
+    session.query(ReviewStats).delete()
     customer = Customer(**TEST_CUSTOMER)
     item = InventoryItem(**TEST_ITEM)
     session.add(customer)
@@ -211,3 +221,137 @@ def test_get_review_details(client):
     assert data["CustomerName"] == TEST_CUSTOMER["FullName"]
     assert data["ProductName"] == TEST_ITEM["Name"]
     assert data["Rating"] == TEST_REVIEW["Rating"]
+
+def test_review_summary():
+    """
+    Test case to validate the rating summary maintained by every review write.
+
+    - Submits, updates, moderates and deletes reviews.
+    - Asserts that the summary follows each change.
+    - Asserts that a rebuild from the reviews table gives the same aggregates.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(reviews_bp, url_prefix="/reviews")
+    headers = {"Authorization": generate_token(1)}
+    with app.test_client() as client:
+        for rating in (5, 3, 3):
+            client.post("/reviews/submit", json={**TEST_REVIEW, "Rating": rating}, headers=headers)
+        review_ids = [review.ReviewID for review in Session().query(Review).order_by(Review.ReviewID)]
+        client.put(f"/reviews/update/{review_ids[0]}", json=UPDATED_REVIEW, headers=headers)
+        client.patch(f"/reviews/moderate/{review_ids[1]}", json={"IsFlagged": True}, headers=headers)
+        client.delete(f"/reviews/delete/{review_ids[2]}", headers=headers)
+
+        response = client.get("/reviews/product/1/summary", headers=headers)
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "ItemID": 1,
+            "ReviewCount": 2,
+            "AverageRating": 3.5,
+            "Histogram": {"1": 0, "2": 0, "3": 1, "4": 1, "5": 0},
+            "FlaggedCount": 1,
+        }
+        assert client.get("/reviews/product/2/summary", headers=headers).get_json()["AverageRating"] is None
+
+    session = Session()
+    incremental = get_review_summary(session, 1)
+    rebuild_review_stats(session)
+    assert get_review_summary(session, 1) == incremental
+    session.rollback()
+    session.close()
+
+def test_review_listing_pages():
+    """
+    Test case to validate the paginated review listings.
+
+    - Pages through a product's reviews newest first with the next-page cursor.
+    - Asserts that rating, flagged and since filters and field projection apply.
+    """
+    session = Session()
+    start = datetime(2024, 1, 1)
+    session.add_all([
+        Review(CustomerID=1, ItemID=1, Rating=index % 5 + 1, Comment=f"Review {index}",
+               IsFlagged=index == 3, CreatedAt=start + timedelta(days=index))
+        for index in range(5)
+    ])
+    session.commit()
+    session.close()
+
+    app = Flask(__name__)
+    app.register_blueprint(reviews_bp, url_prefix="/reviews")
+    headers = {"Authorization": generate_token(1)}
+    with app.test_client() as client:
+        response = client.get("/reviews/product/1?limit=2&fields=Comment", headers=headers)
+        assert response.get_json() == [{"Comment": "Review 4"}, {"Comment": "Review 3"}]
+        comments = []
+        cursor = ""
+        while cursor is not None:
+            response = client.get(f"/reviews/product/1?limit=2&after={cursor}", headers=headers)
+            comments += [review["Comment"] for review in response.get_json()]
+            cursor = response.headers.get("X-Next-Cursor")
+        assert comments == [f"Review {index}" for index in (4, 3, 2, 1, 0)]
+
+        response = client.get("/reviews/customer/1?flagged=false&since=2024-01-03&fields=ItemID,Rating", headers=headers)
+        assert response.get_json() == [{"ItemID": 1, "Rating": 5}, {"ItemID": 1, "Rating": 3}]
+        response = client.get("/reviews/product/1?rating=4", headers=headers)
+        assert [review["IsFlagged"] for review in response.get_json()] == [True]
+        assert client.get("/reviews/product/1?since=yesterday", headers=headers).status_code == 400
+        assert client.get("/reviews/product/1?fields=Secret", headers=headers).status_code == 400
+
+def test_review_details_single_query():
+    """
+    Test case to validate that review details are read with a single joined select.
+
+    - Requests the details of a review in testing mode, where query budgets are enforced.
+    - Asserts that the customer and product names are returned.
+    """
+    session = Session()
+    session.add(Review(**TEST_REVIEW))
+    session.commit()
+    review_id = session.query(Review.ReviewID).scalar()
+    session.close()
+
+    app = Flask(__name__)
+    app.register_blueprint(reviews_bp, url_prefix="/reviews")
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        response = client.get(f"/reviews/details/{review_id}", headers={"Authorization": generate_token(1)})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data["CustomerName"], data["ProductName"], data["Rating"]) == ("Jane Doe", "Laptop", 5)
+        assert client.get("/reviews/details/999", headers={"Authorization": generate_token(1)}).status_code == 404
+
+def test_review_summary_legacy_rating():
+    """
+    Test case to validate review writes on a legacy review rated outside 1 to 5.
+
+    - Inserts a review with rating 7, as databases predating rating validation may hold.
+    - Updates and deletes it through the API.
+    - Asserts that the writes succeed and the summary matches a rebuild after each one.
+    """
+    session = Session()
+    session.add(Review(**{**TEST_REVIEW, "Rating": 7}))
+    session.add(Review(**TEST_REVIEW))
+    session.commit()
+    review_id = session.query(Review.ReviewID).filter(Review.Rating == 7).scalar()
+    rebuild_review_stats(session)
+    session.commit()
+    session.close()
+
+    app = Flask(__name__)
+    app.register_blueprint(reviews_bp, url_prefix="/reviews")
+    headers = {"Authorization": generate_token(1)}
+    with app.test_client() as client:
+        summary = client.get("/reviews/product/1/summary", headers=headers).get_json()
+        assert (summary["ReviewCount"], summary["Histogram"]["5"]) == (2, 1)
+        assert sum(summary["Histogram"].values()) == 1
+
+        assert client.put(f"/reviews/update/{review_id}", json={"Comment": "Legacy"}, headers=headers).status_code == 200
+        assert client.patch(f"/reviews/moderate/{review_id}", json={"IsFlagged": True}, headers=headers).status_code == 200
+        assert client.delete(f"/reviews/delete/{review_id}", headers=headers).status_code == 200
+        assert client.get("/reviews/product/1/summary", headers=headers).get_json() == {
+            "ItemID": 1,
+            "ReviewCount": 1,
+            "AverageRating": 5.0,
+            "Histogram": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1},
+            "FlaggedCount": 0,
+        }
@@ -8,8 +8,9 @@ sales transactions while ensuring business rules such as wallet balance and stoc
 
 Tested APIs:
 ------------
-- GET /sales/goods
+- GET /sales/goods (filtered and paginated)
 - GET /sales/goods/<int:item_id>
+- GET /sales/search
 - POST /sales/sale
 
 Dependencies:
@@ -26,9 +27,16 @@ Setup:
 """
 
 import pytest
+import threading
 from flask import Flask
 from app.services.sales.sales import sales_bp
 from app.database.models import Base, Customer, InventoryItem, Sale
+from app.database import search
+from app.database.search import ensure_search_index, search_items
+from app.utils.authentication import generate_token
+from app.config import get_config
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -173,3 +181,231 @@ def test_insufficient_stock(client):
     assert response.status_code == 400
     data = response.get_json()
     assert data["error"] == "Insufficient stock"
+
+def test_invalid_quantity(client):
+    """
+    Test the sale API for a non-positive quantity.
+
+    Verifies:
+    - Status code is 400.
+    - Stock is not credited back by a negative quantity.
+    """
+    response = client.post("/sales/sale", json={
+        "CustomerUsername": "johndoe",
+        "ItemName": "Laptop",
+        "Quantity": -5
+    }, headers={"Authorization": generate_token(1)})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid quantity"
+
+def test_concurrent_sales_do_not_oversell(client):
+    """
+    Test the sale API under concurrent checkouts of the last units in stock.
+
+    Verifies:
+    - Exactly as many sales succeed as there are units in stock.
+    - Stock, wallet and sales rows stay consistent.
+    """
+    session = Session()
+    session.query(InventoryItem).filter_by(Name="Laptop").update({"StockCount": 3, "PricePerItem": 10.0})
+    session.commit()
+    session.close()
+
+    headers = {"Authorization": generate_token(1)}
+    statuses = []
+    barrier = threading.Barrier(8)
+
+    def buy():
+        with client.application.test_client() as thread_client:
+            barrier.wait()
+            response = thread_client.post("/sales/sale", json={
+                "CustomerUsername": "johndoe",
+                "ItemName": "Laptop",
+                "Quantity": 1
+            }, headers=headers)
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=buy) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(201) == 3
+    session = Session()
+    assert session.query(InventoryItem).filter_by(Name="Laptop").first().StockCount == 0
+    assert session.query(Customer).filter_by(Username="johndoe").first().WalletBalance == 470.0
+    assert session.query(Sale).count() == 3
+    session.close()
+
+def test_catalogue_cache(client):
+    """
+    Test that catalogue reads are cached and invalidated by sales.
+
+    Verifies:
+    - A warm catalogue read executes no SQL statement.
+    - A completed sale invalidates the cached stock count.
+    """
+    headers = {"Authorization": generate_token(1)}
+    assert client.get("/sales/goods/1", headers=headers).get_json()["StockCount"] == 10
+
+    statements = []
+    def count_statement(*args):
+        statements.append(args[2])
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        assert client.get("/sales/goods/1", headers=headers).status_code == 200
+        assert client.get("/sales/goods", headers=headers).status_code == 200
+        assert client.get("/sales/goods", headers=headers).status_code == 200
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+    assert len(statements) == 1  # Only the cold goods listing reads the database
+
+    client.post("/sales/sale", json={
+        "CustomerUsername": "johndoe",
+        "ItemName": "Laptop",
+        "Quantity": 1
+    }, headers=headers)
+    assert client.get("/sales/goods/1", headers=headers).get_json()["StockCount"] == 9
+
+def test_export_sales(client):
+    """
+    Test the streaming sales export.
+
+    Verifies:
+    - The export requires authentication.
+    - Recorded sales are streamed as NDJSON.
+    """
+    headers = {"Authorization": generate_token(1)}
+    client.post("/sales/sale", json={"CustomerUsername": "johndoe", "ItemName": "Laptop", "Quantity": 1},
+                headers=headers)
+    assert client.get("/sales/export").status_code == 401
+
+    response = client.get("/sales/export", headers=headers)
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 1
+    assert '"TotalPrice": 300.0' in lines[0]
+
+def test_filtered_goods(client):
+    """
+    Test the filtered and sorted goods listing.
+
+    Verifies:
+    - Category, price range and stock filters.
+    - Descending price order paginated with the next-page cursor.
+    - Invalid parameters are rejected.
+    """
+    headers = {"Authorization": generate_token(1)}
+    session = Session()
+    session.add_all([
+        InventoryItem(Name="Mouse", Category="Electronics", PricePerItem=20.0, StockCount=5),
+        InventoryItem(Name="Monitor", Category="Electronics", PricePerItem=150.0, StockCount=0),
+        InventoryItem(Name="Cable", Category="Electronics", PricePerItem=20.0, StockCount=3),
+        InventoryItem(Name="Desk", Category="Furniture", PricePerItem=120.0, StockCount=2),
+    ])
+    session.commit()
+    session.close()
+
+    response = client.get("/sales/goods?category=Electronics&sort=-price&limit=2", headers=headers)
+    assert [item["Name"] for item in response.get_json()] == ["Laptop", "Cable"]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/sales/goods?category=Electronics&sort=-price&limit=2&after={cursor}", headers=headers)
+    assert [item["Name"] for item in response.get_json()] == ["Mouse"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/sales/goods?min_price=100&max_price=200&in_stock=false&sort=name", headers=headers)
+    assert [item["Name"] for item in response.get_json()] == ["Desk", "Monitor"]
+    assert response.get_json()[1] == {
+        "ItemID": 3, "Name": "Monitor", "Category": "Electronics", "Price": 150.0, "StockCount": 0,
+    }
+
+    assert client.get("/sales/goods?sort=stock", headers=headers).status_code == 400
+    assert client.get("/sales/goods?min_price=cheap", headers=headers).status_code == 400
+
+def test_search_goods(client, monkeypatch):
+    """
+    Test the full-text goods search.
+
+    Verifies:
+    - The last word matches as a prefix, or exactly once it is a complete word, and name matches rank first.
+    - Category filtering and cursor pagination.
+    - Searches broader than SEARCH_MAX_CANDIDATES, or with a word matching more than
+      MAX_RANKED_WORD_MATCHES items, are listed by ItemID, also when the category
+      leaves fewer matches than a page among the counted ones.
+    - The index follows inserts, renames and deletes.
+    """
+    headers = {"Authorization": generate_token(1)}
+    session = Session()
+    session.add_all([
+        InventoryItem(Name="Laptop Sleeve", Category="Accessories", PricePerItem=20.0,
+                      Description="Padded sleeve", StockCount=5),
+        InventoryItem(Name="Backpack", Category="Accessories", PricePerItem=40.0,
+                      Description="Fits a laptop", StockCount=5),
+    ])
+    session.commit()
+
+    assert client.get("/sales/search?q=lap").status_code == 401
+    assert client.get("/sales/search", headers=headers).status_code == 400
+    names = [row["Name"] for row in client.get("/sales/search?q=lap", headers=headers).get_json()]
+    assert names[-1] == "Backpack" and set(names) == {"Laptop", "Laptop Sleeve", "Backpack"}
+
+    response = client.get("/sales/search?q=lap&category=Accessories&limit=1", headers=headers)
+    first = response.get_json()
+    cursor = response.headers["X-Next-Cursor"]
+    second = client.get(f"/sales/search?q=lap&category=Accessories&limit=1&after={cursor}", headers=headers)
+    assert [first[0]["Name"], second.get_json()[0]["Name"]] == ["Laptop Sleeve", "Backpack"]
+    assert "X-Next-Cursor" not in second.headers
+
+    monkeypatch.setattr(get_config(), "SEARCH_MAX_CANDIDATES", 2)
+    response = client.get("/sales/search?q=lap&limit=2", headers=headers)
+    assert [row["ItemID"] for row in response.get_json()] == [1, 2]
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/sales/search?q=lap&limit=2&after={cursor}", headers=headers)
+    assert [row["ItemID"] for row in response.get_json()] == [3]
+    monkeypatch.setattr(get_config(), "SEARCH_MAX_CANDIDATES", 1)
+    response = client.get("/sales/search?q=lap&category=Accessories&limit=2", headers=headers)
+    assert [row["ItemID"] for row in response.get_json()] == [2, 3]
+    assert "X-Next-Cursor" not in response.headers
+    monkeypatch.undo()
+
+    assert [row["Name"] for row in client.get("/sales/search?q=padded+slee", headers=headers).get_json()] == [
+        "Laptop Sleeve"
+    ]
+    assert all(row.Rank < 0 for row in search_items(session, "laptop lap"))
+    monkeypatch.setattr(search, "MAX_RANKED_WORD_MATCHES", 2)
+    assert [(row.ItemID, row.Rank) for row in search_items(session, "laptop lap")] == [(1, 0), (2, 0), (3, 0)]
+    monkeypatch.undo()
+
+    session.query(InventoryItem).filter_by(Name="Backpack").update({"Name": "Rucksack", "Description": "Roomy"})
+    session.query(InventoryItem).filter_by(Name="Laptop Sleeve").delete()
+    session.commit()
+    session.close()
+    assert [row["Name"] for row in client.get("/sales/search?q=lap", headers=headers).get_json()] == ["Laptop"]
+    assert client.get("/sales/search?q=ruck", headers=headers).get_json()[0]["Name"] == "Rucksack"
+    assert client.get("/sales/search?q=zzzq", headers=headers).get_json() == []
+
+    session = Session()
+    session.add(InventoryItem(Name="Lap Desk", Category="Office", PricePerItem=25.0, Description="Folding", StockCount=5))
+    session.commit()
+    session.close()
+    assert [row["Name"] for row in client.get("/sales/search?q=lap", headers=headers).get_json()] == ["Lap Desk"]
+    assert [row["Name"] for row in client.get("/sales/search?q=lapt", headers=headers).get_json()] == ["Laptop"]
+
+def test_search_goods_without_index(client):
+    """
+    Test the goods search on a database without the full-text index.
+
+    Verifies:
+    - The search answers 503 with a JSON error instead of an unhandled error.
+    - ensure_search_index creates and populates the index, after which the search works.
+    """
+    headers = {"Authorization": generate_token(1)}
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE inventory_fts")
+    response = client.get("/sales/search?q=lap", headers=headers)
+    assert response.status_code == 503
+    assert "error" in response.get_json()
+
+    assert ensure_search_index(engine)
+    assert [row["Name"] for row in client.get("/sales/search?q=lap", headers=headers).get_json()] == ["Laptop"]
@@ -10,6 +10,10 @@ Tests:
         - Test token generation.
         - Test token verification.
         - Test extracting user ID from token.
+        - Test that verified tokens are cached until they expire.
+        - Test token revocation.
+        - Test the require_auth route decorator.
+        - Test RS256/EdDSA tokens with signing and verification-only services.
     - Validation Utilities:
         - Test username validation.
         - Test password validation.
@@ -19,10 +23,40 @@ Tests:
         - Test marital status validation.
         - Test positive float validation.
         - Test positive integer validation.
+        - Test that schemas report every error of a payload at once.
+        - Test partial schemas, conversions and batch validation.
+    - Cache Utilities:
+        - Test LRU eviction and expiry of the in-process cache.
+        - Test read-through loading through the shared backend.
+    - Password Utilities:
+        - Test hashing, verification and rehash detection.
+        - Test that the worker pool rejects work beyond its bound.
+    - Metrics Utilities:
+        - Test the Prometheus text exposition of counters, gauges and histograms.
+        - Test that memory-mapped stores of several workers are aggregated.
+        - Test that failing scheduled jobs are recorded as error runs.
 """
 
 import pytest
-from app.utils.authentication import generate_token, verify_token, get_user_id_from_token
+import json
+import time
+import jwt
+from flask import Flask, g
+from app.utils import authentication
+import threading
+from app.utils.cache import TTLCache, ReadThroughCache, LocalSharedBackend
+from app.utils.passwords import PasswordHasher, PasswordHasherBusy
+from app.utils.metrics import MetricsRegistry, MmapValueStore, mark_process_dead, registry, timed_job
+from app.config import get_config
+from app.utils.authentication import (
+    generate_token,
+    verify_token,
+    get_user_id_from_token,
+    revoke_token,
+    require_auth,
+    configure_keys,
+    generate_key_pair,
+)
 from app.utils.validation import (
     validate_username,
     validate_password,
@@ -31,7 +65,11 @@ from app.utils.validation import (
     validate_gender,
     validate_marital_status,
     validate_positive_float,
-    validate_positive_int
+    validate_positive_int,
+    Field,
+    Schema,
+    PASSWORD_PATTERN,
+    GENDERS,
 )
 
 MOCK_USER_ID = 123
@@ -76,6 +114,122 @@ def test_get_user_id_from_token():
     user_id = get_user_id_from_token(MOCK_TOKEN)
     assert user_id == MOCK_USER_ID
 
+def test_verified_token_cache(monkeypatch):
+    """
+    Test that verified tokens are cached by digest until their expiry.
+
+    Ensures:
+        - A token is only decoded once while it is cached.
+        - Invalid tokens are rejected and never cached.
+        - Expired tokens are rejected.
+    """
+    decodes = []
+    original_decode = jwt.decode
+    def counting_decode(*args, **kwargs):
+        decodes.append(1)
+        return original_decode(*args, **kwargs)
+    monkeypatch.setattr(authentication.jwt, "decode", counting_decode)
+
+    token = generate_token(MOCK_USER_ID + 1)
+    for _ in range(5):
+        assert verify_token(token)["user_id"] == MOCK_USER_ID + 1
+    assert len(decodes) == 1
+
+    assert verify_token(token + "x") == {"error": "Invalid token"}
+    assert verify_token(token + "x") == {"error": "Invalid token"}
+    assert len(decodes) == 3
+
+    expired = jwt.encode({"user_id": 1, "exp": int(time.time()) - 1}, authentication.SECRET_KEY, algorithm="HS256")
+    assert verify_token(expired) == {"error": "Token has expired"}
+
+def test_revoke_token():
+    """
+    Test revoking a cached token.
+
+    Ensures:
+        - A revoked token is evicted from the cache and rejected.
+        - Tokens not signed by the service cannot be revoked.
+    """
+    token = generate_token(MOCK_USER_ID + 2)
+    assert verify_token(token)["user_id"] == MOCK_USER_ID + 2
+    assert revoke_token(token) is True
+    assert verify_token(token) == {"error": "Token has been revoked"}
+    assert revoke_token("not-a-token") is False
+
+def test_require_auth():
+    """
+    Test the require_auth route decorator.
+
+    Ensures:
+        - Requests without a token or with an invalid token get a 401.
+        - Authenticated requests reach the view with the token payload in ``g``.
+    """
+    app = Flask(__name__)
+
+    @app.route("/private")
+    @require_auth
+    def private():
+        return {"user_id": g.token_payload["user_id"]}
+
+    with app.test_client() as client:
+        assert client.get("/private").status_code == 401
+        response = client.get("/private", headers={"Authorization": "invalid"})
+        assert response.status_code == 401
+        assert response.get_json() == {"error": "Invalid token"}
+        response = client.get("/private", headers={"Authorization": generate_token(MOCK_USER_ID)})
+        assert response.status_code == 200
+        assert response.get_json() == {"user_id": MOCK_USER_ID}
+
+def test_configure_keys_rejects_unknown_algorithm():
+    """
+    Test that an unsupported token algorithm is rejected.
+
+    Ensures:
+        - configure_keys raises ValueError and keeps HS256 tokens working.
+    """
+    with pytest.raises(ValueError):
+        configure_keys(type("TestConfig", (get_config(),), {"JWT_ALGORITHM": "none"}))
+    assert verify_token(generate_token(MOCK_USER_ID))["user_id"] == MOCK_USER_ID
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_asymmetric_tokens(algorithm, tmp_path):
+    """
+    Test RS256 and EdDSA tokens issued with a key set.
+
+    Parameters:
+        - algorithm: Asymmetric algorithm under test.
+
+    Ensures:
+        - Issued tokens carry the signing key ID and verify.
+        - A verification-only service verifies tokens but cannot issue them.
+        - Tokens signed with a key outside the key set are rejected.
+    """
+    pytest.importorskip("cryptography")
+    private_pem, public_pem = generate_key_pair(algorithm)
+    keyset_path = tmp_path / "keyset.json"
+    keyset_path.write_text(json.dumps({"keys": [{"kid": "k1", "alg": algorithm, "public_key": public_pem}]}))
+    private_path = tmp_path / "k1.pem"
+    private_path.write_text(private_pem)
+    verifier = type("VerifierConfig", (get_config(),), {"JWT_ALGORITHM": algorithm, "JWT_KEYSET_FILE": str(keyset_path)})
+    issuer = type("IssuerConfig", (verifier,), {"JWT_PRIVATE_KEY_FILE": str(private_path), "JWT_SIGNING_KID": "k1"})
+
+    try:
+        configure_keys(issuer)
+        token = generate_token(MOCK_USER_ID)
+        assert jwt.get_unverified_header(token) == {"alg": algorithm, "kid": "k1", "typ": "JWT"}
+        assert verify_token(token)["user_id"] == MOCK_USER_ID
+
+        configure_keys(verifier)
+        assert verify_token(token)["user_id"] == MOCK_USER_ID
+        with pytest.raises(RuntimeError):
+            generate_token(MOCK_USER_ID)
+
+        other_private_pem, _ = generate_key_pair(algorithm)
+        forged = jwt.encode({"user_id": 1}, other_private_pem, algorithm=algorithm, headers={"kid": "k1"})
+        assert verify_token(forged) == {"error": "Invalid token"}
+    finally:
+        configure_keys()
+
 @pytest.mark.parametrize("username,expected", [
     ("valid_user123", True),
     ("invalid user", False),
@@ -228,3 +382,271 @@ def test_validate_positive_int(value, expected):
         - Validation results match the expected outcomes for various integer values.
     """
     assert validate_positive_int(value) == expected
+
+def test_ttl_cache_eviction_and_expiry():
+    """
+    Test the TTLCache eviction and expiry behaviour.
+
+    Ensures:
+        - The least recently used entry is evicted when the cache is full.
+        - Entries are not returned once their time-to-live has passed.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+def test_read_through_cache():
+    """
+    Test the ReadThroughCache loading and invalidation.
+
+    Ensures:
+        - The loader is only called on a miss at both cache levels.
+        - A second process-local cache is filled from the shared backend.
+        - Invalidation removes keys from both levels.
+    """
+    shared = LocalSharedBackend()
+    first = ReadThroughCache(ttl=60, shared=shared)
+    second = ReadThroughCache(ttl=60, shared=shared)
+    loads = []
+    def loader():
+        loads.append(1)
+        return {"Name": "Laptop"}
+
+    assert first.get_or_load("item:1", loader) == {"Name": "Laptop"}
+    assert first.get_or_load("item:1", loader) == {"Name": "Laptop"}
+    assert second.get_or_load("item:1", loader) == {"Name": "Laptop"}
+    assert len(loads) == 1
+
+    first.invalidate("item:1")
+    assert shared.get("item:1") is None
+    assert first.get_or_load("item:1", lambda: None) is None
+
+@pytest.mark.parametrize("algorithm", ["scrypt", "pbkdf2_sha256"])
+def test_password_hasher(algorithm):
+    """
+    Test password hashing and verification.
+
+    Parameters:
+        - algorithm: Key derivation function under test.
+
+    Ensures:
+        - Hashes are salted and verify only the original password.
+        - Legacy plain-text values verify and always need a rehash.
+        - Hashes need a rehash once the cost parameters change.
+    """
+    config = type("TestConfig", (get_config(),), {
+        "PASSWORD_HASH_ALGORITHM": algorithm,
+        "PASSWORD_SCRYPT_N": 2 ** 8,
+        "PASSWORD_PBKDF2_ITERATIONS": 1000,
+    })
+    hasher = PasswordHasher(config)
+    stored = hasher.hash_password(MOCK_PASSWORD)
+    assert stored.startswith(algorithm + "$")
+    assert stored != hasher.hash_password(MOCK_PASSWORD)
+    assert hasher.check_password(MOCK_PASSWORD, stored) == (True, None)
+    assert hasher.check_password("wrong", stored) == (False, None)
+    assert hasher.check_password(MOCK_PASSWORD, None) == (False, None)
+
+    valid, upgraded = hasher.check_password("plaintext", "plaintext")
+    assert valid and hasher.verify_now("plaintext", upgraded)
+
+    stronger = PasswordHasher(type("StrongerConfig", (config,), {
+        "PASSWORD_SCRYPT_N": 2 ** 9,
+        "PASSWORD_PBKDF2_ITERATIONS": 2000,
+    }))
+    assert stronger.needs_rehash(stored)
+    valid, upgraded = stronger.check_password(MOCK_PASSWORD, stored)
+    assert valid and not stronger.needs_rehash(upgraded)
+
+def test_password_hasher_is_bounded():
+    """
+    Test that password work beyond the pool bound is rejected.
+
+    Ensures:
+        - PasswordHasherBusy is raised when every slot stays busy past the queue timeout.
+    """
+    config = type("TestConfig", (get_config(),), {
+        "PASSWORD_SCRYPT_N": 2 ** 8,
+        "PASSWORD_HASH_WORKERS": 1,
+        "PASSWORD_HASH_MAX_PENDING": 1,
+        "PASSWORD_HASH_QUEUE_TIMEOUT": 0.01,
+    })
+    hasher = PasswordHasher(config)
+    release = threading.Event()
+    blocker = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocker.start()
+    time.sleep(0.05)
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash_password(MOCK_PASSWORD)
+    release.set()
+    blocker.join()
+    assert hasher.hash_password(MOCK_PASSWORD).startswith("scrypt$")
+
+SCHEMA = Schema({
+    "Username": Field(str, min_length=3, max_length=30),
+    "Password": Field(str, pattern=PASSWORD_PATTERN, message="Invalid password"),
+    "Age": Field(int, minimum=1),
+    "Gender": Field(str, choices=GENDERS),
+    "Balance": Field(float, greater_than=0, required=False, default=0.0),
+    "Active": Field(bool, required=False),
+})
+
+def test_schema_reports_every_error():
+    """
+    Test single-pass payload validation.
+
+    Ensures:
+        - Missing and invalid fields are all reported together.
+        - Booleans are not accepted as integers.
+        - Non-object payloads are rejected.
+    """
+    data, errors = SCHEMA.validate({"Username": "ab", "Password": "weak", "Age": True, "Balance": -1})
+    assert errors == {
+        "Username": "Invalid Username",
+        "Password": "Invalid password",
+        "Age": "Invalid Age",
+        "Gender": "Missing field: Gender",
+        "Balance": "Invalid Balance",
+    }
+    assert SCHEMA.validate(None) == ({}, {"body": "Request body must be a JSON object"})
+
+def test_schema_conversions_and_partial():
+    """
+    Test validated data, defaults, conversions and partial schemas.
+
+    Ensures:
+        - Integers are accepted for floats, 0/1 for booleans and defaults are filled in.
+        - Undeclared keys are dropped.
+        - Partial schemas only validate the fields present.
+    """
+    payload = {"Username": "valid_user", "Password": MOCK_PASSWORD, "Age": 30, "Gender": "Other",
+               "Active": 1, "IsAdmin": True}
+    assert SCHEMA.validate(payload) == ({
+        "Username": "valid_user", "Password": MOCK_PASSWORD, "Age": 30, "Gender": "Other",
+        "Balance": 0.0, "Active": True,
+    }, {})
+    partial = Schema(SCHEMA.fields, partial=True)
+    assert partial.validate({"Balance": 5}) == ({"Balance": 5}, {})
+    assert partial.validate({"Age": 0})[1] == {"Age": "Invalid Age"}
+
+def test_schema_validate_many():
+    """
+    Test batch validation.
+
+    Ensures:
+        - Valid records are returned with their index and invalid ones with their errors.
+    """
+    partial = Schema({"Age": Field(int, minimum=1)})
+    valid, invalid = partial.validate_many([{"Age": index} for index in range(3)] + ["not an object"])
+    assert valid == [(1, {"Age": 1}), (2, {"Age": 2})]
+    assert invalid == [
+        {"index": 0, "errors": {"Age": "Invalid Age"}},
+        {"index": 3, "errors": {"body": "Request body must be a JSON object"}},
+    ]
+
+def test_metrics_exposition():
+    """
+    Test the Prometheus text exposition of an in-memory registry.
+
+    Ensures:
+        - Counters and gauges are rendered with HELP/TYPE lines and escaped labels.
+        - Histogram buckets are cumulative and end with +Inf, followed by sum and count.
+        - Label values must match the declared label names.
+    """
+    registry = MetricsRegistry()
+    requests_total = registry.counter("requests_total", "Requests served.", ("endpoint", "status"))
+    in_flight = registry.gauge("in_flight", "Requests in flight.")
+    latency = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    requests_total.labels('say "hi"', 200).inc()
+    requests_total.labels('say "hi"', 200).inc(2)
+    in_flight.inc()
+    in_flight.dec()
+    in_flight.inc(3)
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.labels("goods").observe(value)
+
+    lines = registry.exposition().splitlines()
+    assert lines[:3] == [
+        "# HELP requests_total Requests served.",
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="say \\"hi\\"",status="200"} 3.0',
+    ]
+    assert "in_flight 3.0" in lines
+    assert lines[lines.index("# TYPE latency_seconds histogram") + 1:] == [
+        'latency_seconds_bucket{endpoint="goods",le="0.1"} 2.0',
+        'latency_seconds_bucket{endpoint="goods",le="1.0"} 3.0',
+        'latency_seconds_bucket{endpoint="goods",le="+Inf"} 4.0',
+        'latency_seconds_count{endpoint="goods"} 4.0',
+        'latency_seconds_sum{endpoint="goods"} 5.65',
+    ]
+    with pytest.raises(ValueError):
+        requests_total.labels("goods")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Duplicate.")
+
+def test_metrics_multiprocess_store(tmp_path):
+    """
+    Test aggregation of the memory-mapped stores of several worker processes.
+
+    Ensures:
+        - Values written by another worker's store file are summed into the exposition.
+        - Store files grow beyond their initial size and keep their values when reopened.
+        - Marking a worker dead drops its gauges but keeps its counters.
+    """
+    registry = MetricsRegistry(str(tmp_path))
+    requests_total = registry.counter("requests_total", "Requests served.", ("endpoint",))
+    in_flight = registry.gauge("in_flight", "Requests in flight.")
+    requests_total.labels("goods").inc(2)
+    in_flight.inc()
+
+    worker_counters = MmapValueStore(str(tmp_path / "counter_1.db"), initial_size=64)
+    for index in range(50):
+        worker_counters.add(f'["requests_total","requests_total",[["endpoint","item{index}"]]]', index)
+    worker_counters.add('["requests_total","requests_total",[["endpoint","goods"]]]', 5)
+    worker_counters.close()
+    assert (tmp_path / "counter_1.db").stat().st_size > 64
+    reopened = MmapValueStore(str(tmp_path / "counter_1.db"))
+    reopened.add('["requests_total","requests_total",[["endpoint","item49"]]]', 1)
+    reopened.close()
+    worker_gauges = MmapValueStore(str(tmp_path / "gauge_1.db"))
+    worker_gauges.set('["in_flight","in_flight",[]]', 4)
+    worker_gauges.close()
+
+    lines = registry.exposition().splitlines()
+    assert 'requests_total{endpoint="goods"} 7.0' in lines
+    assert 'requests_total{endpoint="item49"} 50.0' in lines
+    assert "in_flight 5.0" in lines
+
+    mark_process_dead(1, str(tmp_path))
+    lines = registry.exposition().splitlines()
+    assert "in_flight 1.0" in lines
+    assert 'requests_total{endpoint="goods"} 7.0' in lines
+
+def test_timed_job_records_failures(capsys):
+    """
+    Test the outcome of scheduled jobs recorded by timed_job.
+
+    Ensures:
+        - A job returning normally is counted as a success run.
+        - A job raising is counted as an error run, printed and re-raised to the scheduler.
+    """
+    def sweep_test_job(fail):
+        if fail:
+            raise RuntimeError("database is locked")
+        return "swept"
+
+    job = timed_job(sweep_test_job)
+    assert job(False) == "swept"
+    with pytest.raises(RuntimeError):
+        job(True)
+    assert "Error in scheduled job sweep_test_job: database is locked" in capsys.readouterr().out
+    lines = registry.exposition().splitlines()
+    assert 'scheduler_job_runs_total{job="sweep_test_job",outcome="success"} 1.0' in lines
+    assert 'scheduler_job_runs_total{job="sweep_test_job",outcome="error"} 1.0' in lines